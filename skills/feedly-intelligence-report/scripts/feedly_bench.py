@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+スコアリングパイプラインのベンチマーク
+
+日英混在の合成記事（HTML本文つき、重複率を指定可能）を生成し、
+feedly_score.py の各段階の所要時間を記事数・キーワード数ごとに計測する。
+ネットワークには一切アクセスしない（ソーシャルメトリクスは空として扱う）。
+結果はJSONに保存し、--compare で別コミットの結果と比較できる。
+--check-scaling を指定すると、最小と最大の記事数で記事あたりの時間を比べ、
+記事数に比例しない（記事あたりの時間が指定倍率を超えて増える）段階があれば終了コード1で終わる。
+
+Usage:
+    # 1k/10k/100k記事 × キーワード20/100 を計測して保存
+    python feedly_bench.py --output /tmp/bench_before.json
+
+    # 段階・規模を絞って計測し、前回の結果と比較
+    python feedly_bench.py --sizes 1000,10000 --keywords 50 --stages matcher,report \\
+        --output /tmp/bench_after.json --compare /tmp/bench_before.json
+
+    # 近似重複判定が記事数にほぼ比例するか確認（記事あたりの時間の増加が2倍以内）
+    python feedly_bench.py --sizes 2000,4000,8000,16000 --keywords 20 --stages near_dedup --check-scaling 2
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import feedly_dedup
+import feedly_score
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_KEYWORD_COUNTS = [20, 100]
+DEFAULT_DUP_RATE = 0.1
+DEFAULT_SEED = 1
+
+# 計測する段階（名前 → 説明）
+STAGES = {
+    "synonyms": "SynonymIndex の構築とキーワード展開",
+    "relevance": "calculate_relevance_score（記事ごとに照合）",
+    "matcher": "RelevanceMatcher の構築と照合",
+    "sources": "DomainClassifier の構築と記事ソースの分類（paywalled_domains / trusted_sources）",
+    "score": "score_articles（関連度を除く総合スコア・優先度、NumPy があれば score_batch）",
+    "score_scalar": "score_articles（同上、記事ごとのスカラー計算）",
+    "dedup": "deduplicate_articles",
+    "near_dedup": "feedly_dedup.remove_near_duplicates",
+    "report": "generate_markdown_report",
+}
+
+# 合成記事の語彙
+JA_WORDS = [
+    "生成AI", "機械学習", "本人確認", "顔認証", "決済", "金融庁", "規制", "セキュリティ",
+    "脆弱性", "クラウド", "半導体", "データ", "障害", "発表", "開始", "提供",
+    "の", "に", "を", "が", "は", "と", "した", "する", "について", "により",
+]
+EN_WORDS = [
+    "AI", "LLM", "model", "cloud", "security", "release", "open", "source",
+    "payment", "KYC", "fraud", "startup", "funding", "data", "GPU", "chip",
+    "the", "a", "of", "to", "and", "in", "for", "with", "new", "update",
+]
+DOMAINS = [
+    "example.com", "nikkei.com", "itmedia.co.jp", "publickey1.jp", "techcrunch.com",
+    "gigazine.net", "zenn.dev", "qiita.com", "bunshun.jp", "news.ycombinator.com",
+]
+SOURCES = ["Example", "日経", "ITmedia", "Publickey", "TechCrunch", "GIGAZINE", "Zenn", "Qiita"]
+PAYWALLED = ["nikkei.com", "bunshun.jp"]
+
+
+def make_sentence(rnd: random.Random, words: int) -> str:
+    """日本語と英語を混ぜた文"""
+    if rnd.random() < 0.5:
+        return "".join(rnd.choices(JA_WORDS, k=words)) + "。"
+    return " ".join(rnd.choices(EN_WORDS, k=words)).capitalize() + "."
+
+
+def make_html_content(rnd: random.Random) -> str:
+    """実際の配信に近いサイズ（数百B〜数十KB、中央値は数KB）のHTML本文"""
+    size = int(min(rnd.lognormvariate(8.0, 0.8), 60000))
+    parts = []
+    length = 0
+    while length < size:
+        paragraph = " ".join(make_sentence(rnd, rnd.randint(6, 20)) for _ in range(rnd.randint(2, 5)))
+        if rnd.random() < 0.2:
+            paragraph = f'<a href="https://{rnd.choice(DOMAINS)}/">{paragraph}</a>'
+        parts.append(f"<p>{paragraph}</p>")
+        length += len(parts[-1])
+    return "\n".join(parts)
+
+
+def make_keywords(rnd: random.Random, count: int) -> tuple[list, list]:
+    """
+    キーワードと類義語グループを生成
+
+    Returns:
+        tuple: (global_keywords, synonym_groups)
+    """
+    vocabulary = [w for w in JA_WORDS + EN_WORDS if len(w) > 1]
+    keywords = list(dict.fromkeys(rnd.sample(vocabulary, min(count, len(vocabulary)))))
+    i = 0
+    while len(keywords) < count:
+        # 語彙で足りない分は本文に現れにくい合成語で埋める
+        keywords.append(f"{rnd.choice(vocabulary)}{i}" if i % 2 else f"kw{i}")
+        i += 1
+    groups = []
+    for start in range(0, len(keywords) - 2, 6):
+        groups.append(keywords[start:start + 3])
+    return keywords, groups
+
+
+def make_config(keyword_count: int, seed: int = DEFAULT_SEED) -> dict:
+    """ベンチマーク用の設定（ソーシャルメトリクスのキャッシュ・スコアキャッシュは無効）"""
+    rnd = random.Random(seed)
+    keywords, groups = make_keywords(rnd, keyword_count)
+    return {
+        "global_keywords": keywords,
+        "synonym_groups": groups,
+        "trusted_sources": {name: 0.8 for name in SOURCES[:3]},
+        "paywalled_domains": PAYWALLED,
+        "categories": [{"name": "Tech", "slug": "tech"}, {"name": "Finance", "slug": "finance"}],
+        "scoring": {"cache": False},
+        "social_metrics": {"cache": False},
+        "deduplication": {},
+    }
+
+
+def make_articles(count: int, dup_rate: float = DEFAULT_DUP_RATE, seed: int = DEFAULT_SEED) -> list:
+    """
+    合成記事を生成
+
+    dup_rate の割合で既存記事の重複を混ぜる（半分は同一URL、半分はタイトルを少し変えた転載）。
+    """
+    rnd = random.Random(seed)
+    now = int(time.time() * 1000)
+    articles = []
+    for i in range(count):
+        if articles and rnd.random() < dup_rate:
+            original = rnd.choice(articles)
+            article = dict(original)
+            article["id"] = f"bench-{i}"
+            if rnd.random() < 0.5:
+                article["title"] = original["title"] + rnd.choice(["（更新）", " - update", "【速報】"])
+                article["url"] = f"https://{rnd.choice(DOMAINS)}/{i}"
+            articles.append(article)
+            continue
+        slug = rnd.choice(["tech", "finance"])
+        domain = rnd.choice(DOMAINS)
+        articles.append({
+            "id": f"bench-{i}",
+            "title": make_sentence(rnd, rnd.randint(4, 12)),
+            "url": f"https://{domain}/{i}",
+            "published": now - rnd.randint(0, 96) * 3600 * 1000,
+            "crawled": now - rnd.randint(0, 96) * 3600 * 1000,
+            "content": make_html_content(rnd),
+            "engagement": rnd.randint(0, 500),
+            "engagement_rate": round(rnd.random() * 5, 2),
+            "source": {"title": rnd.choice(SOURCES), "url": f"https://{domain}/", "stream_id": "feed/bench"},
+            "_category_slug": slug,
+            "_category_name": slug.title(),
+            "_category_keywords": [],
+        })
+    return articles
+
+
+def time_call(func, repeat: int = 1) -> float:
+    """func() を repeat 回実行した最短時間（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(articles: list, config: dict, stages: list, repeat: int = 1) -> dict:
+    """
+    1つの規模（記事数 × キーワード数）で各段階を計測
+
+    段階は前段の出力を入力にする（score の後に dedup・report を計測する）。
+
+    Returns:
+        {段階名: 秒}
+    """
+    timings = {}
+    keywords = config["global_keywords"]
+    groups = config["synonym_groups"]
+    trusted = config["trusted_sources"]
+
+    if "synonyms" in stages:
+        timings["synonyms"] = time_call(lambda: feedly_score.SynonymIndex(groups).expand(keywords), repeat)
+    # 照合の段階は記事ごとのテキスト前処理（_text）も含めて計測するため、毎回コピーから始める
+    if "relevance" in stages:
+        def relevance():
+            for a in [dict(a) for a in articles]:
+                feedly_score.calculate_relevance_score(a, keywords=keywords, synonym_groups=groups, trusted_sources=trusted)
+        timings["relevance"] = time_call(relevance, repeat)
+
+    matcher = feedly_score.RelevanceMatcher.from_config(config)
+    if "matcher" in stages:
+        def build_and_match():
+            m = feedly_score.RelevanceMatcher.from_config(config)
+            return [m.score(a) for a in [dict(a) for a in articles]]
+        timings["matcher"] = time_call(build_and_match, repeat)
+
+    if "sources" in stages:
+        def classify_sources():
+            classifier = feedly_score.DomainClassifier(config["paywalled_domains"], trusted)
+            return [classifier.classify(a) for a in [dict(a) for a in articles]]
+        timings["sources"] = time_call(classify_sources, repeat)
+
+    # 後段は照合済みの記事で計測する
+    scored = [dict(a) for a in articles]
+    for article in scored:
+        article["_relevance"] = matcher.score(article)
+
+    state = {
+        "config": config,
+        "category_configs": {cat["slug"]: cat for cat in config["categories"]},
+        "social_metrics": {},
+        "matcher": matcher,
+        "thresholds": {"must_read": 80, "should_read": 60, "optional": 40},
+        "paywalled_domains": config["paywalled_domains"],
+    }
+    score = lambda: feedly_score.score_articles(scored, **state)
+    if "score" in stages:
+        timings["score"] = time_call(score, repeat)
+    else:
+        score()
+    if "score_scalar" in stages:
+        timings["score_scalar"] = time_call(lambda: feedly_score.score_articles(scored, vectorized=False, **state), repeat)
+
+    deduped = scored
+    if "dedup" in stages:
+        timings["dedup"] = time_call(lambda: feedly_score.deduplicate_articles(list(scored)), repeat)
+    if "near_dedup" in stages or "report" in stages:
+        deduped = feedly_score.deduplicate_articles(list(scored))
+    if "near_dedup" in stages:
+        timings["near_dedup"] = time_call(
+            lambda: feedly_dedup.remove_near_duplicates(deduped, config["deduplication"]), repeat
+        )
+
+    if "report" in stages:
+        deduped.sort(key=lambda x: -x.get("_scores", {}).get("total", 0))
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = str(Path(tmp) / "report.md")
+            timings["report"] = time_call(
+                lambda: feedly_score.generate_markdown_report(deduped, config, output_path), repeat
+            )
+    return timings
+
+
+def git_revision() -> str | None:
+    """計測したコミット（gitリポジトリ外ならNone）"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def result_key(row: dict) -> tuple:
+    return (row["stage"], row["articles"], row["keywords"], row["dup_rate"])
+
+
+def print_results(results: list, baseline: list = None):
+    """結果の表（baseline 指定時は比率も表示）"""
+    previous = {result_key(row): row for row in baseline or []}
+    header = f"{'stage':<12} {'articles':>9} {'keywords':>9} {'dup':>5} {'seconds':>10} {'us/article':>11}"
+    if baseline is not None:
+        header += f" {'baseline':>10} {'ratio':>7}"
+    print(header, file=sys.stderr)
+    for row in results:
+        line = (
+            f"{row['stage']:<12} {row['articles']:>9} {row['keywords']:>9} {row['dup_rate']:>5} "
+            f"{row['seconds']:>10.4f} {row['us_per_article']:>11.1f}"
+        )
+        if baseline is not None:
+            old = previous.get(result_key(row))
+            if old and old["seconds"]:
+                line += f" {old['seconds']:>10.4f} {row['seconds'] / old['seconds']:>6.2f}x"
+            else:
+                line += f" {'-':>10} {'-':>7}"
+        print(line, file=sys.stderr)
+
+
+def scaling_rows(results: list) -> list:
+    """
+    段階ごとに最小と最大の記事数で記事あたりの時間を比べる
+
+    Returns:
+        list: [{stage, keywords, dup_rate, small, large, ratio}]（記事数が1種類の段階は含まない）
+    """
+    groups = defaultdict(list)
+    for row in results:
+        groups[(row["stage"], row["keywords"], row["dup_rate"])].append(row)
+    rows = []
+    for (stage, keywords, dup_rate), group in groups.items():
+        group.sort(key=lambda row: row["articles"])
+        small, large = group[0], group[-1]
+        if small["articles"] == large["articles"]:
+            continue
+        rows.append({
+            "stage": stage,
+            "keywords": keywords,
+            "dup_rate": dup_rate,
+            "small": small["articles"],
+            "large": large["articles"],
+            "ratio": round(large["us_per_article"] / small["us_per_article"], 2) if small["us_per_article"] else None,
+        })
+    return rows
+
+
+def print_scaling(rows: list, max_ratio: float) -> list:
+    """記事あたりの時間の増加率の表を表示し、max_ratio を超えた段階を返す"""
+    print(f"{'stage':<12} {'keywords':>9} {'articles':>15} {'us/article ratio':>17}", file=sys.stderr)
+    failed = []
+    for row in rows:
+        over = row["ratio"] is not None and row["ratio"] > max_ratio
+        if over:
+            failed.append(row)
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(
+            f"{row['stage']:<12} {row['keywords']:>9} {row['small']:>7}->{row['large']:<7} {ratio:>17}"
+            f"{'  (exceeds ' + format(max_ratio, 'g') + 'x)' if over else ''}",
+            file=sys.stderr
+        )
+    return failed
+
+
+def parse_int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Feedly scoring pipeline on synthetic articles")
+    parser.add_argument(
+        "--sizes",
+        type=parse_int_list,
+        default=DEFAULT_SIZES,
+        help="Comma-separated article counts (default: 1000,10000,100000)"
+    )
+    parser.add_argument(
+        "--keywords",
+        type=parse_int_list,
+        default=DEFAULT_KEYWORD_COUNTS,
+        help="Comma-separated keyword counts (default: 20,100)"
+    )
+    parser.add_argument(
+        "--dup-rate",
+        type=float,
+        default=DEFAULT_DUP_RATE,
+        help=f"Fraction of duplicate / near-duplicate articles (default: {DEFAULT_DUP_RATE})"
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"Comma-separated stages to time (default: all = {','.join(STAGES)})"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Run each stage N times and keep the fastest (default: 1)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Random seed for the synthetic corpus (default: {DEFAULT_SEED})"
+    )
+    parser.add_argument(
+        "--output",
+        help="Write results as JSON to this file"
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="JSON_FILE",
+        help="Previous results file to compare against"
+    )
+    parser.add_argument(
+        "--check-scaling",
+        type=float,
+        metavar="FACTOR",
+        help="Fail (exit 1) if a stage's time per article at the largest size exceeds FACTOR x that at the smallest"
+    )
+
+    args = parser.parse_args()
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    if args.check_scaling is not None and len(set(args.sizes)) < 2:
+        parser.error("--check-scaling needs at least two --sizes")
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text()).get("results", [])
+
+    results = []
+    for size in args.sizes:
+        print(f"Generating {size} articles (dup rate {args.dup_rate})...", file=sys.stderr)
+        articles = make_articles(size, args.dup_rate, args.seed)
+        for keyword_count in args.keywords:
+            config = make_config(keyword_count, args.seed)
+            print(f"  Timing {size} articles x {keyword_count} keywords...", file=sys.stderr)
+            timings = run_case(articles, config, stages, args.repeat)
+            for stage in stages:
+                results.append({
+                    "stage": stage,
+                    "articles": size,
+                    "keywords": keyword_count,
+                    "dup_rate": args.dup_rate,
+                    "seconds": round(timings[stage], 6),
+                    "us_per_article": round(timings[stage] / size * 1e6, 2),
+                })
+
+    print_results(results, baseline)
+
+    failed = []
+    if args.check_scaling is not None:
+        failed = print_scaling(scaling_rows(results), args.check_scaling)
+
+    if args.output:
+        output = {
+            "metadata": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        if args.check_scaling is not None:
+            output["scaling"] = scaling_rows(results)
+        Path(args.output).write_text(json.dumps(output, ensure_ascii=False, indent=2))
+        print(f"Results written to: {args.output}", file=sys.stderr)
+
+    if failed:
+        print(
+            f"Scaling check failed: {', '.join(sorted({row['stage'] for row in failed}))}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ Feedlyレポートからチェック済み記事をRead Laterに保存するス
 Usage:
     python feedly_bookmark.py --report Daily/2026-02/2026-02-03_feeds-report.md --mapping /tmp/url_to_entry_id.json
     python feedly_bookmark.py --report Daily/2026-02/2026-02-03_feeds-report.md --mapping /tmp/url_to_entry_id.json --dry-run
+
+    # --mapping を省略するとローカルの記事ストアでURLを引く
+    python feedly_bookmark.py --report Daily/2026-02/2026-02-03_feeds-report.md
 """
 
 import argparse
@@ -21,6 +24,9 @@ except ImportError:
     print("Error: requests not installed. Run: pip install requests", file=sys.stderr)
     sys.exit(1)
 
+import feedly_http
+import feedly_store
+
 FEEDLY_API_BASE = "https://api.feedly.com/v3"
 
 
@@ -56,7 +62,7 @@ def load_mapping(mapping_file: str) -> dict:
 def get_user_id(token: str) -> str:
     """ユーザーIDを取得"""
     headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
+    resp = feedly_http.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
     resp.raise_for_status()
     return resp.json().get("id", "")
 
@@ -128,7 +134,7 @@ def save_to_read_later(token: str, user_id: str, entry_ids: list[str]) -> dict:
     payload = {"entryIds": entry_ids}
 
     try:
-        resp = requests.put(
+        resp = feedly_http.put(
             f"{FEEDLY_API_BASE}/tags/{encoded_tag_id}",
             headers=headers,
             json=payload,
@@ -163,8 +169,7 @@ def main():
     )
     parser.add_argument(
         "--mapping",
-        required=True,
-        help="Path to URL-to-EntryID mapping JSON file"
+        help="Path to URL-to-EntryID mapping JSON file (default: look up URLs in the local article store)"
     )
     parser.add_argument(
         "--config",
@@ -194,12 +199,13 @@ def main():
         sys.exit(1)
 
     # マッピング読み込み
-    try:
-        url_to_entry_id = load_mapping(args.mapping)
-        print(f"Loaded mapping: {len(url_to_entry_id)} URLs", file=sys.stderr)
-    except FileNotFoundError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
+    if args.mapping:
+        try:
+            url_to_entry_id = load_mapping(args.mapping)
+            print(f"Loaded mapping: {len(url_to_entry_id)} URLs", file=sys.stderr)
+        except FileNotFoundError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
 
     # レポート解析
     try:
@@ -214,6 +220,13 @@ def main():
         print("No articles marked for saving.", file=sys.stderr)
         sys.exit(0)
 
+    # マッピング未指定: 記事ストアからチェック済みURLのエントリーIDだけを引く
+    if not args.mapping:
+        store = feedly_store.ArticleStore.from_config(config)
+        url_to_entry_id = store.entry_ids_for_urls(bookmarked_urls)
+        store.close()
+        print(f"Looked up {len(url_to_entry_id)} URLs in article store", file=sys.stderr)
+
     # URLをエントリーIDに変換
     entry_ids = []
     not_found = []
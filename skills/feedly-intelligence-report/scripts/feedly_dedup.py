@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+近似重複記事の検出（MinHash + LSH）
+
+同じニュースの転載・配信記事のように、URLもタイトルも完全には一致しないが
+内容がほぼ同じ記事をまとめる。設定ファイルの deduplication ブロックを使用する。
+
+- タイトル・本文を文字n-gram（シングル）に分割（分かち書き不要で日本語にも対応）
+- MinHash署名（one permutation hashing + 空きビンの補完）を記事ごとに1回計算
+- LSH（署名をバンドに分割してバケット化）で候補だけを列挙するため、
+  全ペア比較（O(n²)）にならず記事数にほぼ比例した時間で処理できる
+- バケットは時間窓の幅の時間帯ごとに分け、前後の時間帯だけを引くため、
+  time_window_hours より離れた記事は候補として列挙しない
+- よくある文字列（定型句）のバケットは記事が集中して候補が膨らむため、
+  MAX_BUCKET_SIZE に達したバケットは以後登録も参照もしない（他のバンドで見つける）
+- 候補は time_window_hours 以内の記事に限定し、タイトルは正確なJaccard係数
+  （シングルが少なく推定誤差が大きいため）、本文はMinHashの推定値で閾値判定する
+- 本文が短い記事（「続きを読む」「会員限定記事」だけの要約など）は本文で判定せず、
+  本文での一致にもタイトルの最低限の類似を求める（定型文の本文だけで別記事をまとめない）
+
+Usage:
+    import feedly_dedup
+
+    articles, merged = feedly_dedup.remove_near_duplicates(articles, config.get("deduplication", {}))
+"""
+
+import html
+import operator
+import re
+from collections import defaultdict
+
+import feedly_text
+
+DEFAULT_TITLE_SIMILARITY_THRESHOLD = 0.7
+DEFAULT_CONTENT_SIMILARITY_THRESHOLD = 0.8
+DEFAULT_TIME_WINDOW_HOURS = 48
+# 本文で判定する最小のシングル数（正規化後の本文がおよそこの文字数以上）
+DEFAULT_MIN_CONTENT_SHINGLES = 40
+# 本文で一致した記事に求めるタイトルの類似度（Jaccard係数）
+DEFAULT_CONTENT_TITLE_SIMILARITY = 0.2
+
+# 文字n-gramの長さ
+SHINGLE_SIZE = 3
+# 本文は冒頭だけを比較する（転載記事はリード文が一致するため）
+CONTENT_EXCERPT_CHARS = 500
+
+# MinHash署名の長さ = LSH_BANDS * LSH_ROWS
+# 類似度0.7で約99%、0.5で約64%、0.3で約12%の確率で候補になる
+LSH_BANDS = 16
+LSH_ROWS = 4
+NUM_BINS = LSH_BANDS * LSH_ROWS
+BIN_MASK = NUM_BINS - 1
+# 1つのバケット（バンド × 時間帯）に登録する記事数の上限。
+# これに達したバケットは候補の絞り込みに役立たないため、以後は登録も参照もしない
+MAX_BUCKET_SIZE = 16
+# hash() の値域（±2^63）より大きい値: 空きビンと、補完したビンのオフセットに使う
+EMPTY_BIN = 1 << 64
+FILL_SHIFT = 66
+
+TAG_RE = re.compile(r"<[^>]+>")
+# 空白・記号を除去（文字n-gramは単語境界に依存しないため）
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """HTMLタグ・実体参照・空白・記号を除去して小文字化"""
+    if not text:
+        return ""
+    return NON_WORD_RE.sub("", html.unescape(TAG_RE.sub(" ", text)).lower())
+
+
+def content_excerpt(article: dict) -> str:
+    """比較に使う本文の冒頭（正規化済み）"""
+    if "_content_excerpt" in article:
+        return article["_content_excerpt"]
+    if article.get("_text") is not None:
+        # feedly_text.PreparedText: HTML除去・小文字化済み
+        body = article["_text"].body
+    else:
+        body = feedly_text.article_text(article).lower()
+    return NON_WORD_RE.sub("", body)[:CONTENT_EXCERPT_CHARS]
+
+
+def shingle_hashes(text: str) -> set:
+    """
+    文字3-gramのハッシュ集合
+
+    3文字のコードポイントのタプルをハッシュする。整数タプルの hash() は
+    文字列と違い PYTHONHASHSEED でランダム化されないため、実行ごとに結果が変わらない。
+    """
+    if not text:
+        return set()
+    codes = list(map(ord, text))
+    if len(codes) < SHINGLE_SIZE:
+        codes += [0] * (SHINGLE_SIZE - len(codes))
+    return set(map(hash, zip(codes, codes[1:], codes[2:])))
+
+
+def minhash_signature(hashes: set) -> tuple | None:
+    """
+    MinHash署名（one permutation hashing）
+
+    ハッシュ値の下位ビットでビンを選び、ビンごとの最小値を取る。
+    シングルが少なく空いたビンは右隣の空いていないビンの値で補完する
+    （距離に応じたオフセットを加え、実際の値とは衝突しない）。
+    """
+    if not hashes:
+        return None
+    bins = [EMPTY_BIN] * NUM_BINS
+    for h in hashes:
+        i = h & BIN_MASK
+        if h < bins[i]:
+            bins[i] = h
+    if EMPTY_BIN in bins:
+        # 末尾から2周分さかのぼり、右側で最も近い値とその距離を持ち回る
+        filled = list(bins)
+        nearest = EMPTY_BIN
+        distance = 0
+        for step in range(2 * NUM_BINS - 1, -1, -1):
+            i = step & BIN_MASK
+            if bins[i] != EMPTY_BIN:
+                nearest = bins[i]
+                distance = 0
+            else:
+                distance += 1
+                if step < NUM_BINS:
+                    filled[i] = nearest + (distance << FILL_SHIFT)
+        bins = filled
+    return tuple(bins)
+
+
+def estimated_similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """MinHash署名から推定したJaccard係数"""
+    return sum(map(operator.eq, sig_a, sig_b)) / NUM_BINS
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard係数"""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def lsh_keys(signature: tuple) -> list:
+    """
+    署名をバンドに分割したバケットキー
+
+    (バンド番号, バンドの値) のハッシュ（整数）にして、インデックスが保持するオブジェクトを減らす。
+    ハッシュの衝突は候補が増えるだけで、判定は候補ごとに検証するため結果に影響しない。
+    """
+    return [
+        hash((band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+        for band in range(LSH_BANDS)
+    ]
+
+
+def article_timestamp(article: dict) -> int:
+    """重複判定の時間窓に使う時刻（ms）"""
+    return article.get("published") or article.get("crawled") or 0
+
+
+class NearDuplicateIndex:
+    """
+    採用済み記事のLSHインデックス
+
+    タイトル・本文それぞれの署名をバンド単位でバケットに登録し、
+    新しい記事と同じバケットに入った記事だけを候補として検証する。
+    タイトルのバケットで見つかった候補はタイトルの類似度、
+    本文のバケットで見つかった候補は本文の類似度（とタイトルの最低限の類似度）で判定する。
+    本文のシングルが min_content_shingles 未満の記事は本文のバケットに登録しない。
+
+    バケットは時間帯（time_window_hours 幅）ごとに分け、前後の時間帯だけを参照する。
+    時刻のない記事は時間帯を持たないバケット（None）に入り、常に参照される。
+    """
+
+    def __init__(
+        self,
+        title_threshold: float = DEFAULT_TITLE_SIMILARITY_THRESHOLD,
+        content_threshold: float = DEFAULT_CONTENT_SIMILARITY_THRESHOLD,
+        time_window_hours: float = DEFAULT_TIME_WINDOW_HOURS,
+        min_content_shingles: int = DEFAULT_MIN_CONTENT_SHINGLES,
+        content_title_threshold: float = DEFAULT_CONTENT_TITLE_SIMILARITY
+    ):
+        self.title_threshold = title_threshold
+        self.content_threshold = content_threshold
+        self.min_content_shingles = min_content_shingles
+        self.content_title_threshold = content_title_threshold
+        self.time_window_ms = (time_window_hours or 0) * 3600 * 1000
+        # バケットキー → {時間帯: 記事番号のリスト}
+        self.title_buckets = defaultdict(dict)
+        self.content_buckets = defaultdict(dict)
+        self.entries = []
+
+    def fingerprint(self, article: dict) -> dict:
+        """記事の比較用データ（タイトルのシングル集合、本文の署名、各バケットキー）"""
+        title_hashes = shingle_hashes(normalize_text(article.get("title", "")))
+        title_sig = minhash_signature(title_hashes)
+        content_hashes = shingle_hashes(content_excerpt(article))
+        # 短い本文（定型文だけの要約など）は本文で判定しない
+        content_sig = minhash_signature(content_hashes) if len(content_hashes) >= self.min_content_shingles else None
+        return {
+            "time": article_timestamp(article),
+            "title_hashes": title_hashes,
+            "title_keys": lsh_keys(title_sig) if title_sig else [],
+            "content_sig": content_sig,
+            "content_keys": lsh_keys(content_sig) if content_sig else [],
+        }
+
+    def _in_window(self, fp: dict, other: dict) -> bool:
+        if not self.time_window_ms or not fp["time"] or not other["time"]:
+            return True
+        return abs(fp["time"] - other["time"]) <= self.time_window_ms
+
+    def _slot(self, fp: dict) -> int | None:
+        """記事の時間帯（時間窓がない・時刻がない場合はNone）"""
+        if not self.time_window_ms or not fp["time"]:
+            return None
+        return int(fp["time"] // self.time_window_ms)
+
+    def _candidates(self, buckets: dict, keys: list, slot: int | None) -> set:
+        """同じバケットの前後の時間帯にある記事番号（上限に達したバケットは除く）"""
+        if slot is not None:
+            slots = (slot - 1, slot, slot + 1, None)
+        elif self.time_window_ms:
+            # 時刻のない記事はすべての記事と時間窓内とみなす
+            slots = None
+        else:
+            slots = (None,)
+        candidates = set()
+        for key in keys:
+            by_slot = buckets.get(key)
+            if not by_slot:
+                continue
+            for bucket in (by_slot.values() if slots is None else map(by_slot.get, slots)):
+                if bucket and len(bucket) < MAX_BUCKET_SIZE:
+                    candidates.update(bucket)
+        return candidates
+
+    def find(self, fp: dict) -> int | None:
+        """近似重複する採用済み記事の番号（なければNone、複数ある場合はどれか1つ）"""
+        entries = self.entries
+        slot = self._slot(fp)
+        for index in self._candidates(self.title_buckets, fp["title_keys"], slot):
+            other = entries[index]
+            if self._in_window(fp, other) and jaccard(fp["title_hashes"], other["title_hashes"]) >= self.title_threshold:
+                return index
+
+        for index in self._candidates(self.content_buckets, fp["content_keys"], slot):
+            other = entries[index]
+            if (
+                self._in_window(fp, other)
+                and estimated_similarity(fp["content_sig"], other["content_sig"]) >= self.content_threshold
+                and jaccard(fp["title_hashes"], other["title_hashes"]) >= self.content_title_threshold
+            ):
+                return index
+        return None
+
+    def add(self, fp: dict) -> int:
+        """記事を登録して番号を返す"""
+        index = len(self.entries)
+        self.entries.append(fp)
+        slot = self._slot(fp)
+        for buckets, keys in ((self.title_buckets, fp["title_keys"]), (self.content_buckets, fp["content_keys"])):
+            for key in keys:
+                bucket = buckets[key].setdefault(slot, [])
+                if len(bucket) < MAX_BUCKET_SIZE:
+                    bucket.append(index)
+        return index
+
+
+def remove_near_duplicates(articles: list, dedup_config: dict = None) -> tuple[list, int]:
+    """
+    近似重複記事を除去（総合スコアの高い記事を残す）
+
+    スコアの高い順に記事を見ていき、採用済みの記事と近似重複なら除外、
+    そうでなければ採用してインデックスに登録する。残った記事は元の順序で返す。
+
+    Args:
+        articles: スコア計算済み（_scores）の記事リスト
+        dedup_config: 設定ファイルの deduplication ブロック
+
+    Returns:
+        tuple: (残った記事リスト, 除外した記事数)
+    """
+    dedup_config = dedup_config or {}
+    index = NearDuplicateIndex(
+        title_threshold=dedup_config.get("title_similarity_threshold", DEFAULT_TITLE_SIMILARITY_THRESHOLD),
+        content_threshold=dedup_config.get("content_similarity_threshold", DEFAULT_CONTENT_SIMILARITY_THRESHOLD),
+        time_window_hours=dedup_config.get("time_window_hours", DEFAULT_TIME_WINDOW_HOURS),
+        min_content_shingles=dedup_config.get("min_content_shingles", DEFAULT_MIN_CONTENT_SHINGLES),
+        content_title_threshold=dedup_config.get("content_title_similarity", DEFAULT_CONTENT_TITLE_SIMILARITY)
+    )
+
+    order = sorted(
+        range(len(articles)),
+        key=lambda i: -articles[i].get("_scores", {}).get("total", 0)
+    )
+    keep = set()
+    for i in order:
+        fp = index.fingerprint(articles[i])
+        if index.find(fp) is None:
+            index.add(fp)
+            keep.add(i)
+
+    return [a for i, a in enumerate(articles) if i in keep], len(articles) - len(keep)
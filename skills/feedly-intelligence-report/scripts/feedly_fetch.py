@@ -14,12 +14,48 @@ Usage:
 
     # 取得した記事を既読にする
     python feedly_fetch.py --mark-read /tmp/feedly_articles.json
+
+    # ローカルの記事ストア内の全記事を既読にする
+    python feedly_fetch.py --mark-read-store
+
+    # 記事ストアの更新のみ（JSONを書き出さない、feedly_score.py --from-store で読む）
+    python feedly_fetch.py --store-only
+
+    # 差分取得（前回以降の新着のみ取得してローカルの記事ストアに統合）
+    python feedly_fetch.py --incremental --output /tmp/feedly_articles.json
+
+    # 差分取得の設定でも全件を取り直す
+    python feedly_fetch.py --incremental --full --output /tmp/feedly_articles.json
+
+    # 設定ファイルのカテゴリごとに並列取得（global.allの代わり）
+    python feedly_fetch.py --fetch-mode categories --fetch-workers 4 --output /tmp/feedly_articles.json
+
+    # JSONL形式（1行1記事）でページ取得ごとに書き出し、そのままスコアリングに渡す
+    python feedly_fetch.py --format jsonl | python feedly_score.py --input -
+
+    # 本文をHTMLのまま保存（text: テキストのみ / both: テキスト + content_html）、テキストは2000文字まで
+    python feedly_fetch.py --content-format both --content-max-chars 2000 --output /tmp/feedly_articles.json
+
+    # 必要なフィールドだけをインデントなしで書き出し、gzipで圧縮（feedly_score.py はそのまま読める）
+    python feedly_fetch.py --fields id,title,url,crawled,engagement,source --compact --output /tmp/feedly_articles.json.gz
+
+    # 前回途中で失敗したページ取得を、最後に取得できたページの続きから再開
+    python feedly_fetch.py --resume --output /tmp/feedly_articles.json
+
+    # 段階ごとの所要時間・CPU時間・最大RSS・HTTP統計を記録（chrome: chrome://tracing 形式）
+    python feedly_fetch.py --output /tmp/feedly_articles.json --trace /tmp/fetch_trace.json --trace-format chrome
 """
 
 import argparse
+import atexit
+import hashlib
 import json
 import os
 import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import quote
@@ -30,7 +66,32 @@ except ImportError:
     print("Error: requests not installed. Run: pip install requests", file=sys.stderr)
     sys.exit(1)
 
+import feedly_http
+import feedly_io
+import feedly_store
+import feedly_text
+import feedly_trace
+
 FEEDLY_API_BASE = "https://api.feedly.com/v3"
+DEFAULT_CHECKPOINT_FILE = "~/.feedly/fetch_checkpoints.json"
+# ページ取得の途中経過（continuation と取得済み記事）の保存先（--resume で続きから取得）
+DEFAULT_RESUME_DIR = "~/.feedly/fetch_resume"
+# feedly_http の再試行で回復しなかったページを、同じ continuation で取り直す回数
+PAGE_RETRIES = 2
+PAGE_RETRY_WAIT_SECONDS = 5
+# 既読マーク: 1リクエストあたりの件数（API上限）・同時送信数・失敗したバッチの再送回数
+MARK_BATCH_SIZE = 1000
+DEFAULT_MARK_WORKERS = 4
+MARK_RETRIES = 2
+MARK_RETRY_WAIT_SECONDS = 2
+# 既読にできたエントリーIDの記録（--mark-read の再実行で送り直さない）
+DEFAULT_MARK_JOURNAL_FILE = "~/.feedly/mark_read_journal.jsonl"
+# カテゴリ別並列取得の同時実行数
+DEFAULT_FETCH_WORKERS = 4
+# 本文の保存形式（text: HTMLをテキストに変換 / html: HTMLのまま / both: テキスト + content_html）
+DEFAULT_CONTENT_FORMAT = "text"
+# --fields で content を残すときに一緒に残すフィールド
+CONTENT_COMPANION_FIELDS = ("content_format", "content_html")
 
 
 def expand_path(path: str) -> Path:
@@ -57,16 +118,48 @@ def load_config(config_file: str) -> dict:
 def get_user_id(token: str) -> str:
     """ユーザーIDを取得"""
     headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
+    resp = feedly_http.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
     resp.raise_for_status()
     return resp.json().get("id", "")
 
 
+def get_category_ids(token: str) -> dict:
+    """
+    Feedlyのカテゴリ名 → カテゴリのストリームID（GET /v3/categories）
+
+    カテゴリIDはカテゴリ名から作られるとは限らない（名前の変更後など）ため、名前から組み立てない。
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    resp = feedly_http.get(f"{FEEDLY_API_BASE}/categories", headers=headers, timeout=30)
+    resp.raise_for_status()
+    return {cat["label"]: cat["id"] for cat in resp.json() if cat.get("label") and cat.get("id")}
+
+
+def resolve_category_streams(token: str, labels: list) -> dict:
+    """
+    設定ファイルのカテゴリ名をFeedlyのカテゴリのストリームIDに変換
+
+    Returns:
+        {カテゴリ名: ストリームID}（labels の順）
+
+    Raises:
+        ValueError: Feedlyに存在しないカテゴリ名がある場合
+    """
+    category_ids = get_category_ids(token)
+    unknown = [label for label in labels if label not in category_ids]
+    if unknown:
+        raise ValueError(
+            f"Unknown Feedly categories in config: {', '.join(unknown)} "
+            f"(available: {', '.join(sorted(category_ids)) or 'none'})"
+        )
+    return {label: category_ids[label] for label in labels}
+
+
 def test_connection(token: str) -> bool:
     """API接続テスト"""
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        resp = requests.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
+        resp = feedly_http.get(f"{FEEDLY_API_BASE}/profile", headers=headers, timeout=10)
         if resp.status_code == 200:
             profile = resp.json()
             print(f"✓ Connected as: {profile.get('email', 'unknown')}")
@@ -79,33 +172,158 @@ def test_connection(token: str) -> bool:
         return False
 
 
-def fetch_stream_contents(
+class PageJournal:
+    """
+    ストリーム1本のページ取得の途中経過
+
+    ページを取得するごとに記事を {key}.jsonl に追記し、続きの continuation と
+    取得条件（newerThan 等）を {key}.json に保存する。全ページ取得できたら削除する。
+    途中で失敗した場合は残り、--resume の実行で保存済みの記事を返してから続きを取得する。
+    """
+
+    def __init__(self, directory: Path, stream_id: str):
+        key = hashlib.sha1(stream_id.encode()).hexdigest()[:16]
+        self.stream_id = stream_id
+        self.state_path = directory / f"{key}.json"
+        self.items_path = directory / f"{key}.jsonl"
+        self.state = None
+
+    def load(self, query: dict) -> dict | None:
+        """保存済みの途中経過（同じストリーム・同じ未読/件数指定のもの）"""
+        if not self.state_path.exists():
+            return None
+        try:
+            state = json.loads(self.state_path.read_text())
+        except ValueError:
+            return None
+        saved = state.get("query", {})
+        if state.get("stream_id") != self.stream_id or any(
+            saved.get(key) != query.get(key) for key in ("unread_only", "count")
+        ):
+            return None
+        self.state = state
+        return state
+
+    def saved_items(self) -> list[dict]:
+        """保存済みの記事（状態の保存前に追記された分は除く）"""
+        items = []
+        if self.items_path.exists():
+            with open(self.items_path, encoding="utf-8") as f:
+                for line in f:
+                    if len(items) >= self.state["items"]:
+                        break
+                    items.append(json.loads(line))
+        # 最後のページの追記途中で終了した場合に備え、保存済みの件数に揃える
+        with open(self.items_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        return items
+
+    def start(self, query: dict):
+        """新しく取得を始める（前回の途中経過は破棄）"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.items_path.write_text("")
+        self.state = {"stream_id": self.stream_id, "query": query, "continuation": None, "pages": 0, "items": 0}
+        self._write_state()
+
+    def save_page(self, items: list[dict], continuation: str | None):
+        """取得したページの記事と続きの continuation を保存"""
+        with open(self.items_path, "a", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.state["continuation"] = continuation
+        self.state["pages"] += 1
+        self.state["items"] += len(items)
+        self._write_state()
+
+    def _write_state(self):
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False, indent=2))
+        os.replace(tmp_path, self.state_path)
+
+    def finish(self):
+        """全ページ取得できたら途中経過を削除"""
+        self.state_path.unlink(missing_ok=True)
+        self.items_path.unlink(missing_ok=True)
+
+
+class PageJournals:
+    """
+    ストリームごとの PageJournal の保存先と、再開するか（--resume）
+
+    failed には今回の実行で途中のページ取得に失敗したストリームIDが入る。
+    """
+
+    def __init__(self, directory: str = DEFAULT_RESUME_DIR, resume: bool = False):
+        self.directory = expand_path(directory)
+        self.resume = resume
+        self.failed = set()
+
+    @classmethod
+    def from_config(cls, config: dict, resume: bool = False) -> "PageJournals":
+        return cls(config.get("resume_dir", DEFAULT_RESUME_DIR), resume)
+
+    def journal(self, stream_id: str) -> PageJournal:
+        return PageJournal(self.directory, stream_id)
+
+
+def is_retryable_page_error(error: Exception) -> bool:
+    """ページを取り直す価値があるエラーか（429 / 5xx と接続エラー・タイムアウト）"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def iter_stream_pages(
     token: str,
     stream_id: str,
     count: int = 100,
     newer_than: int = None,
     unread_only: bool = True,
-    fetch_all: bool = True
-) -> list[dict]:
+    fetch_all: bool = True,
+    strict: bool = False,
+    journals: PageJournals = None
+):
     """
-    指定されたストリームから記事を取得
+    指定されたストリームから記事をページ単位で取得するジェネレータ
 
-    Args:
-        token: Feedly API token
-        stream_id: Feedly stream ID
-        count: 1回のリクエストで取得する記事数（最大1000）
-        newer_than: この時刻（Unix timestamp ms）より新しい記事のみ取得
-        unread_only: Trueの場合、未読記事のみを取得（デフォルト: True）
-        fetch_all: Trueの場合、continuationトークンを使って全件取得（デフォルト: True）
+    引数は fetch_stream_contents と同じ。1ページ取得するごとに記事リストを返すため、
+    呼び出し側は全件の取得完了を待たずに書き出しを始められる。
+    journals.resume の場合、保存済みの記事をまとめて1ページとして返してから続きを取得する。
 
-    Returns:
-        記事リスト
+    Yields:
+        1ページ分の記事リスト
     """
     headers = {"Authorization": f"Bearer {token}"}
-    all_articles = []
+    total = 0
     continuation = None
     page = 1
 
+    journal = journals.journal(stream_id) if journals is not None and fetch_all else None
+    if journal is not None:
+        query = {"newer_than": newer_than, "unread_only": unread_only, "count": count}
+        state = journal.load(query) if journals.resume else None
+        if state is not None:
+            # 前回の取得条件（newerThan）で continuation の続きから取得する
+            newer_than = state["query"].get("newer_than")
+            continuation = state["continuation"]
+            page = state["pages"] + 1
+            items = journal.saved_items()
+            total = len(items)
+            print(
+                f"  Resuming {stream_id} from page {page} ({total} articles already fetched)",
+                file=sys.stderr
+            )
+            if items:
+                yield items
+            if not continuation:
+                journal.finish()
+                return
+        else:
+            journal.start(query)
+
     while True:
         params = {
             "streamId": stream_id,
@@ -117,36 +335,86 @@ def fetch_stream_contents(
         if continuation:
             params["continuation"] = continuation
 
-        try:
-            resp = requests.get(
-                f"{FEEDLY_API_BASE}/streams/contents",
-                headers=headers,
-                params=params,
-                timeout=30
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            items = data.get("items", [])
-            all_articles.extend(items)
-
-            if page > 1:
-                print(f"    page {page}: +{len(items)} articles (total: {len(all_articles)})", file=sys.stderr)
-
-            # 全件取得モードでない場合、または続きがない場合は終了
-            if not fetch_all:
+        # feedly_http の再試行で回復しなかった場合も、同じページを取り直す
+        for attempt in range(PAGE_RETRIES + 1):
+            try:
+                resp = feedly_http.get(
+                    f"{FEEDLY_API_BASE}/streams/contents",
+                    headers=headers,
+                    params=params,
+                    timeout=30
+                )
+                resp.raise_for_status()
+                data = resp.json()
                 break
+            except requests.RequestException as e:
+                # 400 / 401 / 403 / 404 等は取り直しても同じ結果になるため即座に中断する
+                if attempt < PAGE_RETRIES and is_retryable_page_error(e):
+                    print(f"Retrying page {page} of {stream_id}: {e}", file=sys.stderr)
+                    time.sleep(PAGE_RETRY_WAIT_SECONDS * (attempt + 1))
+                    continue
+                print(f"Error fetching stream {stream_id}: {e}", file=sys.stderr)
+                if journals is not None:
+                    journals.failed.add(stream_id)
+                if journal is not None:
+                    print(
+                        f"  Stopped at page {page} ({total} articles fetched); rerun with --resume to continue",
+                        file=sys.stderr
+                    )
+                if strict:
+                    raise
+                return
+
+        items = data.get("items", [])
+        total += len(items)
+        continuation = data.get("continuation") if fetch_all else None
+        if journal is not None:
+            journal.save_page(items, continuation)
+
+        if page > 1:
+            print(f"    page {page}: +{len(items)} articles (total: {total})", file=sys.stderr)
+
+        yield items
+
+        # 全件取得モードでない場合、または続きがない場合は終了
+        if not continuation:
+            if journal is not None:
+                journal.finish()
+            return
+
+        page += 1
 
-            continuation = data.get("continuation")
-            if not continuation:
-                break
 
-            page += 1
+def fetch_stream_contents(
+    token: str,
+    stream_id: str,
+    count: int = 100,
+    newer_than: int = None,
+    unread_only: bool = True,
+    fetch_all: bool = True,
+    strict: bool = False,
+    journals: PageJournals = None
+) -> list[dict]:
+    """
+    指定されたストリームから記事を取得
 
-        except requests.RequestException as e:
-            print(f"Error fetching stream {stream_id}: {e}", file=sys.stderr)
-            break
+    Args:
+        token: Feedly API token
+        stream_id: Feedly stream ID
+        count: 1回のリクエストで取得する記事数（最大1000）
+        newer_than: この時刻（Unix timestamp ms）より新しい記事のみ取得
+        unread_only: Trueの場合、未読記事のみを取得（デフォルト: True）
+        fetch_all: Trueの場合、continuationトークンを使って全件取得（デフォルト: True）
+        strict: Trueの場合、途中のエラーで部分結果を返さず例外を送出
+                （差分取得でチェックポイントが欠けた結果で進まないようにする）
+        journals: ページごとの途中経過の保存先（指定時は失敗したページから --resume で再開できる）
 
+    Returns:
+        記事リスト
+    """
+    all_articles = []
+    for items in iter_stream_pages(token, stream_id, count, newer_than, unread_only, fetch_all, strict, journals):
+        all_articles.extend(items)
     return all_articles
 
 
@@ -172,15 +440,25 @@ def extract_article_url(article: dict) -> str:
     return article.get("originId", "")
 
 
-def extract_article_data(article: dict) -> dict:
+def content_options(config: dict) -> dict:
+    """extract_article_data に渡す本文の保存形式（content_format / content_max_chars）"""
+    return {
+        "content_format": config.get("content_format", DEFAULT_CONTENT_FORMAT),
+        "max_chars": config.get("content_max_chars"),
+    }
+
+
+def extract_article_data(article: dict, content_format: str = DEFAULT_CONTENT_FORMAT, max_chars: int = None) -> dict:
     """
     記事データから必要な情報を抽出
 
     Args:
         article: Feedly API レスポンスの記事オブジェクト
+        content_format: 本文の保存形式（text / html / both）
+        max_chars: テキストに変換した本文の最大文字数（None: 制限なし）
 
     Returns:
-        正規化された記事データ
+        正規化された記事データ（content_format は content がテキストかHTMLか）
     """
     # 本文取得（content または summary）
     content = ""
@@ -192,7 +470,7 @@ def extract_article_data(article: dict) -> dict:
     # ソース情報
     origin = article.get("origin", {})
 
-    return {
+    data = {
         "id": article.get("id", ""),
         "title": article.get("title", "No Title"),
         "url": extract_article_url(article),
@@ -201,6 +479,7 @@ def extract_article_data(article: dict) -> dict:
         "updated": article.get("updated", 0),
         "author": article.get("author", ""),
         "content": content,
+        "content_format": "html",
         "engagement": article.get("engagement", 0),
         "engagement_rate": article.get("engagementRate", 0.0),
         "source": {
@@ -211,81 +490,242 @@ def extract_article_data(article: dict) -> dict:
         "keywords": article.get("keywords", []),
         "entities": [e.get("label", "") for e in article.get("entities", [])],
         "visual": article.get("visual", {}).get("url", ""),
+        "category_id": article_category_id(article),
     }
+    # 本文はテキストに変換して保存（スコアリングでタグ・属性値を照合しない）。HTMLは指定時のみ残す
+    if content_format != "html":
+        data["content"] = feedly_text.html_to_text(content, max_chars)
+        data["content_format"] = "text"
+        if content_format == "both":
+            data["content_html"] = content
+    return data
 
 
-def mark_entries_as_read(token: str, entry_ids: list[str]) -> dict:
+class MarkJournal:
+    """
+    既読にできたエントリーIDの記録（JSONL、1行1バッチ）
+
+    途中で失敗した --mark-read を再実行すると、記録済みのIDは送らない。
+    全件既読にできたら、そのIDを記録から除く。
+    """
+
+    def __init__(self, path: str = DEFAULT_MARK_JOURNAL_FILE):
+        self.path = expand_path(path)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "MarkJournal":
+        return cls(config.get("mark_read_journal", DEFAULT_MARK_JOURNAL_FILE))
+
+    def marked_ids(self) -> set:
+        """記録済みのエントリーID"""
+        marked = set()
+        if not self.path.exists():
+            return marked
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    marked.update(json.loads(line).get("ids", []))
+                except ValueError:
+                    continue  # 書き込み途中で終了した行
+        return marked
+
+    def record(self, entry_ids: list[str]):
+        """既読にできたIDを追記"""
+        line = json.dumps({"marked_at": datetime.now().isoformat(timespec="seconds"), "ids": entry_ids})
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def discard(self, entry_ids: list[str]):
+        """IDを記録から除く（残りがなければファイルを削除）"""
+        done = set(entry_ids)
+        with self.lock:
+            remaining = sorted(self.marked_ids() - done)
+            if not remaining:
+                self.path.unlink(missing_ok=True)
+                return
+            line = json.dumps({"marked_at": datetime.now().isoformat(timespec="seconds"), "ids": remaining})
+            self.path.write_text(line + "\n", encoding="utf-8")
+
+
+def post_marker(headers: dict, payload: dict) -> str | None:
+    """
+    markers API に送信し、失敗したら間隔を空けて送り直す
+
+    Returns:
+        最後のエラー（成功した場合は None）
+    """
+    error = None
+    for attempt in range(MARK_RETRIES + 1):
+        if attempt:
+            time.sleep(MARK_RETRY_WAIT_SECONDS * (2 ** (attempt - 1)))
+        try:
+            resp = feedly_http.post(
+                f"{FEEDLY_API_BASE}/markers",
+                headers=headers,
+                json=payload,
+                timeout=30
+            )
+            if resp.status_code == 200:
+                return None
+            error = f"API error: {resp.status_code} - {resp.text}"
+        except requests.RequestException as e:
+            error = f"Request error: {e}"
+    return error
+
+
+def mark_entries_as_read(
+    token: str,
+    entry_ids: list[str],
+    categories: list[dict] = None,
+    journal: MarkJournal = None,
+    max_workers: int = DEFAULT_MARK_WORKERS
+) -> dict:
     """
     記事を既読にマークする
 
+    カテゴリの全記事が対象に含まれる場合（categories）はカテゴリ単位で asOf を指定して
+    1リクエストで既読にし、残りのIDは1000件ずつのバッチを max_workers 件ずつ並列に送る。
+    失敗したリクエストは間隔を空けて送り直し、それでも失敗したカテゴリはIDで送る。
+
     Args:
         token: Feedly API token
         entry_ids: 既読にする記事IDリスト
+        categories: カテゴリ単位で既読にできるもの
+                    [{"category_id": ストリームID, "as_of": crawled (ms), "entry_ids": [...]}]
+        journal: 既読にできたIDの記録（記録済みのIDは送らない）
+        max_workers: 同時に送るバッチ数
 
     Returns:
-        dict: {"success": bool, "marked_count": int, "error": str or None}
+        dict: {"success": bool, "marked_count": int, "error": str or None,
+               "marked_ids": 既読にできたID（記録済みを含む）, "failed_ids": 既読にできなかったID,
+               "skipped_count": 記録済みで送らなかった件数, "category_count": カテゴリ単位で既読にした数}
     """
-    if not entry_ids:
-        return {"success": True, "marked_count": 0, "error": None}
+    entry_ids = list(dict.fromkeys(entry_ids))
+    already = journal.marked_ids() & set(entry_ids) if journal is not None else set()
+    result = {
+        "success": True,
+        "marked_count": 0,
+        "error": None,
+        "marked_ids": [i for i in entry_ids if i in already],
+        "failed_ids": [],
+        "skipped_count": len(already),
+        "category_count": 0,
+    }
+    pending = [i for i in entry_ids if i not in already]
+    if not pending:
+        return result
 
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
 
-    # Feedly APIは1リクエストあたり1000件まで
-    batch_size = 1000
-    total_marked = 0
-
-    for i in range(0, len(entry_ids), batch_size):
-        batch = entry_ids[i:i + batch_size]
-        payload = {
+    def confirm(ids: list[str]):
+        result["marked_ids"].extend(ids)
+        result["marked_count"] += len(ids)
+        if journal is not None:
+            journal.record(ids)
+
+    # カテゴリ単位（asOf）: 成功したカテゴリの記事はIDで送らない
+    remaining = set(pending)
+    for category in categories or []:
+        ids = [i for i in category["entry_ids"] if i in remaining]
+        if not ids:
+            continue
+        error = post_marker(headers, {
             "action": "markAsRead",
-            "type": "entries",
-            "entryIds": batch
-        }
+            "type": "categories",
+            "categoryIds": [category["category_id"]],
+            "asOf": category["as_of"],
+        })
+        if error is None:
+            confirm(ids)
+            remaining.difference_update(ids)
+            result["category_count"] += 1
+        else:
+            print(f"  Category {category['category_id']}: {error} (marking by entry id)", file=sys.stderr)
+    pending = [i for i in pending if i in remaining]
 
-        try:
-            resp = requests.post(
-                f"{FEEDLY_API_BASE}/markers",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            if resp.status_code == 200:
-                total_marked += len(batch)
+    # Feedly APIは1リクエストあたり1000件まで
+    batches = [pending[i:i + MARK_BATCH_SIZE] for i in range(0, len(pending), MARK_BATCH_SIZE)]
+
+    def send_batch(batch: list[str]) -> str | None:
+        error = post_marker(headers, {"action": "markAsRead", "type": "entries", "entryIds": batch})
+        if error is None and journal is not None:
+            journal.record(batch)
+        return error
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for batch, error in zip(batches, executor.map(send_batch, batches)):
+            if error is None:
+                result["marked_ids"].extend(batch)
+                result["marked_count"] += len(batch)
             else:
-                return {
-                    "success": False,
-                    "marked_count": total_marked,
-                    "error": f"API error: {resp.status_code} - {resp.text}"
-                }
-        except requests.RequestException as e:
-            return {
-                "success": False,
-                "marked_count": total_marked,
-                "error": f"Request error: {e}"
-            }
+                result["failed_ids"].extend(batch)
+                result["success"] = False
+                result["error"] = error
 
-    return {"success": True, "marked_count": total_marked, "error": None}
+    # 全件既読にできたら記録を消す（失敗が残る場合は再実行のために残す）
+    if result["success"] and journal is not None:
+        journal.discard(entry_ids)
+    return result
 
 
-def extract_entry_ids_from_json(json_file: str) -> list[str]:
+def category_markers(data: dict) -> list[dict]:
     """
-    取得済みJSONファイルから記事IDを抽出
+    カテゴリ単位（asOf）で既読にできるカテゴリ
+
+    全未読記事を取得できた出力（metadata.complete）では、各カテゴリの未読記事は
+    すべて出力に含まれるため、カテゴリ内の最新の crawled を asOf にすれば
+    出力にない記事を既読にしない。カテゴリIDはエントリーの categories[0].id（stream_id）を使い、
+    全記事の category_id がそれと一致するカテゴリだけを対象にする。
+    crawled・category_id のない記事（--fields で除いた、以前の出力等）を含むカテゴリは対象外。
+    """
+    if not data.get("metadata", {}).get("complete"):
+        return []
+    markers = []
+    for slug, category in data.get("categories", {}).items():
+        articles = category.get("articles", [])
+        stream_id = category.get("stream_id")
+        if slug == "uncategorized" or not articles or not is_category_stream_id(stream_id):
+            continue
+        if not all(article.get("crawled") and article.get("category_id") == stream_id for article in articles):
+            continue
+        markers.append({
+            "category_id": category["stream_id"],
+            "as_of": max(article["crawled"] for article in articles),
+            "entry_ids": [article["id"] for article in articles if article.get("id")],
+        })
+    return markers
+
+
+def extract_mark_targets(json_file: str) -> tuple[list[str], list[dict]]:
+    """
+    取得済みJSONファイルから既読にする記事IDとカテゴリ単位で既読にできるカテゴリを抽出
 
     Args:
         json_file: feedly_fetch.pyの出力JSONファイル
 
     Returns:
-        記事IDリスト
+        tuple: (記事IDリスト, category_markers の結果（JSONLでは空）)
     """
     path = expand_path(json_file)
     if not path.exists():
         raise FileNotFoundError(f"JSON file not found: {path}")
 
-    data = json.loads(path.read_text())
     entry_ids = []
+    # gzip / zstd で圧縮した出力もそのまま読む
+    with feedly_io.open_read(path) as f:
+        if is_jsonl_path(json_file):
+            for line in f:
+                record = json.loads(line) if line.strip() else {}
+                if record.get("id"):
+                    entry_ids.append(record["id"])
+            return entry_ids, []
+        data = json.load(f)
 
     for category in data.get("categories", {}).values():
         for article in category.get("articles", []):
@@ -293,65 +733,76 @@ def extract_entry_ids_from_json(json_file: str) -> list[str]:
             if article_id:
                 entry_ids.append(article_id)
 
-    return entry_ids
+    return entry_ids, category_markers(data)
 
 
-def fetch_global_all(config: dict, token: str, include_read: bool = False) -> dict:
-    """
-    global.allストリームから全記事を一括取得し、カテゴリごとにグループ化
+def load_checkpoints(checkpoint_file: str) -> dict:
+    """差分取得のチェックポイント {stream_id: 最新のcrawled (ms)} を読み込む"""
+    path = expand_path(checkpoint_file)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
 
-    Args:
-        config: 設定辞書
-        token: API token
-        include_read: Trueの場合、既読記事も含める（デフォルト: False = 未読のみ）
 
-    Returns:
-        カテゴリ別の記事辞書
-    """
-    fetch_count = config.get("fetch_count", 1000)  # global.allでは多めに
-    unread_only = config.get("unread_only", True)
-    if include_read:
-        unread_only = False
+def save_checkpoints(checkpoint_file: str, checkpoints: dict):
+    """差分取得のチェックポイントを保存"""
+    path = expand_path(checkpoint_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(checkpoints, ensure_ascii=False, indent=2))
 
-    # ユーザーIDを取得
-    user_id = get_user_id(token)
-    global_all_id = f"user/{user_id}/category/global.all"
 
-    mode_str = "未読のみ" if unread_only else "全記事（既読含む）"
-    print(f"取得モード: {mode_str} (global.all)", file=sys.stderr)
-    print(f"Fetching all articles...", file=sys.stderr)
-
-    raw_articles = fetch_stream_contents(
-        token=token,
-        stream_id=global_all_id,
-        count=fetch_count,
-        newer_than=None,  # 時間制限なし
-        unread_only=unread_only
-    )
+def article_category_id(article: dict) -> str:
+    """記事の最初のカテゴリのID（Feedly の categories[0].id、カテゴリなしは空文字）"""
+    categories = article.get("categories", [])
+    if not categories:
+        return ""
+    return categories[0].get("id", "")
 
-    print(f"  → {len(raw_articles)} articles", file=sys.stderr)
 
-    # カテゴリごとにグループ化
+def is_category_stream_id(stream_id: str | None) -> bool:
+    """ユーザーカテゴリのストリームIDか（global.all 等のシステムカテゴリ・空は除く）"""
+    if not stream_id or not stream_id.startswith("user/"):
+        return False
+    kind, _, name = stream_id.split("/", 2)[-1].partition("/")
+    return kind == "category" and bool(name) and not name.startswith("global.")
+
+
+def article_category_label(article: dict) -> str:
+    """記事の最初のカテゴリ名（カテゴリなしは "uncategorized"）"""
+    categories = article.get("categories", [])
+    if not categories:
+        return "uncategorized"
+    return categories[0].get("label", "unknown")
+
+
+def category_slug(cat_label: str, config_categories: dict) -> str:
+    """Feedlyのカテゴリ名からslugを決定"""
+    if cat_label == "uncategorized":
+        # カテゴリなしの場合は "uncategorized" に分類
+        return "uncategorized"
+    # 設定ファイルのカテゴリ名からslugを取得
+    if cat_label in config_categories:
+        return config_categories[cat_label].get("slug", cat_label.lower())
+    return cat_label.lower().replace(" ", "-")
+
+
+def group_articles_by_category(records: list, config: dict) -> dict:
+    """
+    (カテゴリ名, 記事データ) のリストをカテゴリごとにグループ化
+
+    stream_id はエントリーの categories[0].id（記事データの category_id）。
+    カテゴリ名から組み立てたIDはFeedly上のIDと一致するとは限らないため使わない。
+    IDのない記事・IDが食い違う記事を含むカテゴリは None。
+
+    Returns:
+        カテゴリ別の記事辞書
+    """
     results = {}
+    category_ids = defaultdict(set)
     config_categories = {cat.get("name"): cat for cat in config.get("categories", [])}
 
-    for article in raw_articles:
-        article_data = extract_article_data(article)
-
-        # 記事のカテゴリ情報を取得
-        categories = article.get("categories", [])
-        if not categories:
-            # カテゴリなしの場合は "uncategorized" に分類
-            cat_label = "uncategorized"
-            cat_slug = "uncategorized"
-        else:
-            # 最初のカテゴリを使用
-            cat_label = categories[0].get("label", "unknown")
-            # 設定ファイルのカテゴリ名からslugを取得
-            if cat_label in config_categories:
-                cat_slug = config_categories[cat_label].get("slug", cat_label.lower())
-            else:
-                cat_slug = cat_label.lower().replace(" ", "-")
+    for cat_label, article_data in records:
+        cat_slug = category_slug(cat_label, config_categories)
 
         if cat_slug not in results:
             # 設定ファイルからキーワード等を取得
@@ -359,7 +810,7 @@ def fetch_global_all(config: dict, token: str, include_read: bool = False) -> di
             results[cat_slug] = {
                 "name": cat_label,
                 "slug": cat_slug,
-                "stream_id": f"user/{user_id}/category/{cat_label}",
+                "stream_id": None,
                 "keywords": cat_config.get("keywords", []),
                 "trusted_sources": cat_config.get("trusted_sources", {}),
                 "articles": [],
@@ -369,6 +820,223 @@ def fetch_global_all(config: dict, token: str, include_read: bool = False) -> di
 
         results[cat_slug]["articles"].append(article_data)
         results[cat_slug]["count"] += 1
+        category_ids[cat_slug].add(article_data.get("category_id") or "")
+
+    for cat_slug, ids in category_ids.items():
+        if len(ids) == 1 and "" not in ids:
+            results[cat_slug]["stream_id"] = next(iter(ids))
+    return results
+
+
+def cutoff_ms(hours: float) -> int:
+    """現在から hours 時間前の時刻 (ms)"""
+    return int((datetime.now() - timedelta(hours=hours)).timestamp() * 1000)
+
+
+def stream_newer_than(stream_id: str, checkpoints: dict = None, time_range_hours: int = None) -> int | None:
+    """取得開始時刻 (ms): チェックポイントと time_range_hours の新しい方"""
+    newer_than = None
+    if time_range_hours:
+        newer_than = cutoff_ms(time_range_hours)
+    if checkpoints and checkpoints.get(stream_id):
+        newer_than = max(newer_than or 0, checkpoints[stream_id])
+    return newer_than
+
+
+def advance_checkpoint(checkpoints: dict, stream_id: str, raw_articles: list):
+    """取得した記事の最新crawledまでチェックポイントを進める"""
+    if checkpoints is None or not raw_articles:
+        return
+    newest = max(a.get("crawled", 0) for a in raw_articles)
+    checkpoints[stream_id] = max(newest, checkpoints.get(stream_id, 0))
+
+
+def update_article_store(store: feedly_store.ArticleStore, records: list, config: dict) -> tuple[int, int]:
+    """
+    (カテゴリ名, 記事データ) をストアに upsert し、古い記事を削除
+
+    time_range_hours と article_store_retention_days（デフォルト14日）の
+    新しい方より前にクロールされた記事を削除する。
+
+    Returns:
+        tuple: (追加・更新件数, 削除件数)
+    """
+    config_categories = {cat.get("name"): cat for cat in config.get("categories", [])}
+    upserted = store.upsert(
+        (cat_label, category_slug(cat_label, config_categories), article_data)
+        for cat_label, article_data in records
+    )
+    cutoffs = []
+    if config.get("time_range_hours"):
+        cutoffs.append(cutoff_ms(config["time_range_hours"]))
+    retention_days = config.get("article_store_retention_days", feedly_store.DEFAULT_RETENTION_DAYS)
+    if retention_days:
+        cutoffs.append(cutoff_ms(retention_days * 24))
+    pruned = store.prune(max(cutoffs)) if cutoffs else 0
+    return upserted, pruned
+
+
+def fetch_category_shards(
+    token: str,
+    streams: dict,
+    count: int,
+    unread_only: bool = True,
+    checkpoints: dict = None,
+    time_range_hours: int = None,
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+    journals: PageJournals = None
+) -> list[dict]:
+    """
+    カテゴリストリームを並列に取得し、複数カテゴリに属する記事をエントリーIDで重複除去
+
+    所要時間は全件ではなく最大のカテゴリの件数に比例する。
+
+    Args:
+        token: API token
+        streams: 取得するカテゴリ（{カテゴリ名: ストリームID}、resolve_category_streams の結果）
+        count: 1回のリクエストで取得する記事数
+        unread_only: Trueの場合、未読記事のみを取得
+        checkpoints: 差分取得のチェックポイント（カテゴリストリームごとに参照・更新）
+        time_range_hours: 取得対象期間
+        max_workers: 同時に取得するカテゴリ数
+        journals: ページごとの途中経過の保存先（カテゴリストリームごとに保存・再開）
+
+    Returns:
+        記事リスト（新しい順）
+    """
+    strict = checkpoints is not None
+
+    def fetch_shard(stream_id: str) -> list[dict]:
+        return fetch_stream_contents(
+            token=token,
+            stream_id=stream_id,
+            count=count,
+            newer_than=stream_newer_than(stream_id, checkpoints, time_range_hours),
+            unread_only=unread_only,
+            strict=strict,
+            journals=journals
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        shards = list(executor.map(fetch_shard, streams.values()))
+
+    # strictで途中失敗した場合は上の map で例外になり、チェックポイントは進まない
+    seen = set()
+    raw_articles = []
+    for (label, stream_id), items in zip(streams.items(), shards):
+        print(f"  - {label}: {len(items)} articles", file=sys.stderr)
+        advance_checkpoint(checkpoints, stream_id, items)
+        for article in items:
+            entry_id = article.get("id")
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            raw_articles.append(article)
+
+    # global.all と同じく新しい順に並べる
+    raw_articles.sort(key=lambda a: -a.get("crawled", 0))
+    return raw_articles
+
+
+def fetch_global_all(
+    config: dict,
+    token: str,
+    include_read: bool = False,
+    checkpoints: dict = None,
+    store: feedly_store.ArticleStore = None,
+    from_store: bool = False,
+    fetch_mode: str = "global",
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+    journals: PageJournals = None
+) -> dict:
+    """
+    global.allストリームから全記事を一括取得し、カテゴリごとにグループ化
+
+    Args:
+        config: 設定辞書
+        token: API token
+        include_read: Trueの場合、既読記事も含める（デフォルト: False = 未読のみ）
+        checkpoints: 差分取得のチェックポイント（指定時は前回の最新crawled以降のみ取得し、
+                     取得後に更新される）
+        store: ローカルの記事ストア（指定時は取得記事をエントリーIDで upsert）
+        from_store: Trueの場合、取得分ではなくストア全体を返す（差分取得用）
+        fetch_mode: "global" = global.allを1本で取得、
+                    "categories" = 設定ファイルのカテゴリごとに並列取得
+        max_workers: "categories" モードで同時に取得するカテゴリ数
+        journals: ページごとの途中経過の保存先（--resume で続きから取得）
+
+    Returns:
+        カテゴリ別の記事辞書
+    """
+    fetch_count = config.get("fetch_count", 1000)  # global.allでは多めに
+    unread_only = config.get("unread_only", True)
+    if include_read:
+        unread_only = False
+
+    # ユーザーIDを取得
+    with feedly_trace.stage("profile"):
+        user_id = get_user_id(token)
+    global_all_id = f"user/{user_id}/category/global.all"
+    time_range_hours = config.get("time_range_hours")
+
+    mode_str = "未読のみ" if unread_only else "全記事（既読含む）"
+    if fetch_mode == "categories":
+        labels = [cat["name"] for cat in config.get("categories", []) if cat.get("name")]
+        print(f"取得モード: {mode_str} (カテゴリ別 {len(labels)}件, 並列 {max_workers})", file=sys.stderr)
+        with feedly_trace.stage("categories"):
+            streams = resolve_category_streams(token, labels)
+        with feedly_trace.stage("pages", mode="categories"):
+            raw_articles = fetch_category_shards(
+                token,
+                streams,
+                count=fetch_count,
+                unread_only=unread_only,
+                checkpoints=checkpoints,
+                time_range_hours=time_range_hours,
+                max_workers=max_workers,
+                journals=journals
+            )
+    else:
+        newer_than = stream_newer_than(global_all_id, checkpoints, time_range_hours)
+        print(f"取得モード: {mode_str} (global.all)", file=sys.stderr)
+        if checkpoints is not None and newer_than:
+            since = datetime.fromtimestamp(newer_than / 1000).isoformat(timespec="seconds")
+            print(f"Fetching articles newer than {since}...", file=sys.stderr)
+        else:
+            print(f"Fetching all articles...", file=sys.stderr)
+
+        with feedly_trace.stage("pages", mode="global"):
+            raw_articles = fetch_stream_contents(
+                token=token,
+                stream_id=global_all_id,
+                count=fetch_count,
+                newer_than=newer_than,
+                unread_only=unread_only,
+                strict=checkpoints is not None,
+                journals=journals
+            )
+        # 全ページ取得できた場合のみチェックポイントを進める（strictで途中失敗は例外）
+        advance_checkpoint(checkpoints, global_all_id, raw_articles)
+
+    print(f"  → {len(raw_articles)} articles", file=sys.stderr)
+
+    options = content_options(config)
+    with feedly_trace.stage("extract"):
+        records = [(article_category_label(a), extract_article_data(a, **options)) for a in raw_articles]
+
+    if store is not None:
+        with feedly_trace.stage("store"):
+            upserted, pruned = update_article_store(store, records, config)
+            print(
+                f"  → 記事ストア: {store.count()}件（新規・更新 {upserted}件, 期限切れ削除 {pruned}件）",
+                file=sys.stderr
+            )
+            if from_store:
+                records = [(cat_label, article) for cat_label, _, article in store.iter_records()]
+
+    # カテゴリごとにグループ化
+    with feedly_trace.stage("extract"):
+        results = group_articles_by_category(records, config)
 
     # カテゴリ別の件数を表示
     for slug, data in sorted(results.items(), key=lambda x: -x[1]["count"]):
@@ -377,6 +1045,170 @@ def fetch_global_all(config: dict, token: str, include_read: bool = False) -> di
     return results
 
 
+def write_mapping_file(output_path: Path, url_to_entry_id: dict):
+    """URL → エントリーIDマッピングを出力ファイルと同じディレクトリに書き出す"""
+    mapping_path = output_path.parent / "url_to_entry_id.json"
+    mapping_path.write_text(json.dumps(url_to_entry_id, ensure_ascii=False, indent=2))
+    print(f"Mapping file written to: {mapping_path}", file=sys.stderr)
+
+
+def is_jsonl_path(path: str) -> bool:
+    """拡張子が .jsonl のファイルか（圧縮の拡張子 .gz / .zst は除いて判定）"""
+    return feedly_io.strip_compression_suffix(path).endswith(".jsonl")
+
+
+def parse_fields(value: str) -> list | None:
+    """--fields の値（カンマ区切り）をフィールド名のリストにする"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def project_fields(article_data: dict, fields: list = None) -> dict:
+    """
+    記事データを指定したフィールドだけに絞る
+
+    id と url は既読マーク・URL → エントリーIDマッピングに使うため常に残す。
+    content を残す場合は、テキストかHTMLかを示す content_format と
+    元のHTML（both の content_html）も残す。
+    """
+    if not fields:
+        return article_data
+    keep = {"id", "url", *fields}
+    if "content" in keep:
+        keep.update(CONTENT_COMPANION_FIELDS)
+    return {key: article_data[key] for key in article_data if key in keep}
+
+
+def dump_json(data, compact: bool = False) -> str:
+    """JSON文字列（compact: インデント・区切りの空白なし）"""
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def jsonl_article_line(
+    article_data: dict,
+    cat_label: str,
+    config_categories: dict,
+    fields: list = None,
+    compact: bool = False
+) -> str:
+    """
+    JSONL出力の1行（記事データにカテゴリ情報を埋め込む）
+
+    カテゴリ情報のキーは feedly_score.py が記事に付与するものと同じ
+    （_category_slug / _category_name / _category_keywords）。
+    fields を指定すると記事データをそのフィールドだけに絞る。
+    """
+    cat_config = config_categories.get(cat_label, {})
+    record = dict(
+        project_fields(article_data, fields),
+        _category_slug=category_slug(cat_label, config_categories),
+        _category_name=cat_label,
+        _category_keywords=cat_config.get("keywords", []),
+    )
+    if compact:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def write_jsonl_records(
+    out,
+    records,
+    config: dict,
+    url_to_entry_id: dict,
+    fields: list = None,
+    compact: bool = False
+) -> dict:
+    """
+    (カテゴリ名, 記事データ) を1行1記事で順次書き出す
+
+    Args:
+        out: 書き出し先（テキストストリーム）
+        records: (カテゴリ名, 記事データ) のイテラブル（ジェネレータ可）
+        config: 設定辞書
+        url_to_entry_id: URL → エントリーIDマッピング（書き出しながら追記される）
+        fields: 書き出すフィールド（None: 全フィールド）
+        compact: 区切りの空白を省く
+
+    Returns:
+        {カテゴリ名: 件数}
+    """
+    config_categories = {cat.get("name"): cat for cat in config.get("categories", [])}
+    counts = defaultdict(int)
+    for cat_label, article_data in records:
+        out.write(jsonl_article_line(article_data, cat_label, config_categories, fields, compact))
+        counts[cat_label] += 1
+        if article_data["url"] and article_data["id"]:
+            url_to_entry_id[article_data["url"]] = article_data["id"]
+    return counts
+
+
+def stream_global_all_jsonl(
+    config: dict,
+    token: str,
+    out,
+    include_read: bool = False,
+    store: feedly_store.ArticleStore = None,
+    fields: list = None,
+    compact: bool = False,
+    journals: PageJournals = None
+) -> tuple[int, dict]:
+    """
+    global.allストリームをページ取得ごとにJSONLで書き出す（全件をメモリに保持しない）
+
+    Args:
+        config: 設定辞書
+        token: API token
+        out: 書き出し先（テキストストリーム）
+        include_read: Trueの場合、既読記事も含める
+        store: ローカルの記事ストア（指定時はページごとに upsert、フィールドは絞らない）
+        fields: 書き出すフィールド（None: 全フィールド）
+        compact: 区切りの空白を省く
+        journals: ページごとの途中経過の保存先（--resume で続きから取得）
+
+    Returns:
+        tuple: (書き出した記事数, URL → エントリーIDマッピング)
+    """
+    fetch_count = config.get("fetch_count", 1000)
+    unread_only = config.get("unread_only", True) and not include_read
+    with feedly_trace.stage("profile"):
+        user_id = get_user_id(token)
+    global_all_id = f"user/{user_id}/category/global.all"
+    newer_than = stream_newer_than(global_all_id, time_range_hours=config.get("time_range_hours"))
+
+    mode_str = "未読のみ" if unread_only else "全記事（既読含む）"
+    print(f"取得モード: {mode_str} (global.all, JSONL)", file=sys.stderr)
+
+    options = content_options(config)
+    url_to_entry_id = {}
+    counts = defaultdict(int)
+    pages = iter_stream_pages(token, global_all_id, fetch_count, newer_than, unread_only, journals=journals)
+    while True:
+        # ページ取得・抽出・書き出しが交互に進むため、ページごとに各段階を記録する
+        with feedly_trace.stage("pages", mode="global"):
+            items = next(pages, None)
+        if items is None:
+            break
+        with feedly_trace.stage("extract"):
+            records = [(article_category_label(a), extract_article_data(a, **options)) for a in items]
+        with feedly_trace.stage("write"):
+            for cat_label, count in write_jsonl_records(out, records, config, url_to_entry_id, fields, compact).items():
+                counts[cat_label] += count
+            out.flush()
+        if store is not None:
+            with feedly_trace.stage("store"):
+                update_article_store(store, records, config)
+
+    total = sum(counts.values())
+    print(f"  → {total} articles", file=sys.stderr)
+    for cat_label, count in sorted(counts.items(), key=lambda x: -x[1]):
+        print(f"  - {cat_label}: {count}件", file=sys.stderr)
+
+    return total, url_to_entry_id
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch articles from Feedly API")
     parser.add_argument(
@@ -399,18 +1231,119 @@ def main():
         default="~/.feedly/token",
         help="Path to token file (default: ~/.feedly/token)"
     )
-    parser.add_argument(
+    mark_group = parser.add_mutually_exclusive_group()
+    mark_group.add_argument(
         "--mark-read",
         metavar="JSON_FILE",
-        help="Mark all articles in the specified JSON file as read"
+        help="Mark all articles in the specified JSON/JSONL file as read"
+    )
+    mark_group.add_argument(
+        "--mark-read-store",
+        action="store_true",
+        help="Mark every article in the local article store as read"
     )
     parser.add_argument(
         "--include-read",
         action="store_true",
         help="Include already-read articles (default: unread only)"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fetch only entries newer than the last checkpoint and merge them into the local article store"
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Do not write fetched articles into the local article store"
+    )
+    parser.add_argument(
+        "--store-only",
+        action="store_true",
+        help="Only update the local article store (no JSON output or mapping file)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore checkpoints and re-fetch everything (resets the article store in incremental mode)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted fetch from the last page saved in the resume directory "
+             "(pages fetched so far are reused instead of downloaded again)"
+    )
+    parser.add_argument(
+        "--fetch-mode",
+        choices=["global", "categories"],
+        default=None,
+        help="global: one global.all stream; categories: fetch each configured category stream in parallel "
+             "(default: config fetch_mode or global)"
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=None,
+        help=f"Concurrent category fetches in categories mode (default: config fetch_workers or {DEFAULT_FETCH_WORKERS})"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl"],
+        default=None,
+        help="Output format (default: jsonl if --output ends with .jsonl, otherwise json). "
+             "jsonl writes one article per line as pages arrive"
+    )
+    parser.add_argument(
+        "--fields",
+        metavar="FIELDS",
+        help="Comma-separated article fields to write, e.g. id,title,url,crawled,engagement,source "
+             "(id and url are always kept; default: all fields)"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON without indentation or separator spaces"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=feedly_io.COMPRESSIONS,
+        default=None,
+        help="Compress the output file (default: by extension, .gz = gzip, .zst = zstd; "
+             "zstd requires the zstandard package)"
+    )
+    parser.add_argument(
+        "--content-format",
+        choices=feedly_text.CONTENT_FORMATS,
+        default=None,
+        help="Article body format: text (HTML converted to plain text), html (raw HTML) "
+             "or both (text plus raw HTML in content_html) (default: config content_format or text)"
+    )
+    parser.add_argument(
+        "--content-max-chars",
+        type=int,
+        default=None,
+        help="Truncate the plain-text body to this many characters (default: config content_max_chars or no limit)"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE_FILE",
+        help="Record per-stage wall/CPU time, peak RSS and HTTP counters to this file"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=feedly_trace.TRACE_FORMATS,
+        default="json",
+        help="Trace file format: json (stage summary + events) or chrome (trace event format) (default: json)"
+    )
 
     args = parser.parse_args()
+    if args.compress not in (None, "none") and args.output == "-":
+        parser.error("--compress requires --output FILE")
+
+    # 計測（途中で終了した場合も終了時に書き出す）
+    if args.trace:
+        feedly_trace.enable()
+        atexit.register(feedly_trace.write, args.trace, args.trace_format)
 
     # トークン読み込み
     try:
@@ -433,17 +1366,49 @@ def main():
         sys.exit(0 if success else 1)
 
     # 既読マークモード
-    if args.mark_read:
+    if args.mark_read is not None or args.mark_read_store:
+        # 既読にした記事をストアから除く（--no-store / article_store: false ではストアを開かない）
+        use_store = not (args.no_store or config.get("article_store") is False)
+        if args.mark_read_store and not use_store:
+            print("Error: --mark-read-store requires the local article store "
+                  "(remove --no-store / article_store: false)", file=sys.stderr)
+            sys.exit(1)
+        store = feedly_store.ArticleStore.from_config(config) if use_store else None
         try:
-            entry_ids = extract_entry_ids_from_json(args.mark_read)
+            categories = []
+            if args.mark_read_store:
+                entry_ids = store.entry_ids()
+            else:
+                entry_ids, categories = extract_mark_targets(args.mark_read)
             print(f"Marking {len(entry_ids)} articles as read...", file=sys.stderr)
-            result = mark_entries_as_read(token, entry_ids)
+            with feedly_trace.stage("mark_read"):
+                result = mark_entries_as_read(
+                    token,
+                    entry_ids,
+                    categories=categories,
+                    journal=MarkJournal.from_config(config),
+                    max_workers=config.get("mark_read_workers", DEFAULT_MARK_WORKERS)
+                )
+            # 既読にした記事は記事ストアからも除く
+            if store is not None:
+                store.delete(result["marked_ids"])
+                store.close()
+            details = []
+            if result["category_count"]:
+                details.append(f"{result['category_count']} categories by asOf")
+            if result["skipped_count"]:
+                details.append(f"{result['skipped_count']} already marked in a previous run")
+            suffix = f" ({', '.join(details)})" if details else ""
             if result["success"]:
-                print(f"✓ Marked {result['marked_count']} articles as read", file=sys.stderr)
+                print(f"✓ Marked {len(result['marked_ids'])} articles as read{suffix}", file=sys.stderr)
                 sys.exit(0)
             else:
                 print(f"✗ Error: {result['error']}", file=sys.stderr)
-                print(f"  Partially marked: {result['marked_count']} articles", file=sys.stderr)
+                print(f"  Partially marked: {len(result['marked_ids'])} articles{suffix}", file=sys.stderr)
+                print(
+                    f"  {len(result['failed_ids'])} articles failed; rerun the same command to retry only those",
+                    file=sys.stderr
+                )
                 sys.exit(1)
         except FileNotFoundError as e:
             print(f"Error: {e}", file=sys.stderr)
@@ -451,7 +1416,110 @@ def main():
 
     # 記事取得（global.allから一括取得）
     config = load_config(args.config)
-    results = fetch_global_all(config, token, include_read=args.include_read)
+    # 本文の保存形式はコマンドライン指定を優先
+    if args.content_format:
+        config["content_format"] = args.content_format
+    if args.content_max_chars is not None:
+        config["content_max_chars"] = args.content_max_chars
+    incremental = args.incremental or config.get("incremental", False)
+    output_format = args.format or ("jsonl" if is_jsonl_path(args.output) else "json")
+    fields = parse_fields(args.fields)
+    # 圧縮: --compress 指定時は拡張子（.gz / .zst）を補う
+    if args.compress and args.output != "-":
+        args.output = feedly_io.with_compression_suffix(args.output, args.compress)
+    compression = args.compress or feedly_io.compression_for_path(args.output)
+    if compression == "zstd" and feedly_io.zstandard is None:
+        print("Error: zstandard not installed. Run: pip install zstandard", file=sys.stderr)
+        sys.exit(1)
+    fetch_mode = args.fetch_mode or config.get("fetch_mode", "global")
+    fetch_workers = args.fetch_workers or config.get("fetch_workers", DEFAULT_FETCH_WORKERS)
+
+    # 記事ストア: 差分取得・--store-only では必須、それ以外は --no-store / article_store: false で無効
+    use_store = incremental or args.store_only or not (args.no_store or config.get("article_store") is False)
+    store = feedly_store.ArticleStore.from_config(config) if use_store else None
+    # ページごとの途中経過（失敗したら --resume で続きから取得）
+    journals = PageJournals.from_config(config, resume=args.resume)
+
+    # JSONL（global.allの全件取得）: ページ取得ごとに書き出し、全件をメモリに保持しない
+    if output_format == "jsonl" and not incremental and not args.store_only and fetch_mode == "global":
+        if args.output == "-":
+            total, url_to_entry_id = stream_global_all_jsonl(
+                config, token, sys.stdout, args.include_read, store, fields, args.compact, journals
+            )
+        else:
+            output_path = expand_path(args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with feedly_io.open_write(output_path, compression) as out:
+                total, url_to_entry_id = stream_global_all_jsonl(
+                    config, token, out, args.include_read, store, fields, args.compact, journals
+                )
+            print(f"Output written to: {output_path} ({total} articles)", file=sys.stderr)
+            write_mapping_file(output_path, url_to_entry_id)
+        if store is not None:
+            store.close()
+        feedly_http.print_stats()
+        return
+
+    checkpoints = None
+    if incremental:
+        checkpoint_file = config.get("checkpoint_file", DEFAULT_CHECKPOINT_FILE)
+        # --full: チェックポイントと記事ストアを作り直す
+        checkpoints = {} if args.full else load_checkpoints(checkpoint_file)
+        if args.full:
+            store.clear()
+
+    try:
+        results = fetch_global_all(
+            config,
+            token,
+            include_read=args.include_read,
+            checkpoints=checkpoints,
+            store=store,
+            from_store=incremental,
+            fetch_mode=fetch_mode,
+            max_workers=fetch_workers,
+            journals=journals
+        )
+    except requests.RequestException as e:
+        # 差分取得では部分的な結果でチェックポイントを進めない
+        print(f"Error: {e}", file=sys.stderr)
+        print(
+            "Checkpoint not updated; rerun with --resume to continue from the last fetched page",
+            file=sys.stderr
+        )
+        sys.exit(1)
+    except ValueError as e:
+        # 設定ファイルのカテゴリ名がFeedlyにない（カテゴリ別取得）
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if store is not None:
+            store.close()
+
+    if incremental:
+        save_checkpoints(checkpoint_file, checkpoints)
+
+    if args.store_only:
+        print("Article store updated (no JSON output)", file=sys.stderr)
+        feedly_http.print_stats()
+        return
+
+    # 差分取得・カテゴリ別取得のJSONL: 取得結果を1行1記事で書き出す
+    if output_format == "jsonl":
+        records = ((cat["name"], a) for cat in results.values() for a in cat["articles"])
+        url_to_entry_id = {}
+        with feedly_trace.stage("write"):
+            if args.output == "-":
+                write_jsonl_records(sys.stdout, records, config, url_to_entry_id, fields, args.compact)
+            else:
+                output_path = expand_path(args.output)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with feedly_io.open_write(output_path, compression) as out:
+                    write_jsonl_records(out, records, config, url_to_entry_id, fields, args.compact)
+                print(f"Output written to: {output_path}", file=sys.stderr)
+                write_mapping_file(output_path, url_to_entry_id)
+        feedly_http.print_stats()
+        return
 
     # メタデータ追加
     unread_only = config.get("unread_only", True) and not args.include_read
@@ -461,6 +1529,16 @@ def main():
             "total_articles": sum(cat["count"] for cat in results.values()),
             "categories_count": len(results),
             "unread_only": unread_only,
+            "incremental": incremental and not args.full,
+            # global.all の全未読記事を取得できたか（--mark-read でカテゴリ単位の asOf に使う）
+            "complete": (
+                unread_only
+                and fetch_mode == "global"
+                and not incremental
+                and not args.resume
+                and not config.get("time_range_hours")
+                and not journals.failed
+            ),
         },
         "categories": results,
     }
@@ -474,21 +1552,24 @@ def main():
             if url and entry_id:
                 url_to_entry_id[url] = entry_id
 
-    # 出力
-    output_json = json.dumps(output, ensure_ascii=False, indent=2)
+    # 出力（--fields 指定時は記事データを絞る）
+    with feedly_trace.stage("write"):
+        if fields:
+            for category in results.values():
+                category["articles"] = [project_fields(a, fields) for a in category["articles"]]
+        output_json = dump_json(output, args.compact)
 
-    if args.output == "-":
-        print(output_json)
-    else:
-        output_path = expand_path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(output_json)
-        print(f"Output written to: {output_path}", file=sys.stderr)
-
-        # マッピングファイルを出力（同じディレクトリに配置）
-        mapping_path = output_path.parent / "url_to_entry_id.json"
-        mapping_path.write_text(json.dumps(url_to_entry_id, ensure_ascii=False, indent=2))
-        print(f"Mapping file written to: {mapping_path}", file=sys.stderr)
+        if args.output == "-":
+            print(output_json)
+        else:
+            output_path = expand_path(args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with feedly_io.open_write(output_path, compression) as out:
+                out.write(output_json)
+            print(f"Output written to: {output_path}", file=sys.stderr)
+            write_mapping_file(output_path, url_to_entry_id)
+
+    feedly_http.print_stats()
 
 
 if __name__ == "__main__":
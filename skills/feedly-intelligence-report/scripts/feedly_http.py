@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Feedlyスクリプト共通のHTTPクライアント
+
+feedly_fetch.py / feedly_bookmark.py / feedly_token_refresh.py / feedly_score.py から使用する。
+
+- プロセス内で共有する requests.Session（keep-alive、ホストごとの接続プール）
+- 429 / 5xx と接続エラーをジッター付き指数バックオフで再試行
+  （Retry-After / X-RateLimit-Reset ヘッダーを優先）
+- ホストごとのリクエスト数・再試行数・送受信バイト数・所要時間の集計
+- httpx.AsyncClient 用の async_request（同じ再試行規則・統計。feedly_social_async.py から使用）
+
+Usage:
+    import feedly_http
+
+    resp = feedly_http.get(url, headers=headers, timeout=10)
+    resp = await feedly_http.async_request(client, "GET", url, params=params)
+    feedly_http.print_stats()
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None  # 呼び出し側で確認する
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # オプショナル依存（async_request のみで使用）
+
+DEFAULT_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+# これより長い待機を要求された場合は再試行せずレスポンスを返す（日次制限など）
+MAX_RETRY_WAIT_SECONDS = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+
+class HttpStats:
+    """ホストごとのHTTP統計（スレッドセーフ）"""
+
+    FIELDS = ("requests", "retries", "errors", "bytes_sent", "bytes_received", "seconds")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def add(self, host: str, **values):
+        with self.lock:
+            counters = self.hosts[host]
+            for key, value in values.items():
+                counters[key] += value
+
+    def totals(self) -> dict:
+        """全ホストの合計"""
+        with self.lock:
+            totals = dict.fromkeys(self.FIELDS, 0)
+            for counters in self.hosts.values():
+                for key, value in counters.items():
+                    totals[key] += value
+            return totals
+
+    def snapshot(self) -> dict:
+        """{host: {requests, retries, ...}} のコピー"""
+        with self.lock:
+            return {host: dict(counters) for host, counters in self.hosts.items()}
+
+    def reset(self):
+        with self.lock:
+            self.hosts.clear()
+
+
+STATS = HttpStats()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """プロセス共有の requests.Session を返す（初回呼び出し時に作成）"""
+    global _session
+    if requests is None:
+        raise RuntimeError("requests not installed. Run: pip install requests")
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def retry_wait_seconds(resp, attempt: int) -> float:
+    """
+    再試行までの待機時間（秒）
+
+    Retry-After（秒数またはHTTP日付）、X-RateLimit-Reset（秒数）の順に従い、
+    ヘッダーがなければジッター付き指数バックオフ。
+    """
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            if retry_after.strip().isdigit():
+                return float(retry_after)
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+        reset = resp.headers.get("X-RateLimit-Reset") or resp.headers.get("X-Ratelimit-Reset")
+        if resp.status_code == 429 and reset and reset.strip().isdigit():
+            return float(reset)
+    # full jitter: 0 〜 base * 2^attempt
+    return random.uniform(0, BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+
+def request(method: str, url: str, retries: int = DEFAULT_RETRIES, **kwargs):
+    """
+    共有セッションでHTTPリクエストを送信（requests.request と同じ引数）
+
+    429 / 5xx と接続エラー・タイムアウトは最大 retries 回まで再試行する。
+    再試行し尽くした場合、429 / 5xx は最後のレスポンスを返し、
+    接続エラーは例外をそのまま送出する。
+    """
+    session = get_session()
+    host = urlsplit(url).netloc
+
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except requests.RequestException:
+            STATS.add(host, requests=1, errors=1, seconds=time.perf_counter() - start)
+            if attempt >= retries:
+                raise
+            STATS.add(host, retries=1)
+            time.sleep(retry_wait_seconds(None, attempt))
+            continue
+
+        body = resp.request.body or b""
+        STATS.add(
+            host,
+            requests=1,
+            bytes_sent=len(body) if isinstance(body, bytes) else len(body.encode()),
+            bytes_received=len(resp.content),
+            seconds=time.perf_counter() - start
+        )
+        if resp.status_code not in RETRY_STATUSES or attempt >= retries:
+            return resp
+
+        wait_seconds = retry_wait_seconds(resp, attempt)
+        if wait_seconds > MAX_RETRY_WAIT_SECONDS:
+            return resp
+        STATS.add(host, retries=1)
+        time.sleep(wait_seconds)
+
+    return resp
+
+
+async def async_request(client, method: str, url: str, retries: int = DEFAULT_RETRIES, **kwargs):
+    """
+    httpx.AsyncClient でHTTPリクエストを送信（client.request と同じ引数）
+
+    request と同じ規則（429 / 5xx と接続エラー・タイムアウトを再試行、
+    Retry-After / X-RateLimit-Reset を優先）で再試行し、統計も同じ STATS に集計する。
+    """
+    if httpx is None:
+        raise RuntimeError("httpx not installed. Run: pip install httpx")
+    host = urlsplit(url).netloc
+
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            STATS.add(host, requests=1, errors=1, seconds=time.perf_counter() - start)
+            if attempt >= retries:
+                raise
+            STATS.add(host, retries=1)
+            await asyncio.sleep(retry_wait_seconds(None, attempt))
+            continue
+
+        STATS.add(
+            host,
+            requests=1,
+            bytes_sent=len(resp.request.content),
+            bytes_received=len(resp.content),
+            seconds=time.perf_counter() - start
+        )
+        if resp.status_code not in RETRY_STATUSES or attempt >= retries:
+            return resp
+
+        wait_seconds = retry_wait_seconds(resp, attempt)
+        if wait_seconds > MAX_RETRY_WAIT_SECONDS:
+            return resp
+        STATS.add(host, retries=1)
+        await asyncio.sleep(wait_seconds)
+
+    return resp
+
+
+def get(url: str, **kwargs):
+    """GETリクエスト（requests.get 互換）"""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    """POSTリクエスト（requests.post 互換）"""
+    return request("POST", url, **kwargs)
+
+
+def put(url: str, **kwargs):
+    """PUTリクエスト（requests.put 互換）"""
+    return request("PUT", url, **kwargs)
+
+
+def format_bytes(size: int) -> str:
+    """バイト数を読みやすい単位で表示"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def print_stats(file=sys.stderr):
+    """ホストごとのHTTP統計を表示"""
+    snapshot = STATS.snapshot()
+    if not snapshot:
+        return
+    print("HTTP統計:", file=file)
+    for host, c in sorted(snapshot.items(), key=lambda x: -x[1]["requests"]):
+        print(
+            f"  - {host}: {c['requests']}リクエスト（再試行 {c['retries']}, エラー {c['errors']}）, "
+            f"受信 {format_bytes(c['bytes_received'])}, 送信 {format_bytes(c['bytes_sent'])}, "
+            f"{c['seconds']:.1f}s",
+            file=file
+        )
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+出力ファイルの圧縮（gzip / zstd）
+
+feedly_fetch.py の出力JSON・JSONLを拡張子（.gz / .zst）または --compress の指定で圧縮して書き出し、
+feedly_score.py・feedly_fetch.py --mark-read は先頭バイトで圧縮形式を判定して透過的に読み込む
+（拡張子が違っていても、標準入力でもよい）。zstd は zstandard パッケージ（オプション）が必要。
+
+Usage:
+    import feedly_io
+
+    with feedly_io.open_write("/tmp/articles.json.gz") as out:
+        out.write(text)
+    with feedly_io.open_read("/tmp/articles.json.gz") as f:
+        data = json.load(f)
+"""
+
+import gzip
+import io
+import os
+import sys
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # オプショナル依存（zstd 圧縮時のみ必要）
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+MAGIC = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+
+
+def compression_for_path(path) -> str:
+    """拡張子から圧縮形式を判定（.gz → gzip / .zst → zstd / それ以外 → none）"""
+    name = str(path)
+    for compression, suffix in SUFFIXES.items():
+        if name.endswith(suffix):
+            return compression
+    return "none"
+
+
+def strip_compression_suffix(path) -> str:
+    """圧縮の拡張子を除いたパス（articles.jsonl.gz → articles.jsonl）"""
+    name = str(path)
+    suffix = SUFFIXES.get(compression_for_path(name))
+    return name[:-len(suffix)] if suffix else name
+
+
+def with_compression_suffix(path, compression: str) -> str:
+    """圧縮形式の拡張子がなければ付ける"""
+    suffix = SUFFIXES.get(compression)
+    name = str(path)
+    if suffix and not name.endswith(suffix):
+        return name + suffix
+    return name
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstandard not installed. Run: pip install zstandard")
+
+
+def open_write(path, compression: str = None):
+    """
+    書き出し用のテキストストリームを開く
+
+    Args:
+        path: 出力ファイルのパス
+        compression: none / gzip / zstd（None: 拡張子から判定）
+    """
+    compression = compression or compression_for_path(path)
+    path = Path(os.path.expanduser(str(path)))
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8")
+    if compression == "zstd":
+        require_zstandard()
+        writer = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(writer, encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def detect_compression(binary) -> str:
+    """バイナリストリームの先頭バイトから圧縮形式を判定（読み位置は進めない）"""
+    head = binary.peek(4)[:4]
+    for compression, magic in MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return "none"
+
+
+def open_read(path):
+    """読み込み用のテキストストリームを開く（gzip / zstd は自動判定して展開）"""
+    binary = open(os.path.expanduser(str(path)), "rb")
+    compression = detect_compression(binary)
+    if compression == "gzip":
+        binary.close()
+        return gzip.open(os.path.expanduser(str(path)), "rt", encoding="utf-8")
+    if compression == "zstd":
+        require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(binary)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+def stdin_text():
+    """標準入力のテキストストリーム（圧縮されていれば展開したもの、そうでなければ sys.stdin）"""
+    binary = getattr(sys.stdin, "buffer", None)
+    compression = detect_compression(binary) if binary is not None else "none"
+    if compression == "gzip":
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=binary), encoding="utf-8")
+    if compression == "zstd":
+        require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(binary, closefd=False)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+    return sys.stdin
@@ -10,24 +10,83 @@ Feedly記事スコアリングスクリプト
 
 Usage:
     python feedly_score.py --config ~/.feedly/config.json --input /tmp/feedly_articles.json --output /tmp/scored_report.md
+
+    # JSONL入力（feedly_fetch.py --format jsonl の出力、"-" で標準入力）
+    python feedly_fetch.py --format jsonl | python feedly_score.py --input -
+
+    # 大量の記事を4プロセスで並列にスコアリング
+    python feedly_score.py --input /tmp/feedly_articles.json --workers 4
+
+    # ローカルの記事ストア（feedly_fetch.py --store-only）から直接読み込む
+    python feedly_score.py --from-store
+
+    # 閾値に届かない記事も含めて全記事のはてブ・HNを取得する
+    python feedly_score.py --input /tmp/feedly_articles.json --all-social-metrics
+
+    # 優先度ごとにカテゴリ別の上位10件だけを表に出す（0 で全件、既定は report.max_articles_per_category）
+    python feedly_score.py --input /tmp/feedly_articles.json --max-per-category 10
+
+    # 段階ごとの所要時間・CPU時間・最大RSS・HTTP統計を記録
+    python feedly_score.py --input /tmp/feedly_articles.json --trace /tmp/score_trace.json
 """
 
 import argparse
+import atexit
+import hashlib
+import heapq
 import json
 import os
 import re
+import sqlite3
 import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
 
 try:
     import requests
 except ImportError:
     requests = None  # オプショナル依存
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # オプショナル依存（なければ記事ごとにスコアを計算）
+
+import feedly_dedup
+import feedly_http
+import feedly_io
+import feedly_social
+import feedly_social_async
+import feedly_store
+import feedly_text
+import feedly_trace
+
+# 日本語判定用（キーワード側はCJK記号等を含む広い範囲、テキスト側はかな・漢字のみ）
+JAPANESE_KEYWORD_RE = re.compile(r'[\u3040-\u9fff]')
+JAPANESE_TEXT_RE = re.compile(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]')
+
+# ソーシャルメトリクスキャッシュのデフォルト設定
+# TTLは [記事の経過時間の上限(h), TTL(h)] の段階表（上限nullは「それ以上」）
+DEFAULT_SOCIAL_CACHE_FILE = "~/.feedly/social_metrics.sqlite"
+DEFAULT_SOCIAL_CACHE_MAX_ENTRIES = 50000
+DEFAULT_SOCIAL_CACHE_TTL_HOURS = {
+    "hatena": [[24, 1], [72, 6], [168, 24], [None, 168]],
+    "hn": [[24, 1], [72, 6], [168, 24], [None, 168]],
+}
+
+# 関連度キャッシュのデフォルト設定
+DEFAULT_SCORE_CACHE_FILE = "~/.feedly/score_cache.sqlite"
+DEFAULT_SCORE_CACHE_MAX_ENTRIES = 50000
+# 照合規則を変えたら上げる（古いキャッシュを無効化する）
+SCORE_CACHE_VERSION = 4
+# 逐次読み込み（JSONL・記事ストア）で本文を保持したまま照合する記事数
+RELEVANCE_BATCH_SIZE = 1000
+
 
 def expand_path(path: str) -> Path:
     """パスを展開（~ 対応）"""
@@ -65,18 +124,124 @@ def load_config(config_file: str) -> dict:
     return json.loads(path.read_text())
 
 
+# Article がスロットに持つ記事のキー（スコアリング・重複除去・レポートで参照するもの）
+ARTICLE_FIELDS = (
+    "id", "title", "url", "published", "crawled", "engagement_rate", "engagementRate",
+    "source", "origin", "content", "content_format",
+    "_category_slug", "_category_name", "_category_keywords",
+    "_relevance", "_content_excerpt", "_text", "_source_class", "_scores", "_priority",
+)
+_ARTICLE_FIELD_SET = frozenset(ARTICLE_FIELDS)
+# 読み込み時に捨てる元データ（スコアリングでは使わない）
+ARTICLE_DROPPED_FIELDS = ("content_html",)
+
+
+class Article:
+    """
+    読み込み時に組み立てるコンパクトな記事レコード
+
+    ARTICLE_FIELDS のキーはスロットに、URL（extract_url の結果）・ホスト名・
+    正規化タイトル（normalize_title の結果）は読み込み時に1度だけ求めて host / norm_title に保持する。
+    それ以外の元データ（alternate・author・entities 等）は1つのJSON文字列のまま保持し、
+    参照されたときに初めて展開する。
+    dict と同じ get / [] / in / pop で読み書きできるため、記事を dict として扱う関数
+    （calculate_total_score・feedly_dedup 等）にそのまま渡せる。
+    """
+
+    __slots__ = ARTICLE_FIELDS + ("host", "norm_title", "_raw", "_extra")
+
+    def __init__(self, data: dict):
+        rest = {}
+        for key, value in data.items():
+            if key in _ARTICLE_FIELD_SET:
+                setattr(self, key, value)
+            elif key not in ARTICLE_DROPPED_FIELDS:
+                rest[key] = value
+        self.url = extract_url(data)
+        self.host = extract_host(self.url)
+        self.norm_title = normalize_title(data.get("title", "No Title"))
+        self._raw = json.dumps(rest, ensure_ascii=False, separators=(",", ":")) if rest else None
+        self._extra = None
+
+    def _fields(self) -> dict:
+        """スロット以外の元データ（初回参照時にJSONから展開）"""
+        if self._extra is None:
+            self._extra = json.loads(self._raw) if self._raw else {}
+            self._raw = None
+        return self._extra
+
+    def get(self, key: str, default=None):
+        if key in _ARTICLE_FIELD_SET:
+            return getattr(self, key, default)
+        return self._fields().get(key, default)
+
+    def __getitem__(self, key: str):
+        if key in _ARTICLE_FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._fields()[key]
+
+    def __setitem__(self, key: str, value):
+        if key in _ARTICLE_FIELD_SET:
+            setattr(self, key, value)
+            if key == "url":
+                self.host = extract_host(value)
+            elif key == "title":
+                self.norm_title = normalize_title(value)
+        else:
+            self._fields()[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        if key in _ARTICLE_FIELD_SET:
+            return hasattr(self, key)
+        return key in self._fields()
+
+    def pop(self, key: str, *default):
+        if key in _ARTICLE_FIELD_SET:
+            if hasattr(self, key):
+                value = getattr(self, key)
+                delattr(self, key)
+                return value
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return self._fields().pop(key, *default)
+
+    def to_dict(self) -> dict:
+        """dict に戻す（スロットのキーと元データ）"""
+        data = {key: getattr(self, key) for key in ARTICLE_FIELDS if hasattr(self, key)}
+        data.update(self._fields())
+        return data
+
+
+def article_host(article: dict) -> str:
+    """記事URLのホスト名（Article なら読み込み時に求めたもの）"""
+    if type(article) is Article:
+        return article.host
+    return extract_host(extract_url(article))
+
+
+def article_norm_title(article: dict) -> str:
+    """記事の正規化タイトル（Article なら読み込み時に求めたもの）"""
+    if type(article) is Article:
+        return article.norm_title
+    return normalize_title(article.get("title", "No Title"))
+
+
 def load_articles(filepath: str) -> tuple[list, dict]:
     """
-    JSONファイルから記事を読み込む
+    JSONファイルから記事を読み込む（gzip / zstd で圧縮したファイルは自動判定して展開）
 
     Returns:
-        tuple: (記事リスト, メタデータ)
+        tuple: (記事リスト（Article）, メタデータ)
     """
     path = expand_path(filepath)
     if not path.exists():
         return [], {}
 
-    with open(path) as f:
+    with feedly_io.open_read(path) as f:
         data = json.load(f)
 
     # 新形式（カテゴリ別）か旧形式（items直下）かを判定
@@ -88,11 +253,92 @@ def load_articles(filepath: str) -> tuple[list, dict]:
                 article["_category_slug"] = slug
                 article["_category_name"] = cat_data.get("name", slug)
                 article["_category_keywords"] = cat_data.get("keywords", [])
-                all_articles.append(article)
+                all_articles.append(Article(article))
         return all_articles, data.get("metadata", {})
     else:
         # 旧形式
-        return data.get("items", []), {}
+        return [Article(article) for article in data.get("items", [])], {}
+
+
+def is_jsonl_input(filepath: str) -> bool:
+    """JSONL入力か（拡張子 .jsonl（.jsonl.gz / .jsonl.zst を含む）または標準入力 "-"）"""
+    return filepath == "-" or feedly_io.strip_compression_suffix(filepath).endswith(".jsonl")
+
+
+def iter_jsonl_articles(filepath: str):
+    """
+    JSONLファイル（1行1記事、カテゴリ情報は各行に埋め込み）から記事を1件ずつ読み込む
+
+    Args:
+        filepath: feedly_fetch.py --format jsonl の出力（"-" で標準入力、gzip / zstd は自動判定して展開）
+
+    Yields:
+        記事データ
+    """
+    if filepath == "-":
+        f = feedly_io.stdin_text()
+    else:
+        path = expand_path(filepath)
+        if not path.exists():
+            return
+        f = feedly_io.open_read(path)
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_articles_jsonl(
+    filepath: str,
+    matcher: "RelevanceMatcher",
+    cache: "RelevanceCache" = None,
+    workers: int = 1
+) -> list:
+    """
+    JSONLから記事を逐次読み込み、関連度を計算した時点で本文を破棄する
+
+    本文（content）は関連度と近似重複の判定にしか使わないため、読み込みながらバッチごとに
+    関連度を求めて _relevance に、近似重複判定用の冒頭部分を _content_excerpt に保持し、
+    本文全体は保持しない（match_in_batches）。照合は workers 個のプロセスで行う。
+    記事は Article にまとめるため、常駐メモリは記事数×メタデータ分で済む。
+
+    Returns:
+        記事リスト（Article）
+    """
+    records = (Article(data) for data in iter_jsonl_articles(filepath))
+    return match_in_batches(records, matcher, cache, workers)
+
+
+def load_articles_store(
+    config: dict,
+    matcher: "RelevanceMatcher",
+    cache: "RelevanceCache" = None,
+    workers: int = 1
+) -> list:
+    """
+    ローカルの記事ストアから記事を読み込む（load_articles_jsonl と同様に本文は保持しない）
+
+    Returns:
+        記事リスト（Article）
+    """
+    category_configs = {cat.get("slug"): cat for cat in config.get("categories", [])}
+
+    def records(store: feedly_store.ArticleStore):
+        for cat_label, slug, data in store.iter_records():
+            article = Article(data)
+            article["_category_slug"] = slug
+            article["_category_name"] = cat_label
+            article["_category_keywords"] = category_configs.get(slug, {}).get("keywords", [])
+            yield article
+
+    store = feedly_store.ArticleStore.from_config(config)
+    try:
+        return match_in_batches(records(store), matcher, cache, workers)
+    finally:
+        store.close()
 
 
 def extract_url(article: dict) -> str:
@@ -115,23 +361,158 @@ def extract_domain(url: str) -> str:
     if not url:
         return ""
     try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        return parsed.netloc.lower()
-    except Exception:
+        return urlsplit(url).netloc.lower()
+    except ValueError:
+        return ""
+
+
+def extract_host(url: str) -> str:
+    """URLからホスト名を抽出（小文字、ポート・ユーザー情報なし）"""
+    if not url:
         return ""
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+def article_source_title(article: dict) -> str:
+    """記事のソース名（source.title、なければ origin.title）"""
+    source_title = article.get("source", {}).get("title", "")
+    if not source_title:
+        source_title = article.get("origin", {}).get("title", "")
+    return source_title
+
+
+def domain_labels(domain: str) -> list:
+    """ドメインのラベルを逆順で返す（www.nikkei.com → ["com", "nikkei", "www"]）"""
+    domain = domain.strip().lower()
+    if "://" in domain:
+        domain = extract_host(domain)
+    return [label for label in domain.strip(".").split(".") if label][::-1]
+
+
+class SourceClass:
+    """
+    DomainClassifier による記事ソースの分類結果
+
+    Attributes:
+        paywalled: paywalled_domains のドメインか
+        trust: ソース信頼度（0-100、trusted_sources にないソースは50）
+        trusted_source: 一致した trusted_sources のキー（なければNone）
+    """
+
+    __slots__ = ("paywalled", "trust", "trusted_source")
+
+    def __init__(self, paywalled: bool, trust: float, trusted_source: str | None):
+        self.paywalled = paywalled
+        self.trust = trust
+        self.trusted_source = trusted_source
+
+
+class DomainClassifier:
+    """
+    paywalled_domains / trusted_sources による記事ソースの分類器
+
+    ドメインはラベルを逆順にした接尾辞トライ（com → nikkei → www）に、
+    trusted_sources のキーは小文字化したソース名の辞書にも登録し、1度だけ構築する。
+    記事はURLのホスト名をラベル単位でたどり、ソース名を辞書で引くだけで
+    (ペイウォール付きか, ソース信頼度, 一致した trusted_sources のキー) に分類する。
+    ドメインはホスト名の末尾がラベル単位で一致するもの（nikkei.com は www.nikkei.com に一致し、
+    ft.com は microsoft.com に一致しない）、ソース名は完全一致（大文字小文字は無視）。
+    ドメインとソース名の両方に一致する場合はドメインを、複数のドメインに一致する場合は
+    最も長いものを優先する。
+    """
+
+    def __init__(self, paywalled_domains: list = None, trusted_sources: dict = None):
+        self.paywalled_domains = paywalled_domains or []
+        self.trusted_sources = trusted_sources or {}
+        # ノードは ラベル → 子ノード の辞書。None キーに (ペイウォール付きか, trusted_sources のキー)
+        self._trie = {}
+        self._titles = {}
+        for domain in self.paywalled_domains:
+            node = self._insert(domain)
+            if node is not None:
+                node[None] = (True, node.get(None, (False, None))[1])
+        for source_name in self.trusted_sources:
+            node = self._insert(source_name)
+            if node is not None:
+                paywalled, trusted = node.get(None, (False, None))
+                node[None] = (paywalled, trusted if trusted is not None else source_name)
+            self._titles.setdefault(source_name.strip().lower(), source_name)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "DomainClassifier":
+        """設定の paywalled_domains / trusted_sources から構築"""
+        return domain_classifier(config.get("paywalled_domains"), config.get("trusted_sources"))
+
+    def _insert(self, domain: str) -> dict | None:
+        labels = domain_labels(domain)
+        if not labels:
+            return None
+        node = self._trie
+        for label in labels:
+            node = node.setdefault(label, {})
+        return node
+
+    def classify(self, article: dict) -> SourceClass:
+        """記事を分類（結果は記事の _source_class に保持し、同じ分類器では再計算しない）"""
+        cached = article.get("_source_class")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+
+        paywalled = False
+        trusted_source = None
+        node = self._trie
+        if node:
+            for label in domain_labels(article_host(article)):
+                node = node.get(label)
+                if node is None:
+                    break
+                mark = node.get(None)
+                if mark is not None:
+                    paywalled = paywalled or mark[0]
+                    if mark[1] is not None:
+                        trusted_source = mark[1]
+        if trusted_source is None and self._titles:
+            trusted_source = self._titles.get(article_source_title(article).strip().lower())
+
+        trust = self.trusted_sources[trusted_source] * 100 if trusted_source is not None else 50
+        result = SourceClass(paywalled, trust, trusted_source)
+        article["_source_class"] = (self, result)
+        return result
+
+
+# 設定オブジェクトごとのキャッシュ（分類器・類義語索引）の上限。
+# 設定を読み直すたびに古い設定のエントリーが残り続けないよう、超えたら作り直す
+IDENTITY_CACHE_SIZE = 16
+
+# 設定（paywalled_domains / trusted_sources のオブジェクト）ごとの分類器。
+# 記事ごとに呼ばれる is_paywalled 等でも再構築しない（数千件のリストの内容比較も避ける）
+_domain_classifiers = {}
+
+
+def domain_classifier(paywalled_domains: list = None, trusted_sources: dict = None) -> DomainClassifier:
+    """paywalled_domains / trusted_sources の分類器（同じオブジェクトなら構築済みのものを返す）"""
+    paywalled_domains = paywalled_domains or None
+    trusted_sources = trusted_sources or None
+    key = (id(paywalled_domains), id(trusted_sources))
+    entry = _domain_classifiers.get(key)
+    if entry is None or entry[0] is not paywalled_domains or entry[1] is not trusted_sources:
+        if len(_domain_classifiers) >= IDENTITY_CACHE_SIZE:
+            _domain_classifiers.clear()
+        # 判定に使ったオブジェクトを保持して id の再利用による取り違えを防ぐ
+        entry = _domain_classifiers[key] = (
+            paywalled_domains, trusted_sources, DomainClassifier(paywalled_domains, trusted_sources)
+        )
+    return entry[2]
 
 
 def is_paywalled(article: dict, paywalled_domains: list) -> bool:
     """記事がペイウォール付きかどうかを判定"""
     if not paywalled_domains:
         return False
-    url = extract_url(article)
-    domain = extract_domain(url)
-    for pd in paywalled_domains:
-        if pd.lower() in domain:
-            return True
-    return False
+    return domain_classifier(paywalled_domains).classify(article).paywalled
 
 
 def hatena_entry_url(url: str) -> str:
@@ -158,102 +539,287 @@ def normalize_title(title: str) -> str:
 # ソーシャルメトリクス取得（はてブ + Hacker News）
 # =============================================================================
 
-def fetch_hatena_bookmark_count(url: str) -> int:
-    """
-    はてなブックマーク数を取得
+def hn_entry_url(object_id: str) -> str:
+    """Hacker NewsのエントリーページURLを生成"""
+    if not object_id:
+        return ""
+    return f"https://news.ycombinator.com/item?id={object_id}"
 
-    Args:
-        url: 記事URL
 
-    Returns:
-        ブックマーク数（エラー時は0）
+def normalize_url(url: str) -> str:
+    """
+    キャッシュキー用にURLを正規化
+
+    スキーム・ホストを小文字化し、フラグメントと utm_* パラメータを除去する。
     """
-    if not requests:
-        return 0
     try:
-        api_url = f"https://bookmark.hatenaapis.com/count/entry?url={quote(url, safe='')}"
-        resp = requests.get(api_url, timeout=5)
-        if resp.status_code == 200:
-            return int(resp.text) if resp.text.isdigit() else 0
-    except Exception:
-        pass
-    return 0
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = "&".join(
+        p for p in parts.query.split("&")
+        if p and not p.lower().startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
 
 
-def fetch_hn_points(url: str) -> tuple[int, str]:
-    """
-    Hacker News のポイント数とobjectIDを取得
+def article_age_hours(article: dict, now: float = None) -> float:
+    """記事の公開（不明ならクロール）からの経過時間（時間）"""
+    timestamp = article.get("published") or article.get("crawled") or 0
+    if not timestamp:
+        return 0.0
+    # ミリ秒 → 秒に変換
+    if timestamp > 1e12:
+        timestamp = timestamp / 1000
+    if now is None:
+        now = time.time()
+    return max((now - timestamp) / 3600, 0.0)
 
-    Args:
-        url: 記事URL
 
-    Returns:
-        (ポイント数, objectID) のタプル（エラー時は (0, "")）
+class SocialMetricsCache:
     """
-    if not requests:
-        return 0, ""
-    try:
-        api_url = f"https://hn.algolia.com/api/v1/search?query={quote(url, safe='')}&restrictSearchableAttributes=url&hitsPerPage=1"
-        resp = requests.get(api_url, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            hits = data.get("hits", [])
-            if hits:
-                points = hits[0].get("points", 0) or 0
-                object_id = hits[0].get("objectID", "") or ""
-                return points, object_id
-    except Exception:
-        pass
-    return 0, ""
+    ソーシャルメトリクス（はてブ・HN）の永続キャッシュ（SQLite）
 
+    正規化URLとソース名をキーに取得結果を保存する。
+    TTLはソースごと・記事の経過時間ごとに段階的に設定でき、
+    新しい記事ほど頻繁に、古い記事ほど稀に再取得する。
+    エントリー数が上限を超えた場合は最終参照が古いものから削除する。
+    """
 
-def hn_entry_url(object_id: str) -> str:
-    """Hacker NewsのエントリーページURLを生成"""
-    if not object_id:
-        return ""
-    return f"https://news.ycombinator.com/item?id={object_id}"
+    def __init__(self, path: str, ttl_hours: dict = None, max_entries: int = DEFAULT_SOCIAL_CACHE_MAX_ENTRIES):
+        self.path = expand_path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_hours = {**DEFAULT_SOCIAL_CACHE_TTL_HOURS, **(ttl_hours or {})}
+        self.max_entries = max_entries
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            " url TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (url, source))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_accessed ON metrics (accessed_at)")
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SocialMetricsCache | None":
+        """設定の social_metrics ブロックからキャッシュを構築（無効時はNone）"""
+        settings = config.get("social_metrics", {})
+        if not settings.get("cache", True):
+            return None
+        return cls(
+            settings.get("cache_file", DEFAULT_SOCIAL_CACHE_FILE),
+            ttl_hours=settings.get("ttl_hours"),
+            max_entries=settings.get("cache_max_entries", DEFAULT_SOCIAL_CACHE_MAX_ENTRIES)
+        )
+
+    def ttl_seconds(self, source: str, age_hours: float) -> float:
+        """記事の経過時間に応じたTTL（秒）"""
+        for max_age, ttl in self.ttl_hours.get(source, []):
+            if max_age is None or age_hours <= max_age:
+                return ttl * 3600
+        return 0
+
+    def lookup(self, source: str, url_ages: dict) -> dict:
+        """
+        有効期限内のキャッシュ値を一括取得
 
+        Args:
+            source: "hatena" または "hn"
+            url_ages: {url: 記事の経過時間(h)}
 
-def fetch_social_metrics_for_articles(articles: list, max_workers: int = 10) -> dict:
+        Returns:
+            {url: キャッシュ値}（期限切れ・未登録のURLは含まない）
+        """
+        now = time.time()
+        keys = {}
+        for url in url_ages:
+            keys.setdefault(normalize_url(url), []).append(url)
+
+        rows = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), 500):
+            chunk = key_list[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, value, fetched_at in self.conn.execute(
+                f"SELECT url, value, fetched_at FROM metrics WHERE source = ? AND url IN ({placeholders})",
+                [source, *chunk]
+            ):
+                rows[key] = (value, fetched_at)
+
+        cached = {}
+        touched = []
+        for key, urls in keys.items():
+            for url in urls:
+                row = rows.get(key)
+                if row and now - row[1] < self.ttl_seconds(source, url_ages[url]):
+                    cached[url] = json.loads(row[0])
+                    self.hits[source] += 1
+                else:
+                    self.misses[source] += 1
+            if key in rows:
+                touched.append((now, key, source))
+
+        self.conn.executemany("UPDATE metrics SET accessed_at = ? WHERE url = ? AND source = ?", touched)
+        return cached
+
+    def store(self, source: str, values: dict):
+        """取得結果を保存 {url: 値}"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO metrics (url, source, value, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            [(normalize_url(url), source, json.dumps(value), now, now) for url, value in values.items()]
+        )
+
+    def evict(self):
+        """上限を超えたエントリーを最終参照が古い順に削除"""
+        count = self.conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM metrics WHERE rowid IN "
+                "(SELECT rowid FROM metrics ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def close(self):
+        """エビクションを行いコミットして閉じる"""
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+    def summary(self) -> str:
+        """ヒット/ミス件数の要約"""
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return (
+            f"キャッシュ: ヒット {hits} / ミス {misses} "
+            f"(はてブ {self.hits['hatena']}/{self.misses['hatena']}, "
+            f"HN {self.hits['hn']}/{self.misses['hn']})"
+        )
+
+
+def fetch_social_metrics_for_articles(
+    articles: list,
+    max_workers: int = 10,
+    cache: SocialMetricsCache = None,
+    batch_size: int = feedly_social.HATENA_BATCH_SIZE,
+    engine: str = "thread",
+    rate_limits: dict = None,
+    deadline: float = None,
+    hn_filter=None
+) -> dict:
     """
     複数記事のソーシャルメトリクスを並列取得
 
+    hn_filter を指定すると、先にはてブ数（一括取得でリクエストが少ない）を取得し、
+    HNポイント（URLごとに1リクエスト）は hn_filter(url, はてブ数) がTrueのURLだけ取得する。
+
     Args:
         articles: 記事リスト
-        max_workers: 並列ワーカー数
+        max_workers: 並列ワーカー数（threadエンジン）
+        cache: SocialMetricsCache（有効期限内のURLはHTTPリクエストを省略）
+        batch_size: はてブ一括取得（count/entries）1リクエストあたりのURL数
+        engine: "thread" / "async" / "auto"（asyncはhttpxが必要、autoは利用可能ならasync）
+        rate_limits: asyncエンジンのホスト別同時接続数・レート制限
+        deadline: asyncエンジン全体の制限時間（秒）
+        hn_filter: HNポイントを取得するURLの判定（None: 全URL）
 
     Returns:
-        {url: {"hatena": int, "hn": int}} の辞書
+        {url: {"hatena": int, "hn": int, "hn_id": str}} の辞書
     """
-    if not requests:
+    if not requests and engine == "thread":
         print("Warning: requests not installed, skipping social metrics", file=sys.stderr)
         return {}
 
-    urls = [extract_url(a) for a in articles if extract_url(a)]
-    urls = list(set(urls))  # 重複除去
+    # URLごとの記事経過時間（同一URLが複数ある場合は最も新しい記事）
+    now = time.time()
+    url_ages = {}
+    for article in articles:
+        url = extract_url(article)
+        if url:
+            age = article_age_hours(article, now)
+            url_ages[url] = min(age, url_ages.get(url, age))
 
-    print(f"Fetching social metrics for {len(urls)} URLs...", file=sys.stderr)
+    print(f"Fetching social metrics for {len(url_ages)} URLs...", file=sys.stderr)
 
-    metrics = {}
+    hatena_values = cache.lookup("hatena", url_ages) if cache else {}
+    hn_values = cache.lookup("hn", url_ages) if cache else {}
+    hatena_urls = [url for url in url_ages if url not in hatena_values]
+    hn_urls = [url for url in url_ages if url not in hn_values]
 
-    def fetch_metrics(url: str) -> tuple:
-        hatena = fetch_hatena_bookmark_count(url)
-        hn_points, hn_id = fetch_hn_points(url)
-        return url, {"hatena": hatena, "hn": hn_points, "hn_id": hn_id}
+    use_async = False
+    if engine in ("async", "auto"):
+        use_async = feedly_social_async.httpx is not None
+        if not use_async and engine == "async":
+            print("Warning: httpx not installed, falling back to thread engine", file=sys.stderr)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(fetch_metrics, url): url for url in urls}
-        for future in as_completed(futures):
-            try:
-                url, result = future.result()
-                metrics[url] = result
-            except Exception:
-                pass
+    if not use_async and not requests:
+        print("Warning: requests not installed, skipping social metrics", file=sys.stderr)
+        return {}
+
+    def fetch(hatena_urls: list, hn_urls: list, deadline: float | None) -> tuple[dict, dict, dict]:
+        if use_async:
+            return feedly_social_async.fetch_social_metrics_async(
+                hatena_urls,
+                hn_urls,
+                hatena_api=feedly_social.HATENA_COUNT_API,
+                hn_api=feedly_social.HN_SEARCH_API,
+                batch_size=batch_size,
+                rate_limits=rate_limits,
+                deadline=deadline
+            )
+        return feedly_social.fetch_social_metrics_threaded(hatena_urls, hn_urls, max_workers=max_workers, batch_size=batch_size)
+
+    if hn_filter is None:
+        fetched_hatena, fetched_hn, stats = fetch(hatena_urls, hn_urls, deadline)
+    else:
+        # はてブ数で閾値に届きうるかを絞ってからHNを取得する（制限時間は2段階で共有）
+        started = time.monotonic()
+        fetched_hatena, _, stats = fetch(hatena_urls, [], deadline)
+        counts = {**hatena_values, **fetched_hatena}
+        skipped = len(hn_urls)
+        hn_urls = [url for url in hn_urls if hn_filter(url, counts.get(url, 0))]
+        skipped -= len(hn_urls)
+        if skipped:
+            print(f"  → HN: 閾値に届かないため{skipped}件の取得を省略", file=sys.stderr)
+        remaining = None
+        if use_async:
+            total = deadline if deadline is not None else feedly_social_async.DEFAULT_DEADLINE_SECONDS
+            remaining = max(0.0, total - (time.monotonic() - started))
+        _, fetched_hn, hn_stats = fetch([], hn_urls, remaining)
+        stats = {key: stats[key] + hn_stats[key] for key in stats}
+
+    if stats["hatena_batches"]:
+        print(
+            f"  → はてブ一括取得: {stats['hatena_batches']}リクエスト"
+            f"（{len(hatena_urls)} URL, 個別取得へのフォールバック {stats['batch_fallbacks']}件）",
+            file=sys.stderr
+        )
+    if stats["unfinished"]:
+        print(f"  → 制限時間超過で未取得: {stats['unfinished']}件", file=sys.stderr)
+
+    # 失敗したリクエストはキャッシュせず0扱い
+    if cache:
+        cache.store("hatena", fetched_hatena)
+        cache.store("hn", fetched_hn)
+    hatena_values.update(fetched_hatena)
+    hn_values.update(fetched_hn)
+
+    metrics = {}
+    for url in url_ages:
+        hn_points, hn_id = hn_values.get(url, (0, ""))
+        metrics[url] = {"hatena": hatena_values.get(url, 0), "hn": hn_points, "hn_id": hn_id}
 
     # 統計を表示
     hatena_total = sum(m.get("hatena", 0) for m in metrics.values())
     hn_total = sum(m.get("hn", 0) for m in metrics.values())
     print(f"  → はてブ合計: {hatena_total}, HN合計: {hn_total}", file=sys.stderr)
+    if cache:
+        print(f"  → {cache.summary()}", file=sys.stderr)
 
     return metrics
 
@@ -301,6 +867,77 @@ def calculate_engagement_score(article: dict, social_metrics: dict = None) -> tu
     return total, breakdown
 
 
+class SynonymIndex:
+    """
+    類義語グループの索引
+
+    小文字化した語 → グループ番号 の辞書を1度だけ構築し、キーワードの展開は
+    グループの線形探索ではなく辞書引きで行う。展開結果はキーワード列ごとに保持して再利用する。
+    同じ語が複数のグループにある場合は先に書かれたグループに属する。
+    """
+
+    def __init__(self, synonym_groups: list):
+        # グループ内の語は設定の順序で保持する（セット内で最初にマッチした語を決めるため）
+        self.groups = [tuple(dict.fromkeys(term.lower() for term in group)) for group in synonym_groups or []]
+        self.group_of = {}
+        for group_id, group in enumerate(self.groups):
+            for term in group:
+                self.group_of.setdefault(term, group_id)
+        self._expanded = {}
+
+    def expand(self, keywords: list) -> list:
+        """
+        キーワードを類義語グループで展開
+
+        Args:
+            keywords: 元のキーワードリスト
+
+        Returns:
+            展開されたキーワードリスト（各要素は類義語のタプル、小文字）
+        """
+        key = tuple(keywords)
+        expanded = self._expanded.get(key)
+        if expanded is not None:
+            return expanded
+
+        expanded = []
+        used_keywords = set()
+        for kw in keywords:
+            kw_lower = kw.lower()
+            if kw_lower in used_keywords:
+                continue
+            group_id = self.group_of.get(kw_lower)
+            if group_id is not None:
+                # グループ全体を1つのマッチ対象として追加
+                expanded.append(self.groups[group_id])
+                used_keywords.update(self.groups[group_id])
+            else:
+                # 類義語グループに属さないキーワードは単独で追加
+                expanded.append((kw_lower,))
+                used_keywords.add(kw_lower)
+
+        self._expanded[key] = expanded
+        return expanded
+
+
+# 設定（synonym_groups のオブジェクト）ごとの索引。記事ごとに呼ばれる calculate_relevance_score でも
+# 再構築しない（domain_classifier と同じく、グループの内容からキーを作る O(語数) の処理も避ける）
+_synonym_indexes = {}
+
+
+def synonym_index(synonym_groups: list) -> SynonymIndex:
+    """synonym_groups の索引（同じオブジェクトなら構築済みのものを返す）"""
+    synonym_groups = synonym_groups or None
+    key = id(synonym_groups)
+    entry = _synonym_indexes.get(key)
+    if entry is None or entry[0] is not synonym_groups:
+        if len(_synonym_indexes) >= IDENTITY_CACHE_SIZE:
+            _synonym_indexes.clear()
+        # id の再利用による取り違えを防ぐためオブジェクトも保持する
+        entry = _synonym_indexes[key] = (synonym_groups, SynonymIndex(synonym_groups))
+    return entry[1]
+
+
 def expand_with_synonyms(keywords: list, synonym_groups: list) -> list:
     """
     キーワードを類義語グループで展開
@@ -310,35 +947,83 @@ def expand_with_synonyms(keywords: list, synonym_groups: list) -> list:
         synonym_groups: 類義語グループのリスト（各グループは類義語のリスト）
 
     Returns:
-        展開されたキーワードリスト（各要素は類義語セット）
+        展開されたキーワードリスト（各要素は類義語のタプル）
     """
-    expanded = []
-    used_keywords = set()
+    return synonym_index(synonym_groups).expand(keywords)
 
-    # 類義語グループに属するキーワードを展開
-    for kw in keywords:
-        if kw in used_keywords:
-            continue
 
-        kw_lower = kw.lower()
-        found_group = None
+def article_content_text(article: dict) -> str:
+    """記事本文を文字列で取得（contentはdictの場合がある: Feedly API形式）"""
+    return feedly_text.article_body(article)
 
-        for group in synonym_groups:
-            group_lower = [g.lower() for g in group]
-            if kw_lower in group_lower:
-                found_group = group
-                break
 
-        if found_group:
-            # グループ全体を1つのマッチ対象として追加
-            expanded.append(set(g.lower() for g in found_group))
-            used_keywords.update(g.lower() for g in found_group)
-        else:
-            # 類義語グループに属さないキーワードは単独で追加
-            expanded.append({kw_lower})
-            used_keywords.add(kw_lower)
+def is_word_match(keyword: str, text: str, text_has_japanese: bool = None, tokens: frozenset = None) -> bool:
+    """
+    単語境界を考慮したキーワードマッチ
+
+    英語キーワード: 単語境界(\b)でマッチ（ml が html にマッチしない）
+    日本語キーワード: そのまま部分一致（単語境界の概念がない）
+    短い英字（ai, ml等）: 日本語テキスト内では英字単語として独立している場合のみマッチ
+
+    text_has_japanese / tokens に PreparedText の値を渡すと、テキストの走査を省略する
+    （単語1つからなる英字キーワードはトークン集合の参照だけで判定する）。
+    """
+    # キーワードが日本語を含むかチェック
+    if JAPANESE_KEYWORD_RE.search(keyword):
+        # 日本語キーワードは部分一致
+        return keyword in text
+
+    # 英字キーワード
+    # テキストに日本語（ひらがな・カタカナ・漢字）が含まれるかチェック
+    if text_has_japanese is None:
+        text_has_japanese = bool(JAPANESE_TEXT_RE.search(text))
+
+    # 短い英字キーワード（ai, ml, it等）かつ日本語テキストの場合
+    # 英字の塊として独立している場合のみマッチ（前後が英字でない）
+    if len(keyword) <= 3 and keyword.isalpha() and text_has_japanese:
+        # 日本語文字または文字列境界で囲まれた英字キーワードにマッチ
+        # 例: 「先進的AI利活用」の「AI」にはマッチ、「Zaim」の「ai」にはマッチしない
+        pattern = r'(?<![a-zA-Z])' + re.escape(keyword) + r'(?![a-zA-Z])'
+        return bool(re.search(pattern, text, re.IGNORECASE))
+
+    # それ以外は単語境界でマッチ（\b で区切られた単語 = \w+ のトークンと同じ）
+    if tokens is not None and keyword.isascii() and feedly_text.WORD_RE.fullmatch(keyword):
+        return keyword in tokens
+    pattern = r'\b' + re.escape(keyword) + r'\b'
+    return bool(re.search(pattern, text, re.IGNORECASE))
+
+
+def find_trusted_source(article: dict, trusted_sources: dict) -> str | None:
+    """trusted_sourcesのうちドメインまたはソース名に一致するものを返す（DomainClassifier の規則）"""
+    if not trusted_sources:
+        return None
+    return domain_classifier(None, trusted_sources).classify(article).trusted_source
+
+
+def relevance_from_matches(
+    title_matches: int,
+    content_matches: int,
+    trusted_source_match: bool,
+    total_keyword_sets: int
+) -> float:
+    """
+    マッチ数から関連度スコアを算出
+
+    - 1つでもマッチすれば基礎点30
+    - マッチ数に応じて加点
+    - trusted_sourceマッチはタイトルマッチ1回分として加算
+    """
+    # タイトルマッチは2倍の重み、trusted_sourceマッチはタイトルマッチ相当
+    trusted_bonus = 2 if trusted_source_match else 0
+    total_matches = title_matches * 2 + content_matches + trusted_bonus
+    max_possible = total_keyword_sets * 3
 
-    return expanded
+    # 基礎点 + マッチ率による加点
+    if total_matches > 0:
+        base_score = 30  # 1つでもマッチすれば基礎点
+        match_bonus = (total_matches / max_possible) * 70  # 最大70点追加
+        return min(base_score + match_bonus, 100)
+    return 0
 
 
 def calculate_relevance_score(
@@ -356,76 +1041,39 @@ def calculate_relevance_score(
     trusted_sourcesに登録されたドメインからの記事はソース名をマッチとして加算。
     1つでもマッチすれば基礎点を付与。
 
+    記事ごとにキーワードを展開・照合する基準実装。大量の記事を処理する場合は
+    RelevanceMatcher を使用する（結果は同一）。
+
     Returns:
         tuple: (スコア, マッチしたキーワードのリスト)
     """
     if not keywords and not global_keywords and not trusted_sources:
         return 50, []  # キーワード未設定時はニュートラル
 
-    all_keywords = list(set((keywords or []) + (global_keywords or [])))
+    # 重複を除いて設定の順序を保つ
+    all_keywords = list(dict.fromkeys((keywords or []) + (global_keywords or [])))
     if not all_keywords and not trusted_sources:
         return 50, []
 
     # 類義語グループで展開
-    keyword_sets = expand_with_synonyms(all_keywords, synonym_groups or [])
+    keyword_sets = expand_with_synonyms(all_keywords, synonym_groups)
 
-    title = article.get("title", "").lower()
-    # contentはdictの場合がある（Feedly API形式）
-    content_raw = article.get("content", "")
-    if isinstance(content_raw, dict):
-        content = content_raw.get("content", "").lower()
-    else:
-        content = str(content_raw).lower()
+    text = feedly_text.prepare_text(article)
 
     title_matches = 0
     content_matches = 0
     matched_keywords = []
 
-    def is_word_match(keyword: str, text: str) -> bool:
-        """
-        単語境界を考慮したキーワードマッチ
-
-        英語キーワード: 単語境界(\b)でマッチ（ml が html にマッチしない）
-        日本語キーワード: そのまま部分一致（単語境界の概念がない）
-        短い英字（ai, ml等）: 日本語テキスト内では英字単語として独立している場合のみマッチ
-        """
-        # キーワードが日本語を含むかチェック
-        keyword_has_japanese = any('\u3040' <= c <= '\u9fff' for c in keyword)
-
-        if keyword_has_japanese:
-            # 日本語キーワードは部分一致
-            return keyword in text
-        else:
-            # 英字キーワード
-            # テキストに日本語（ひらがな・カタカナ・漢字）が含まれるかチェック
-            text_has_japanese = any(
-                '\u3040' <= c <= '\u309f' or  # ひらがな
-                '\u30a0' <= c <= '\u30ff' or  # カタカナ
-                '\u4e00' <= c <= '\u9fff'     # 漢字
-                for c in text
-            )
-
-            # 短い英字キーワード（ai, ml, it等）かつ日本語テキストの場合
-            # 英字の塊として独立している場合のみマッチ（前後が英字でない）
-            if len(keyword) <= 3 and keyword.isalpha() and text_has_japanese:
-                # 日本語文字または文字列境界で囲まれた英字キーワードにマッチ
-                # 例: 「先進的AI利活用」の「AI」にはマッチ、「Zaim」の「ai」にはマッチしない
-                pattern = r'(?<![a-zA-Z])' + re.escape(keyword) + r'(?![a-zA-Z])'
-                return bool(re.search(pattern, text, re.IGNORECASE))
-
-            # それ以外は単語境界でマッチ
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            return bool(re.search(pattern, text, re.IGNORECASE))
-
     for kw_set in keyword_sets:
         # セット内のいずれかがマッチすればカウント
         title_matched_kw = None
         content_matched_kw = None
 
         for kw in kw_set:
-            if is_word_match(kw.lower(), title) and not title_matched_kw:
+            kw_lower = kw.lower()
+            if not title_matched_kw and is_word_match(kw_lower, text.title, text.title_has_japanese, text.title_tokens):
                 title_matched_kw = kw
-            if is_word_match(kw.lower(), content) and not content_matched_kw:
+            if not content_matched_kw and is_word_match(kw_lower, text.body, text.body_has_japanese, text.body_tokens):
                 content_matched_kw = kw
 
         if title_matched_kw:
@@ -438,41 +1086,369 @@ def calculate_relevance_score(
                 matched_keywords.append(content_matched_kw)
 
     # trusted_sourcesのドメインマッチ（ソース信頼度の代替）
-    trusted_source_match = False
-    if trusted_sources:
-        url = extract_url(article)
-        domain = extract_domain(url)
-        source_title = article.get("source", {}).get("title", "")
-        if not source_title:
-            source_title = article.get("origin", {}).get("title", "")
-
-        for source_name in trusted_sources:
-            if (source_name.lower() in domain) or (source_name.lower() in source_title.lower()):
-                trusted_source_match = True
-                if source_name not in matched_keywords:
-                    matched_keywords.append(f"@{source_name}")
-                break
-
-    # スコア計算
-    # - 1つでもマッチすれば基礎点30
-    # - マッチ数に応じて加点
-    # - trusted_sourceマッチはタイトルマッチ1回分として加算
+    trusted_source = find_trusted_source(article, trusted_sources)
+    if trusted_source is not None and trusted_source not in matched_keywords:
+        matched_keywords.append(f"@{trusted_source}")
+
     total_keyword_sets = len(keyword_sets) + (1 if trusted_sources else 0)
     if total_keyword_sets == 0:
         return 50, []
 
-    # タイトルマッチは2倍の重み、trusted_sourceマッチはタイトルマッチ相当
-    trusted_bonus = 2 if trusted_source_match else 0
-    total_matches = title_matches * 2 + content_matches + trusted_bonus
-    max_possible = total_keyword_sets * 3
+    score = relevance_from_matches(
+        title_matches, content_matches, trusted_source is not None, total_keyword_sets
+    )
+    if score > 0:
+        return score, matched_keywords
+    return 0, []  # マッチなしは0点
 
-    # 基礎点 + マッチ率による加点
-    if total_matches > 0:
-        base_score = 30  # 1つでもマッチすれば基礎点
-        match_bonus = (total_matches / max_possible) * 70  # 最大70点追加
-        return min(base_score + match_bonus, 100), matched_keywords
-    else:
-        return 0, []  # マッチなしは0点
+
+class RelevanceMatcher:
+    """
+    コンパイル済みの関連度マッチャー
+
+    global_keywords / synonym_groups / trusted_sources から1度だけ構築し、
+    全記事で使い回す。全キーワードを1つの選択正規表現にまとめてテキストごとに
+    1回走査し、キーワードの出現位置だけを候補として列挙してから、
+    キーワードごとの境界条件（単語境界・日本語部分一致・短い英字ルール）を
+    位置指定で検証する。PreparedText のトークン集合がある場合は、単語1つからなる
+    英字キーワードを集合の共通部分で判定し、残りのキーワードだけを個別に検索する。
+    マッチ規則と戻り値は calculate_relevance_score と同一。
+    """
+
+    def __init__(
+        self,
+        keywords: list,
+        global_keywords: list = None,
+        synonym_groups: list = None,
+        trusted_sources: dict = None,
+        paywalled_domains: list = None
+    ):
+        self.trusted_sources = trusted_sources or {}
+        # score_article / score_batch のペイウォール判定と同じ分類器（記事ごとの分類を共有する）
+        self.sources = domain_classifier(paywalled_domains, trusted_sources)
+        self.neutral = not keywords and not global_keywords and not trusted_sources
+
+        all_keywords = list(dict.fromkeys((keywords or []) + (global_keywords or [])))
+        if not all_keywords and not trusted_sources:
+            self.neutral = True
+
+        self.keyword_sets = expand_with_synonyms(all_keywords, synonym_groups)
+        self.total_keyword_sets = len(self.keyword_sets) + (1 if trusted_sources else 0)
+
+        literals = {kw.lower() for kw_set in self.keyword_sets for kw in kw_set if kw}
+        self._checks = {kw: self._compile_check(kw) for kw in literals}
+
+        # 走査はIGNORECASEなしで行う（文字集合による前方一致の最適化を効かせるため）。
+        # テキストは小文字化済みなので、残る差異（ſ と s など）は代表文字への置換で吸収する
+        self._fold_reps = []
+        fold_table = {}
+        for c in sorted({c for kw in literals for c in kw}):
+            rep = self._fold_rep(c)
+            if rep is None:
+                self._fold_reps.append(c)
+            elif rep != c:
+                fold_table[ord(c)] = rep
+        self._fold_table = fold_table
+
+        self._exotic_re = None
+        if literals:
+            charset = "".join(re.escape(c) for c in self._fold_reps)
+            # キーワード文字そのものではないが大文字小文字無視で一致する文字
+            self._exotic_re = re.compile(f"(?!(?-i:[{charset}]))(?i:[{charset}])")
+
+        # トークン集合で判定できるキーワード（\b で区切られた英字の単語1つ）。
+        # 短い英字は日本語を含むテキストでは前後の英字で判定するため走査が必要
+        token_literals = {
+            kw for kw in literals
+            if self._checks[kw][0] != "japanese" and kw.isascii() and feedly_text.WORD_RE.fullmatch(kw)
+        }
+        token_short = {kw for kw in token_literals if self._checks[kw][0] == "short"}
+        self._token_literals = frozenset(token_literals)
+        self._token_literals_japanese = frozenset(token_literals - token_short)
+
+        # トークン集合がない場合は全キーワードを1回の走査で探す。
+        # ある場合の残り（日本語・複数語・記号入り・日本語テキスト中の短い英字）は個別に検索する
+        self._scan_all = self._build_scanner(literals)
+        self._rest_plain = self._rest_checks(sorted(literals - token_literals), False)
+        self._rest_japanese = self._rest_checks(sorted(literals - self._token_literals_japanese), True)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RelevanceMatcher":
+        """設定から calculate_total_score と同じ引数でマッチャーを構築"""
+        return cls(
+            keywords=config.get("global_keywords", []),
+            synonym_groups=config.get("synonym_groups", []),
+            trusted_sources=config.get("trusted_sources", {}),
+            paywalled_domains=config.get("paywalled_domains")
+        )
+
+    @staticmethod
+    def _compile_check(keyword: str) -> tuple:
+        """キーワードの種別と位置指定検証用の正規表現を返す"""
+        if JAPANESE_KEYWORD_RE.search(keyword):
+            return ("japanese", None, None)
+        word_re = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
+        if len(keyword) <= 3 and keyword.isalpha():
+            short_re = re.compile(r'(?<![a-zA-Z])' + re.escape(keyword) + r'(?![a-zA-Z])', re.IGNORECASE)
+            return ("short", short_re, word_re)
+        return ("word", None, word_re)
+
+    def _build_scanner(self, literals: set) -> tuple:
+        """
+        キーワード群を走査する (選択正規表現, 一致した文字列 → 検証するキーワード) を返す
+
+        キーワードがなければ (None, {})。
+        """
+        # 代表文字に揃えたキーワード → 元のキーワード
+        canonical = defaultdict(list)
+        for kw in literals:
+            canonical[kw.translate(self._fold_table)].append(kw)
+        canonicals = sorted(canonical, key=lambda kw: (-len(kw), kw))
+        if not canonicals:
+            return None, {}
+        # 同じ位置から始まるより短いキーワード（最長一致の接頭辞）も検証対象にする
+        prefixes = {
+            longest: [kw for c in canonicals if longest.startswith(c) for kw in canonical[c]]
+            for longest in canonicals
+        }
+        return re.compile("|".join(re.escape(kw) for kw in canonicals)), prefixes
+
+    def _rest_checks(self, literals: list, text_has_japanese: bool) -> list:
+        """トークン集合で判定できないキーワードの (キーワード, 日本語部分一致か, 検索用の正規表現)"""
+        rest = []
+        for kw in literals:
+            kind, short_re, word_re = self._checks[kw]
+            if kind == "japanese":
+                rest.append((kw, True, None))
+            elif kind == "short" and text_has_japanese:
+                rest.append((kw, False, short_re))
+            else:
+                rest.append((kw, False, word_re))
+        return rest
+
+    def _fold_rep(self, char: str) -> str | None:
+        """大文字小文字無視で一致する代表文字を返す（自身が代表ならNone）"""
+        for rep in self._fold_reps:
+            if re.fullmatch(re.escape(rep), char, re.IGNORECASE):
+                return rep
+        return None
+
+    def matched_literals(self, text: str, text_has_japanese: bool = None, tokens: frozenset = None) -> set:
+        """
+        小文字化済みテキスト中でマッチするキーワード（小文字）の集合
+
+        tokens（PreparedText のトークン集合）を渡すと、英字の単語キーワードは集合の共通部分で判定する。
+        """
+        if not text:
+            return set()
+        if tokens is not None:
+            if text_has_japanese is None:
+                text_has_japanese = bool(JAPANESE_TEXT_RE.search(text))
+            if text_has_japanese:
+                found = set(self._token_literals_japanese.intersection(tokens))
+                rest = self._rest_japanese
+            else:
+                found = set(self._token_literals.intersection(tokens))
+                rest = self._rest_plain
+            for kw, substring, regex in rest:
+                if (kw in text) if substring else (regex.search(text) is not None):
+                    found.add(kw)
+            return found
+
+        found = set()
+        pattern, prefixes = self._scan_all
+        if pattern is None:
+            return found
+
+        fold_table = self._fold_table
+        exotic = set(self._exotic_re.findall(text))
+        if exotic:
+            fold_table = dict(fold_table)
+            for char in exotic:
+                fold_table[ord(char)] = self._fold_rep(char)
+        scan_text = text.translate(fold_table) if fold_table else text
+
+        checks = self._checks
+        search = pattern.search
+        m = search(scan_text)
+        while m:
+            pos = m.start()
+            for kw in prefixes[m.group()]:
+                if kw in found:
+                    continue
+                kind, short_re, word_re = checks[kw]
+                if kind == "japanese":
+                    ok = text.startswith(kw, pos)
+                else:
+                    if kind == "short" and text_has_japanese is None:
+                        text_has_japanese = bool(JAPANESE_TEXT_RE.search(text))
+                    if kind == "short" and text_has_japanese:
+                        ok = short_re.match(text, pos) is not None
+                    else:
+                        ok = word_re.match(text, pos) is not None
+                if ok:
+                    found.add(kw)
+            m = search(scan_text, pos + 1)
+        return found
+
+    def score(self, article: dict) -> tuple[float, list]:
+        """calculate_relevance_score と同じ (スコア, マッチしたキーワード) を返す"""
+        if self.neutral:
+            return 50, []
+
+        text = feedly_text.prepare_text(article)
+        title_found = self.matched_literals(text.title, text.title_has_japanese, text.title_tokens)
+        content_found = self.matched_literals(text.body, text.body_has_japanese, text.body_tokens)
+
+        title_matches = 0
+        content_matches = 0
+        matched_keywords = []
+
+        for kw_set in self.keyword_sets:
+            title_matched_kw = None
+            content_matched_kw = None
+            for kw in kw_set:
+                kw_lower = kw.lower()
+                if not title_matched_kw and kw_lower in title_found:
+                    title_matched_kw = kw
+                if not content_matched_kw and kw_lower in content_found:
+                    content_matched_kw = kw
+
+            if title_matched_kw:
+                title_matches += 1
+                if title_matched_kw not in matched_keywords:
+                    matched_keywords.append(title_matched_kw)
+            if content_matched_kw:
+                content_matches += 1
+                if content_matched_kw not in matched_keywords and content_matched_kw != title_matched_kw:
+                    matched_keywords.append(content_matched_kw)
+
+        trusted_source = self.sources.classify(article).trusted_source
+        if trusted_source is not None and trusted_source not in matched_keywords:
+            matched_keywords.append(f"@{trusted_source}")
+
+        if self.total_keyword_sets == 0:
+            return 50, []
+
+        score = relevance_from_matches(
+            title_matches, content_matches, trusted_source is not None, self.total_keyword_sets
+        )
+        if score > 0:
+            return score, matched_keywords
+        return 0, []
+
+
+class RelevanceCache:
+    """
+    関連度（スコア, マッチしたキーワード）の永続キャッシュ（SQLite）
+
+    エントリーIDをキーに、記事の照合対象（タイトル・本文・URL・ソース名）のハッシュと
+    照合設定（global_keywords / synonym_groups / trusted_sources）のハッシュを保存し、
+    両方が一致する場合だけ前回の結果を再利用する。記事か設定のどちらかが変われば再照合する。
+    注目度（ソーシャルメトリクス）と重み付け合計は毎回計算するためキャッシュしない。
+    """
+
+    def __init__(self, path: str, config: dict, max_entries: int = DEFAULT_SCORE_CACHE_MAX_ENTRIES):
+        self.path = expand_path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.config_hash = self.config_fingerprint(config)
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS relevance ("
+            " entry_id TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " config_hash TEXT NOT NULL,"
+            " score REAL NOT NULL,"
+            " keywords TEXT NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_relevance_accessed ON relevance (accessed_at)")
+        self.pending = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RelevanceCache | None":
+        """設定の scoring ブロックからキャッシュを構築（無効時はNone）"""
+        settings = config.get("scoring", {})
+        if not settings.get("cache", True):
+            return None
+        return cls(
+            settings.get("cache_file", DEFAULT_SCORE_CACHE_FILE),
+            config,
+            max_entries=settings.get("cache_max_entries", DEFAULT_SCORE_CACHE_MAX_ENTRIES)
+        )
+
+    @staticmethod
+    def config_fingerprint(config: dict) -> str:
+        """関連度に影響する設定のハッシュ"""
+        relevant = [
+            SCORE_CACHE_VERSION,
+            config.get("global_keywords", []),
+            config.get("synonym_groups", []),
+            config.get("trusted_sources", {}),
+        ]
+        return hashlib.sha1(json.dumps(relevant, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+    @staticmethod
+    def entry_key(article: dict) -> str:
+        """キャッシュのキー（エントリーID、なければURL）"""
+        return article.get("id") or extract_url(article)
+
+    @staticmethod
+    def content_hash(article: dict) -> str:
+        """照合対象（タイトル・本文・URL・ソース名）のハッシュ"""
+        source = article.get("source", {}).get("title", "") or article.get("origin", {}).get("title", "")
+        parts = (article.get("title", ""), article_content_text(article), extract_url(article), source)
+        return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+    def lookup(self, article: dict) -> tuple[float, list] | None:
+        """記事と設定が前回と同じならキャッシュ済みの関連度を返す"""
+        key = self.entry_key(article)
+        if not key:
+            self.misses += 1
+            return None
+        row = self.conn.execute(
+            "SELECT content_hash, config_hash, score, keywords FROM relevance WHERE entry_id = ?", (key,)
+        ).fetchone()
+        if row and row[0] == self.content_hash(article) and row[1] == self.config_hash:
+            self.hits += 1
+            self.conn.execute("UPDATE relevance SET accessed_at = ? WHERE entry_id = ?", (time.time(), key))
+            return row[2], json.loads(row[3])
+        self.misses += 1
+        return None
+
+    def add(self, article: dict, relevance: tuple[float, list]):
+        """照合結果を登録（close 時にまとめて書き込む。本文を破棄する前に呼ぶ）"""
+        key = self.entry_key(article)
+        if key:
+            score, keywords = relevance
+            self.pending.append((key, self.content_hash(article), self.config_hash, score, json.dumps(keywords)))
+
+    def close(self):
+        """登録分を書き込み、上限を超えたエントリーを最終参照が古い順に削除して閉じる"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO relevance"
+            " (entry_id, content_hash, config_hash, score, keywords, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(*row, now) for row in self.pending]
+        )
+        self.pending = []
+        count = self.conn.execute("SELECT COUNT(*) FROM relevance").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM relevance WHERE rowid IN "
+                "(SELECT rowid FROM relevance ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+        self.conn.commit()
+        self.conn.close()
+
+    def summary(self) -> str:
+        """ヒット/ミス件数の要約"""
+        return f"関連度キャッシュ: ヒット {self.hits} / ミス {self.misses}"
 
 
 def calculate_freshness_score(article: dict) -> float:
@@ -508,23 +1484,21 @@ def calculate_source_trust_score(article: dict, trusted_sources: dict) -> float:
     """
     ソース信頼度スコアを計算 (0-100)
 
-    設定ファイルで定義された信頼度を使用。
+    設定ファイルで定義された信頼度を使用（ドメインまたはソース名で判定、DomainClassifier の規則）。
     未定義のソースは50点。
     """
-    source_title = article.get("source", {}).get("title", "")
-    if not source_title:
-        origin = article.get("origin", {})
-        source_title = origin.get("title", "")
-
-    # 部分一致でチェック
-    for source_name, trust_value in trusted_sources.items():
-        if source_name.lower() in source_title.lower():
-            return trust_value * 100
-
-    return 50  # デフォルト
+    if not trusted_sources:
+        return 50  # デフォルト
+    return domain_classifier(None, trusted_sources).classify(article).trust
 
 
-def calculate_total_score(article: dict, config: dict, category_config: dict = None, social_metrics: dict = None) -> dict:
+def calculate_total_score(
+    article: dict,
+    config: dict,
+    category_config: dict = None,
+    social_metrics: dict = None,
+    matcher: RelevanceMatcher = None
+) -> dict:
     """
     総合スコアを計算
 
@@ -533,6 +1507,7 @@ def calculate_total_score(article: dict, config: dict, category_config: dict = N
         config: 設定
         category_config: カテゴリ設定（未使用、互換性のため残す）
         social_metrics: ソーシャルメトリクス {url: {"hatena": int, "hn": int}}
+        matcher: 構築済みの RelevanceMatcher（省略時は記事ごとに照合）
 
     Returns:
         dict: 各指標のスコアと総合スコア
@@ -553,12 +1528,18 @@ def calculate_total_score(article: dict, config: dict, category_config: dict = N
 
     # 各指標を計算（engagementは内訳も取得）
     engagement, engagement_breakdown = calculate_engagement_score(article, social_metrics)
-    relevance, matched_keywords = calculate_relevance_score(
-        article,
-        keywords=global_keywords,
-        synonym_groups=synonym_groups,
-        trusted_sources=trusted_sources
-    )
+    if "_relevance" in article:
+        # JSONL読み込み時に計算済み（本文は破棄済み）
+        relevance, matched_keywords = article["_relevance"]
+    elif matcher is not None:
+        relevance, matched_keywords = matcher.score(article)
+    else:
+        relevance, matched_keywords = calculate_relevance_score(
+            article,
+            keywords=global_keywords,
+            synonym_groups=synonym_groups,
+            trusted_sources=trusted_sources
+        )
 
     # 重み付け合計
     total = (
@@ -575,6 +1556,350 @@ def calculate_total_score(article: dict, config: dict, category_config: dict = N
     }
 
 
+def score_article(
+    article: dict,
+    config: dict,
+    category_configs: dict,
+    social_metrics: dict,
+    matcher: RelevanceMatcher,
+    thresholds: dict,
+    paywalled_domains: list
+) -> tuple[dict, str]:
+    """
+    1記事のスコアと優先度を計算
+
+    Returns:
+        tuple: (calculate_total_score の結果, 優先度)。関連度は article["_relevance"] に設定する
+    """
+    if "_relevance" not in article:
+        article["_relevance"] = matcher.score(article)
+    cat_config = category_configs.get(article.get("_category_slug", ""), {})
+    scores = calculate_total_score(article, config, cat_config, social_metrics, matcher)
+
+    # ペイウォール付きドメインの判定
+    if paywalled_domains and domain_classifier(paywalled_domains, config.get("trusted_sources")).classify(article).paywalled:
+        return scores, "PAYWALLED"
+    return scores, categorize_priority(scores["total"], thresholds)
+
+
+# ワーカープロセスごとの共有状態（_init_score_worker で1度だけ受け取る）
+_score_worker_state = {}
+
+
+def _init_score_worker(state: dict):
+    """ProcessPoolExecutor の initializer: マッチャーを受け取る"""
+    _score_worker_state.update(state)
+
+
+def _relevance_chunk(articles: list, with_excerpt: bool = False) -> list[tuple]:
+    """ワーカープロセスで記事のチャンクの関連度を照合（with_excerpt なら本文の冒頭も返す）"""
+    matcher = _score_worker_state["matcher"]
+    return [
+        (matcher.score(article), feedly_dedup.content_excerpt(article) if with_excerpt else None)
+        for article in articles
+    ]
+
+
+@contextmanager
+def relevance_pool(matcher: RelevanceMatcher, workers: int = 1):
+    """
+    照合用のプロセスプール（workers が1以下ならNone）
+
+    マッチャーは initializer で各ワーカーに1度だけ渡し、タスクごとには記事だけを送る。
+    逐次読み込みではバッチごとに同じプールを使い回す。
+    """
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_score_worker,
+        initargs=({"matcher": matcher},)
+    ) as executor:
+        yield executor
+
+
+def release_content(article: dict):
+    """照合を終えた記事の本文と前処理済みテキストを破棄（近似重複の判定用に冒頭だけ残す）"""
+    if "_content_excerpt" not in article:
+        article["_content_excerpt"] = feedly_dedup.content_excerpt(article)
+    article.pop("content", None)
+    article.pop("_text", None)
+
+
+def compute_relevance(
+    articles: list,
+    matcher: RelevanceMatcher,
+    workers: int = 1,
+    cache: "RelevanceCache" = None,
+    executor: ProcessPoolExecutor = None,
+    release: bool = False
+):
+    """
+    _relevance 未設定の記事の関連度を照合する
+
+    workers が2以上の場合は記事のチャンクに分けてプロセスプールで行う（executor を渡すと
+    そのプールを使う）。親プロセスで構築したマッチャーを渡すため、キーワードの照合順序
+    （= matched_keywords の順序）も逐次実行と同一になる。
+
+    Args:
+        cache: RelevanceCache（記事と設定が前回と同じなら照合を省略し、照合した結果を登録する）
+        executor: relevance_pool のプール（None: workers が2以上ならこの呼び出しの間だけ作る）
+        release: 照合後に本文（content・_text）を破棄する（release_content）
+    """
+    pending = []
+    for article in articles:
+        if "_relevance" in article:
+            continue
+        relevance = cache.lookup(article) if cache else None
+        if relevance is None:
+            pending.append(article)
+        else:
+            article["_relevance"] = relevance
+
+    if len(pending) < 2 or (executor is None and workers <= 1):
+        results = [
+            (matcher.score(article), feedly_dedup.content_excerpt(article) if release else None)
+            for article in pending
+        ]
+    elif executor is None:
+        with relevance_pool(matcher, workers) as executor:
+            results = _map_relevance(executor, pending, workers, release)
+    else:
+        results = _map_relevance(executor, pending, workers, release)
+
+    for article, (relevance, excerpt) in zip(pending, results):
+        article["_relevance"] = relevance
+        # キャッシュのキー（本文のハッシュ）は本文を破棄する前に求める
+        if cache:
+            cache.add(article, relevance)
+        if excerpt is not None:
+            article["_content_excerpt"] = excerpt
+    if release:
+        for article in articles:
+            release_content(article)
+
+
+def _map_relevance(executor: ProcessPoolExecutor, pending: list, workers: int, with_excerpt: bool) -> list:
+    """記事をチャンクに分けてプールで照合"""
+    # 1ワーカーあたり数チャンクに分けて偏りをならす
+    chunk_size = max(1, -(-len(pending) // (max(workers, 1) * 4)))
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    return [
+        result
+        for chunk in executor.map(_relevance_chunk, chunks, [with_excerpt] * len(chunks))
+        for result in chunk
+    ]
+
+
+def match_in_batches(records, matcher: RelevanceMatcher, cache: "RelevanceCache" = None, workers: int = 1) -> list:
+    """
+    逐次読み込んだ記事を RELEVANCE_BATCH_SIZE 件ずつ照合し、本文を破棄しながらリストにまとめる
+
+    本文を保持するのは照合中のバッチだけになる。workers が2以上なら全バッチで1つのプールを使う。
+    """
+    articles = []
+    batch = []
+    with relevance_pool(matcher, workers) as executor:
+        for article in records:
+            batch.append(article)
+            if len(batch) >= RELEVANCE_BATCH_SIZE:
+                compute_relevance(batch, matcher, workers, cache=cache, executor=executor, release=True)
+                articles.extend(batch)
+                batch = []
+        if batch:
+            compute_relevance(batch, matcher, workers, cache=cache, executor=executor, release=True)
+            articles.extend(batch)
+    return articles
+
+
+def score_articles(articles: list, workers: int = 1, vectorized: bool = None, **state):
+    """
+    全記事に _scores と _priority（と照合済みの _relevance）を設定
+
+    関連度の照合（compute_relevance）を先に済ませ、数値の計算（注目度・重み付け・優先度）は
+    NumPy があれば score_batch でまとめて、なければ score_article で記事ごとに行う。
+
+    Args:
+        articles: 記事リスト
+        workers: 照合のプロセス数（1 = 逐次実行）
+        vectorized: score_batch を使うか（None: NumPy があれば使う）
+        **state: score_article の config 以降の引数
+    """
+    compute_relevance(articles, state["matcher"], workers)
+
+    if vectorized is None:
+        vectorized = np is not None
+    if vectorized:
+        results = score_batch(
+            articles,
+            state["config"],
+            state["social_metrics"],
+            state["thresholds"],
+            state["paywalled_domains"]
+        )
+    else:
+        results = [score_article(article, **state) for article in articles]
+
+    for article, (scores, priority) in zip(articles, results):
+        article["_scores"] = scores
+        article["_priority"] = priority
+
+
+def score_batch(
+    articles: list,
+    config: dict,
+    social_metrics: dict,
+    thresholds: dict,
+    paywalled_domains: list
+) -> list[tuple[dict, str]]:
+    """
+    _relevance 設定済みの記事の (calculate_total_score の結果, 優先度) をまとめて計算
+
+    注目度の入力（engagement_rate・はてブ数・HNポイント）と関連度を配列にし、
+    上限・重み付けを配列演算で、優先度を np.digitize で求める。
+    calculate_engagement_score / calculate_total_score / categorize_priority と同じ値を返す
+    （丸めは Python の round で行い、スカラー計算で int になる値は int のまま返す）。
+    """
+    weights = config.get("scoring", {}).get("weights", {
+        "engagement": 0.60,
+        "relevance": 0.40
+    })
+    weight_engagement = weights.get("engagement", 0.60)
+    weight_relevance = weights.get("relevance", 0.40)
+    metrics_by_url = social_metrics or {}
+    sources = domain_classifier(paywalled_domains, config.get("trusted_sources")) if paywalled_domains else None
+
+    rates, hatena_counts, hn_points, hn_ids, relevances = [], [], [], [], []
+    for article in articles:
+        rates.append(article.get("engagement_rate") or article.get("engagementRate") or 0)
+        metrics = metrics_by_url.get(extract_url(article), {})
+        hatena_counts.append(metrics.get("hatena", 0))
+        hn_points.append(metrics.get("hn", 0))
+        hn_ids.append(metrics.get("hn_id", ""))
+        relevances.append(article["_relevance"][0])
+
+    rate = np.array(rates, dtype=float)
+    hatena = np.array(hatena_counts, dtype=float)
+    hn = np.array(hn_points, dtype=float)
+    relevance = np.array(relevances, dtype=float)
+
+    feedly = np.minimum(rate * 2, 20)
+    engagement_sum = feedly + np.minimum(hatena * 2, 50) + np.minimum(hn * 0.5, 50)
+    engagement = np.minimum(engagement_sum, 100)
+    total = engagement * weight_engagement + relevance * weight_relevance
+
+    # スカラー計算の min() と演算が int を返す位置（レポートでは 100 と 100.0 の表記が変わる）
+    def is_int(values: list):
+        return np.array([type(value) is int for value in values], dtype=bool)
+    feedly_int = is_int(rates) | (rate * 2 > 20)
+    engagement_int = (
+        (feedly_int & (is_int(hatena_counts) | (hatena * 2 > 50)) & (hn * 0.5 > 50))
+        | (engagement_sum > 100)
+    )
+    total_int = engagement_int & is_int(relevances) & all(type(w) is int for w in (weight_engagement, weight_relevance))
+
+    def rounded(values, int_mask) -> list:
+        return [int(v) if i else round(v, 1) for v, i in zip(values.tolist(), int_mask.tolist())]
+    feedly_values = rounded(feedly, feedly_int)
+    engagement_values = rounded(engagement, engagement_int)
+    total_values = rounded(total, total_int)
+
+    bins = [thresholds.get("optional", 40), thresholds.get("should_read", 60), thresholds.get("must_read", 80)]
+    if bins == sorted(bins):
+        levels = np.digitize(np.array(total_values, dtype=float), bins).tolist()
+        priorities = [PRIORITY_LEVELS[level] for level in levels]
+    else:
+        priorities = [categorize_priority(value, thresholds) for value in total_values]
+
+    results = []
+    for i, article in enumerate(articles):
+        scores = {
+            "engagement": engagement_values[i],
+            "engagement_breakdown": {
+                "feedly": feedly_values[i],
+                "hatena": hatena_counts[i],
+                "hn": hn_points[i],
+                "hn_id": hn_ids[i]
+            },
+            "relevance": round(relevances[i], 1),
+            "total": total_values[i],
+            "matched_keywords": article["_relevance"][1]
+        }
+        priority = "PAYWALLED" if sources and sources.classify(article).paywalled else priorities[i]
+        results.append((scores, priority))
+    return results
+
+
+def max_total_score(article: dict, weights: dict, hatena_count: int = None) -> float:
+    """
+    ソーシャルメトリクスの値によらず届きうる総合スコアの上限（_relevance 設定済みの記事）
+
+    注目度は Feedly 分（記事データから分かる）とはてブ分（hatena_count、None なら未知）に、
+    未知の指標の上限（はてブ・HN 各50点）を足した値までとりうる。
+    総合スコアは注目度の1次式なので、未知の指標が0の場合と上限の場合の大きい方。
+    """
+    rate = article.get("engagement_rate") or article.get("engagementRate") or 0
+    known = min(rate * 2, 20)
+    unknown = 100
+    if hatena_count is not None:
+        known += min(hatena_count * 2, 50)
+        unknown = 50
+    relevance_part = article["_relevance"][0] * weights.get("relevance", 0.40)
+    weight_engagement = weights.get("engagement", 0.60)
+    return max(
+        min(known, 100) * weight_engagement + relevance_part,
+        min(known + unknown, 100) * weight_engagement + relevance_part
+    )
+
+
+def hn_metrics_filter(articles: list, config: dict, thresholds: dict):
+    """
+    fetch_social_metrics_for_articles の hn_filter（_relevance 設定済みの記事から作る）
+
+    はてブ数が分かった時点で、HNポイントが最大でも総合スコアが最も低い閾値に届かない
+    URL（そのURLのどの記事も SKIP が確定）は False を返す。
+    """
+    weights = config.get("scoring", {}).get("weights", {
+        "engagement": 0.60,
+        "relevance": 0.40
+    })
+    lowest = min(
+        thresholds.get("must_read", 80), thresholds.get("should_read", 60), thresholds.get("optional", 40)
+    )
+    by_url = defaultdict(list)
+    for article in articles:
+        by_url[extract_url(article)].append(article)
+
+    def needs_hn(url: str, hatena_count: int) -> bool:
+        return any(
+            round(max_total_score(article, weights, hatena_count), 1) >= lowest
+            for article in by_url.get(url, ())
+        )
+    return needs_hn
+
+
+def social_metrics_candidates(articles: list, config: dict, thresholds: dict) -> list:
+    """
+    ソーシャルメトリクスを取得する記事（_relevance 設定済み）
+
+    はてブ・HNが最大でも総合スコアが最も低い閾値（通常は optional）に届かない記事は
+    優先度が SKIP に決まるため除く。
+    """
+    weights = config.get("scoring", {}).get("weights", {
+        "engagement": 0.60,
+        "relevance": 0.40
+    })
+    lowest = min(
+        thresholds.get("must_read", 80), thresholds.get("should_read", 60), thresholds.get("optional", 40)
+    )
+    return [article for article in articles if round(max_total_score(article, weights), 1) >= lowest]
+
+
+# np.digitize の結果（optional / should_read / must_read 未満から順）→ 優先度
+PRIORITY_LEVELS = ("SKIP", "OPTIONAL", "SHOULD READ", "MUST READ")
+
+
 def categorize_priority(score: float, thresholds: dict) -> str:
     """スコアに基づいて優先度カテゴリを決定"""
     if score >= thresholds.get("must_read", 80):
@@ -596,8 +1921,7 @@ def deduplicate_articles(articles: list) -> list:
         return new_article.get("_scores", {}).get("total", 0) > existing_article.get("_scores", {}).get("total", 0)
 
     for article in articles:
-        title = article.get("title", "No Title")
-        norm_title = normalize_title(title)
+        norm_title = article_norm_title(article)
         url = extract_url(article)
 
         # URL一致による重複チェック（優先）
@@ -605,7 +1929,7 @@ def deduplicate_articles(articles: list) -> list:
             if _better_score(article, seen_urls[url]):
                 # 古い方をtitleからも除去
                 old = seen_urls[url]
-                old_norm = normalize_title(old.get("title", "No Title"))
+                old_norm = article_norm_title(old)
                 if old_norm in seen_titles and seen_titles[old_norm] is old:
                     seen_titles[old_norm] = article
                 seen_urls[url] = article
@@ -633,8 +1957,51 @@ def deduplicate_articles(articles: list) -> list:
     return result
 
 
-def generate_markdown_report(articles: list, config: dict, output_path: str):
-    """Markdownレポートを生成"""
+def select_top_articles(articles: list, limit: int = None) -> tuple[list, dict]:
+    """
+    総合スコアの高い順に並べた記事と、表に出さない記事のカテゴリ別件数を返す
+
+    limit を指定するとカテゴリ（_category_name）ごとに上位 limit 件だけを heapq で選び、
+    全件はソートしない。同点の記事は入力順（全件を安定ソートした場合と同じ順序）。
+
+    Returns:
+        tuple: (表に出す記事, {カテゴリ名: 省略した件数})
+    """
+    def total(i):
+        return articles[i].get("_scores", {}).get("total", 0)
+
+    if not limit:
+        return sorted(articles, key=lambda x: -x.get("_scores", {}).get("total", 0)), {}
+
+    by_category = defaultdict(list)
+    for i, article in enumerate(articles):
+        by_category[article.get("_category_name", "")].append(i)
+
+    selected = []
+    omitted = {}
+    for name, indices in by_category.items():
+        if len(indices) > limit:
+            omitted[name] = len(indices) - limit
+            # nlargest は sorted(reverse=True)[:limit] と同じく同点なら入力順
+            indices = heapq.nlargest(limit, indices, key=total)
+        selected.extend(indices)
+    selected.sort(key=lambda i: (-total(i), i))
+    return [articles[i] for i in selected], omitted
+
+
+def generate_markdown_report(articles: list, config: dict, output_path: str, max_per_category: int = None):
+    """
+    Markdownレポートを生成
+
+    Args:
+        articles: スコアリング済みの記事（順序は問わない。各優先度の表は総合スコア順）
+        config: 設定
+        output_path: 出力先
+        max_per_category: 各優先度の表に出すカテゴリごとの上限件数
+            （None: report.max_articles_per_category、0: 全件）。残りは件数だけを示す
+    """
+    if max_per_category is None:
+        max_per_category = config.get("report", {}).get("max_articles_per_category")
     thresholds = config.get("scoring", {}).get("thresholds", {
         "must_read": 80,
         "should_read": 60,
@@ -701,13 +2068,14 @@ def generate_markdown_report(articles: list, config: dict, output_path: str):
         group = priority_groups.get(priority, [])
         if not group:
             continue
+        shown, omitted = select_top_articles(group, max_per_category)
 
         lines.append(f"## {priority} ({len(group)}件)")
         lines.append("")
         lines.append("| # | 記事 | スコア | 注目 | Feedly | はてブ | HN | 関連 | マッチKW | 読了 | 保存 |")
         lines.append("|---|------|--------|------|--------|--------|-----|------|----------|------|------|")
 
-        for i, article in enumerate(group, 1):
+        for i, article in enumerate(shown, 1):
             title = article.get("title", "No Title")[:50].replace("|", "｜")
             url = extract_url(article)
             scores = article.get("_scores", {})
@@ -747,6 +2115,13 @@ def generate_markdown_report(articles: list, config: dict, output_path: str):
                     f"{matched_kw} | [ ] | [ ] |"
                 )
 
+        if omitted:
+            breakdown = "、".join(f"{name or 'カテゴリなし'}: {count}件" for name, count in omitted.items())
+            lines.append("")
+            lines.append(
+                f"*ほか {len(group) - len(shown)}件（カテゴリごとに上位{max_per_category}件を表示。{breakdown}）*"
+            )
+
         lines.append("")
 
     # 統計
@@ -781,16 +2156,75 @@ def main():
     )
     parser.add_argument(
         "--input",
-        required=True,
-        help="Input JSON file with fetched articles"
+        help="Input JSON file with fetched articles (.jsonl or - for JSONL from feedly_fetch.py --format jsonl; "
+             "gzip/zstd-compressed input is detected automatically)"
+    )
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="Read articles from the local article store instead of --input"
     )
     parser.add_argument(
         "--output",
         default=None,
         help="Output markdown file path (default: Daily/YYYY-MM/YYYY-MM-DD（曜日）_feeds-report.md)"
     )
+    parser.add_argument(
+        "--no-social-cache",
+        action="store_true",
+        help="Bypass the on-disk social metrics cache and query every URL"
+    )
+    parser.add_argument(
+        "--no-score-cache",
+        action="store_true",
+        help="Bypass the on-disk relevance cache and re-match every article"
+    )
+    parser.add_argument(
+        "--all-social-metrics",
+        action="store_true",
+        help="Fetch social metrics for every article, including ones that cannot reach any threshold "
+             "(default: social_metrics.skip_unreachable = true skips them)"
+    )
+    parser.add_argument(
+        "--social-engine",
+        choices=["auto", "async", "thread"],
+        default=None,
+        help="Social metrics fetch engine (default: social_metrics.engine or auto = async if httpx is installed)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Score articles in N worker processes (default: 1 = serial)"
+    )
+    parser.add_argument(
+        "--max-per-category",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Show at most N articles per category in each priority table and count the rest "
+             "(default: report.max_articles_per_category; 0 = show all)"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE_FILE",
+        help="Record per-stage wall/CPU time, peak RSS and HTTP counters to this file"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=feedly_trace.TRACE_FORMATS,
+        default="json",
+        help="Trace file format: json (stage summary + events) or chrome (trace event format) (default: json)"
+    )
 
     args = parser.parse_args()
+    if not args.input and not args.from_store:
+        parser.error("one of --input or --from-store is required")
+
+    # 計測（途中で終了した場合も終了時に書き出す）
+    if args.trace:
+        feedly_trace.enable()
+        atexit.register(feedly_trace.write, args.trace, args.trace_format)
 
     # 設定読み込み
     try:
@@ -805,8 +2239,22 @@ def main():
         base_dir = config.get("output_dir", "Daily")
         output_path = generate_default_output_path(base_dir)
 
+    # キーワード照合器は1度だけ構築して全記事で共有
+    matcher = RelevanceMatcher.from_config(config)
+
+    # 関連度キャッシュ（記事と照合設定が前回と同じなら照合を省略）
+    score_cache = None
+    if not args.no_score_cache:
+        score_cache = RelevanceCache.from_config(config)
+
     # 記事読み込み
-    articles, metadata = load_articles(args.input)
+    with feedly_trace.stage("load"):
+        if args.from_store:
+            articles = load_articles_store(config, matcher, score_cache, args.workers)
+        elif is_jsonl_input(args.input):
+            articles = load_articles_jsonl(args.input, matcher, score_cache, args.workers)
+        else:
+            articles, metadata = load_articles(args.input)
     if not articles:
         print("No articles found", file=sys.stderr)
         sys.exit(1)
@@ -816,10 +2264,6 @@ def main():
     # カテゴリ設定をslugでインデックス化
     category_configs = {cat["slug"]: cat for cat in config.get("categories", [])}
 
-    # ソーシャルメトリクス取得（はてブ + HN）
-    social_metrics = fetch_social_metrics_for_articles(articles)
-
-    # スコアリング
     thresholds = config.get("scoring", {}).get("thresholds", {
         "must_read": 80,
         "should_read": 60,
@@ -827,29 +2271,73 @@ def main():
     })
     paywalled_domains = config.get("paywalled_domains", [])
 
-    for article in articles:
-        cat_slug = article.get("_category_slug", "")
-        cat_config = category_configs.get(cat_slug, {})
-
-        scores = calculate_total_score(article, config, cat_config, social_metrics)
-        article["_scores"] = scores
-
-        # ペイウォール付きドメインの判定
-        if is_paywalled(article, paywalled_domains):
-            article["_priority"] = "PAYWALLED"
-        else:
-            article["_priority"] = categorize_priority(scores["total"], thresholds)
-
-    # 重複除去
-    articles = deduplicate_articles(articles)
-    print(f"After deduplication: {len(articles)} articles", file=sys.stderr)
-
-    # 総合スコアでソート
-    articles.sort(key=lambda x: -x.get("_scores", {}).get("total", 0))
-
-    # レポート生成
-    count = generate_markdown_report(articles, config, output_path)
+    # 関連度の照合（ローカルで完結する）を先に済ませ、以降は使わない本文を破棄する
+    with feedly_trace.stage("relevance", workers=args.workers):
+        compute_relevance(articles, matcher, args.workers, cache=score_cache, release=True)
+
+    # ソーシャルメトリクス取得（はてブ + HN、キャッシュ有効期限内のURLは再取得しない）。
+    # はてブ・HNが最大でも閾値に届かない記事（SKIP が確定）は取得せず、
+    # HNははてブ数が分かった後で届きうるURLだけ取得する
+    social_settings = config.get("social_metrics", {})
+    social_articles = articles
+    hn_filter = None
+    if social_settings.get("skip_unreachable", True) and not args.all_social_metrics:
+        social_articles = social_metrics_candidates(articles, config, thresholds)
+        skipped = len(articles) - len(social_articles)
+        if skipped:
+            print(f"Skipping social metrics for {skipped} articles that cannot reach a threshold", file=sys.stderr)
+        hn_filter = hn_metrics_filter(social_articles, config, thresholds)
+    cache = None
+    if not args.no_social_cache:
+        cache = SocialMetricsCache.from_config(config)
+    batch_size = min(social_settings.get("hatena_batch_size", feedly_social.HATENA_BATCH_SIZE), feedly_social.HATENA_BATCH_SIZE)
+    with feedly_trace.stage("social_metrics"):
+        try:
+            social_metrics = fetch_social_metrics_for_articles(
+                social_articles,
+                cache=cache,
+                batch_size=max(1, batch_size),
+                engine=args.social_engine or social_settings.get("engine", "auto"),
+                rate_limits=social_settings.get("rate_limits"),
+                deadline=social_settings.get("deadline_seconds"),
+                hn_filter=hn_filter
+            )
+        finally:
+            if cache:
+                cache.close()
+
+    # スコアリング（関連度は照合済み）
+    with feedly_trace.stage("scoring"):
+        score_articles(
+            articles,
+            workers=args.workers,
+            config=config,
+            category_configs=category_configs,
+            social_metrics=social_metrics,
+            matcher=matcher,
+            thresholds=thresholds,
+            paywalled_domains=paywalled_domains
+        )
+
+        if score_cache:
+            print(f"  → {score_cache.summary()}", file=sys.stderr)
+            score_cache.close()
+
+    with feedly_trace.stage("dedup"):
+        # 重複除去
+        articles = deduplicate_articles(articles)
+        print(f"After deduplication: {len(articles)} articles", file=sys.stderr)
+
+        # 近似重複（転載・配信記事など）の統合
+        if "deduplication" in config:
+            articles, merged = feedly_dedup.remove_near_duplicates(articles, config["deduplication"])
+            print(f"After near-duplicate merge: {len(articles)} articles ({merged} merged)", file=sys.stderr)
+
+    # レポート生成（優先度ごとに総合スコア順、上限件数があれば上位だけを選ぶ）
+    with feedly_trace.stage("report"):
+        count = generate_markdown_report(articles, config, output_path, args.max_per_category)
     print(f"Report generated: {output_path} ({count} articles)", file=sys.stderr)
+    feedly_http.print_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+ソーシャルメトリクス（はてブ + Hacker News）の取得（スレッド実装）と共通の定数・パーサ
+
+feedly_score.py と非同期エンジン feedly_social_async.py の両方から使用する。
+HTTPは feedly_http 経由（再試行・統計を共有）。
+
+Usage:
+    import feedly_social
+
+    hatena, hn, stats = feedly_social.fetch_social_metrics_threaded(urls, urls)
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
+
+try:
+    import requests
+except ImportError:
+    requests = None  # オプショナル依存
+
+import feedly_http
+
+HATENA_COUNT_API = "https://bookmark.hatenaapis.com/count"
+HN_SEARCH_API = "https://hn.algolia.com/api/v1/search"
+# count/entries で1リクエストに指定できるURL数の上限
+HATENA_BATCH_SIZE = 50
+# はてブ・HNは失敗しても0扱いで続行できるため再試行は控えめにする
+SOCIAL_HTTP_RETRIES = 1
+
+
+def parse_hatena_count(text: str) -> int:
+    """count/entry のレスポンス本文をブックマーク数に変換"""
+    return int(text) if text.isdigit() else 0
+
+
+def parse_hatena_counts(urls: list, data) -> dict | None:
+    """count/entries のレスポンスを {url: ブックマーク数} に変換（不正な形式ならNone）"""
+    if not isinstance(data, dict):
+        return None
+    return {url: int(data.get(url) or 0) for url in urls}
+
+
+def parse_hn_points(data: dict) -> tuple[int, str]:
+    """HN検索APIのレスポンスから (ポイント数, objectID) を取り出す"""
+    hits = data.get("hits", [])
+    if hits:
+        points = hits[0].get("points", 0) or 0
+        object_id = hits[0].get("objectID", "") or ""
+        return points, object_id
+    return 0, ""
+
+
+def fetch_hatena_bookmark_count(url: str, default: int | None = 0) -> int | None:
+    """
+    はてなブックマーク数を取得
+
+    Args:
+        url: 記事URL
+        default: エラー時の戻り値
+
+    Returns:
+        ブックマーク数（エラー時はdefault）
+    """
+    if not requests:
+        return default
+    try:
+        api_url = f"{HATENA_COUNT_API}/entry?url={quote(url, safe='')}"
+        resp = feedly_http.get(api_url, timeout=5, retries=SOCIAL_HTTP_RETRIES)
+        if resp.status_code == 200:
+            return parse_hatena_count(resp.text)
+    except Exception:
+        pass
+    return default
+
+
+def fetch_hatena_bookmark_counts(urls: list) -> dict | None:
+    """
+    はてなブックマーク数を複数URLまとめて取得（count/entries）
+
+    Args:
+        urls: 記事URLリスト（最大 HATENA_BATCH_SIZE 件）
+
+    Returns:
+        {url: ブックマーク数}（レスポンスに含まれないURLは0）。エラー時はNone
+    """
+    if not requests or not urls:
+        return None
+    try:
+        resp = feedly_http.get(
+            f"{HATENA_COUNT_API}/entries",
+            params=[("url", url) for url in urls],
+            timeout=10,
+            retries=SOCIAL_HTTP_RETRIES
+        )
+        if resp.status_code == 200:
+            return parse_hatena_counts(urls, resp.json())
+    except Exception:
+        pass
+    return None
+
+
+def fetch_hn_points(url: str, default: tuple | None = (0, "")) -> tuple[int, str] | None:
+    """
+    Hacker News のポイント数とobjectIDを取得
+
+    Args:
+        url: 記事URL
+        default: エラー時の戻り値
+
+    Returns:
+        (ポイント数, objectID) のタプル（エラー時はdefault）
+    """
+    if not requests:
+        return default
+    try:
+        api_url = f"{HN_SEARCH_API}?query={quote(url, safe='')}&restrictSearchableAttributes=url&hitsPerPage=1"
+        resp = feedly_http.get(api_url, timeout=5, retries=SOCIAL_HTTP_RETRIES)
+        if resp.status_code == 200:
+            return parse_hn_points(resp.json())
+    except Exception:
+        pass
+    return default
+
+
+def fetch_social_metrics_threaded(
+    hatena_urls: list,
+    hn_urls: list,
+    max_workers: int = 10,
+    batch_size: int = HATENA_BATCH_SIZE
+) -> tuple[dict, dict, dict]:
+    """
+    スレッドプールでソーシャルメトリクスを取得（非同期エンジンが使えない場合の標準実装）
+
+    Args:
+        hatena_urls: はてブ数を取得するURLリスト
+        hn_urls: HNポイントを取得するURLリスト
+        max_workers: 並列ワーカー数
+        batch_size: はてブ一括取得（count/entries）1リクエストあたりのURL数
+
+    Returns:
+        (はてブ {url: int}, HN {url: [points, objectID]}, 統計) のタプル。
+        取得に失敗したURLは含まない
+    """
+    fetched_hatena = {}
+    fetched_hn = {}
+    stats = {"hatena_batches": 0, "batch_fallbacks": 0, "unfinished": 0}
+
+    def fetch_hatena_batch(batch: list) -> tuple:
+        return "hatena_batch", batch, fetch_hatena_bookmark_counts(batch)
+
+    def fetch_hatena(url: str) -> tuple:
+        return "hatena", url, fetch_hatena_bookmark_count(url, default=None)
+
+    def fetch_hn(url: str) -> tuple:
+        return "hn", url, fetch_hn_points(url, default=None)
+
+    # はてブは count/entries でまとめて取得し、失敗したバッチのみURLごとに再取得
+    batches = [hatena_urls[i:i + batch_size] for i in range(0, len(hatena_urls), batch_size)]
+    stats["hatena_batches"] = len(batches)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(fetch_hatena_batch, batch) for batch in batches}
+        pending |= {executor.submit(fetch_hn, url) for url in hn_urls}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    source, key, result = future.result()
+                except Exception:
+                    continue
+                if result is None:
+                    if source == "hatena_batch":
+                        stats["batch_fallbacks"] += 1
+                        pending |= {executor.submit(fetch_hatena, url) for url in key}
+                elif source == "hatena_batch":
+                    fetched_hatena.update(result)
+                elif source == "hatena":
+                    fetched_hatena[key] = result
+                else:
+                    fetched_hn[key] = list(result)
+
+    return fetched_hatena, fetched_hn, stats
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+ソーシャルメトリクス（はてブ + Hacker News）の非同期取得エンジン
+
+asyncio + httpx で、ホストごとの同時接続数（セマフォ）とトークンバケットによる
+レート制限を守りながら並列取得する。接続はホストごとのkeep-aliveプールで再利用し、
+全体の制限時間を超えた取得は打ち切る（遅いホストで全体が止まらないようにする）。
+HTTPは feedly_http.async_request 経由（スレッド実装と同じ再試行規則・統計）。
+httpx が無い環境では feedly_social.py のスレッド実装が使われる。
+
+Usage:
+    # ローカルのスタブサーバーでスレッド実装と比較（外部への通信なし）
+    python feedly_social_async.py --benchmark --urls 1000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # オプショナル依存
+
+import feedly_http
+import feedly_social
+from feedly_social import (
+    HATENA_BATCH_SIZE,
+    HATENA_COUNT_API,
+    HN_SEARCH_API,
+    SOCIAL_HTTP_RETRIES,
+    parse_hatena_count,
+    parse_hatena_counts,
+    parse_hn_points,
+)
+
+# ソースごとの同時接続数とレート制限（rate_per_second が0以下なら無制限）
+DEFAULT_RATE_LIMITS = {
+    "hatena": {"concurrency": 4, "rate_per_second": 10.0, "burst": 10},
+    "hn": {"concurrency": 8, "rate_per_second": 10.0, "burst": 10},
+}
+DEFAULT_DEADLINE_SECONDS = 120
+REQUEST_TIMEOUT_SECONDS = 5
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限（1リクエスト = 1トークン）"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """トークンが補充されるまで待って1つ消費する"""
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """ホスト単位の同時接続数とレート制限"""
+
+    def __init__(self, concurrency: int = 4, rate_per_second: float = 10.0, burst: int = 10):
+        self.semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self.bucket = TokenBucket(rate_per_second, burst)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+async def _get(client, limiter: HostLimiter, url: str, params=None):
+    """制限付きでGETし（feedly_http の規則で再試行）、200以外やエラーならNoneを返す"""
+    try:
+        async with limiter:
+            resp = await feedly_http.async_request(client, "GET", url, retries=SOCIAL_HTTP_RETRIES, params=params)
+    except httpx.HTTPError:
+        return None
+    if resp.status_code != 200:
+        return None
+    return resp
+
+
+async def fetch_hatena_count_async(client, limiter: HostLimiter, api: str, url: str) -> int | None:
+    """はてなブックマーク数を取得（エラー時はNone）"""
+    resp = await _get(client, limiter, f"{api}/entry", params={"url": url})
+    if resp is None:
+        return None
+    # 想定外の形式の本文もスレッド版（feedly_social）と同じくエラーとして扱う
+    try:
+        return parse_hatena_count(resp.text)
+    except Exception:
+        return None
+
+
+async def fetch_hatena_counts_async(client, limiter: HostLimiter, api: str, urls: list) -> dict | None:
+    """はてなブックマーク数を count/entries でまとめて取得（エラー時はNone）"""
+    resp = await _get(client, limiter, f"{api}/entries", params=[("url", url) for url in urls])
+    if resp is None:
+        return None
+    try:
+        return parse_hatena_counts(urls, resp.json())
+    except Exception:
+        return None
+
+
+async def fetch_hn_points_async(client, limiter: HostLimiter, api: str, url: str) -> tuple[int, str] | None:
+    """Hacker News のポイント数とobjectIDを取得（エラー時はNone）"""
+    params = {"query": url, "restrictSearchableAttributes": "url", "hitsPerPage": 1}
+    resp = await _get(client, limiter, api, params=params)
+    if resp is None:
+        return None
+    try:
+        return parse_hn_points(resp.json())
+    except Exception:
+        return None
+
+
+async def _fetch_all(
+    hatena_urls: list,
+    hn_urls: list,
+    hatena_api: str,
+    hn_api: str,
+    batch_size: int,
+    rate_limits: dict,
+    deadline: float
+) -> tuple[dict, dict, dict]:
+    limits = {source: {**DEFAULT_RATE_LIMITS[source], **(rate_limits or {}).get(source, {})}
+              for source in DEFAULT_RATE_LIMITS}
+    hatena_limiter = HostLimiter(**limits["hatena"])
+    hn_limiter = HostLimiter(**limits["hn"])
+
+    fetched_hatena = {}
+    fetched_hn = {}
+    batches = [hatena_urls[i:i + batch_size] for i in range(0, len(hatena_urls), batch_size)]
+    stats = {"hatena_batches": len(batches), "batch_fallbacks": 0, "unfinished": 0}
+
+    # 接続プールはホストごとの同時接続数の合計に合わせる（keep-aliveで再利用）
+    pool_size = sum(max(limit["concurrency"], 1) for limit in limits.values())
+    client_limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS, limits=client_limits) as client:
+
+        async def hatena_single(url: str):
+            count = await fetch_hatena_count_async(client, hatena_limiter, hatena_api, url)
+            if count is not None:
+                fetched_hatena[url] = count
+
+        async def hatena_batch(batch: list):
+            counts = await fetch_hatena_counts_async(client, hatena_limiter, hatena_api, batch)
+            if counts is not None:
+                fetched_hatena.update(counts)
+                return
+            # 一括取得に失敗したバッチはURLごとに取得
+            stats["batch_fallbacks"] += 1
+            await asyncio.gather(*(hatena_single(url) for url in batch))
+
+        async def hn(url: str):
+            result = await fetch_hn_points_async(client, hn_limiter, hn_api, url)
+            if result is not None:
+                fetched_hn[url] = list(result)
+
+        # タスク → 対象URL数（制限時間超過時の未取得件数の集計用）
+        tasks = {asyncio.create_task(hatena_batch(batch)): len(batch) for batch in batches}
+        tasks.update({asyncio.create_task(hn(url)): 1 for url in hn_urls})
+        if not tasks:
+            return fetched_hatena, fetched_hn, stats
+
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        stats["unfinished"] = sum(tasks[task] for task in pending)
+
+    return fetched_hatena, fetched_hn, stats
+
+
+def fetch_social_metrics_async(
+    hatena_urls: list,
+    hn_urls: list,
+    hatena_api: str = HATENA_COUNT_API,
+    hn_api: str = HN_SEARCH_API,
+    batch_size: int = HATENA_BATCH_SIZE,
+    rate_limits: dict = None,
+    deadline: float = None
+) -> tuple[dict, dict, dict]:
+    """
+    asyncio でソーシャルメトリクスを取得
+
+    Args:
+        hatena_urls: はてブ数を取得するURLリスト
+        hn_urls: HNポイントを取得するURLリスト
+        hatena_api: はてなブックマーク件数APIのベースURL
+        hn_api: HN検索APIのURL
+        batch_size: はてブ一括取得（count/entries）1リクエストあたりのURL数
+        rate_limits: {"hatena": {...}, "hn": {...}}（concurrency / rate_per_second / burst）
+        deadline: 全体の制限時間（秒）。超過分は打ち切り未取得として扱う
+
+    Returns:
+        (はてブ {url: int}, HN {url: [points, objectID]}, 統計) のタプル。
+        取得に失敗したURLは含まない
+    """
+    if httpx is None:
+        raise RuntimeError("httpx not installed. Run: pip install httpx")
+    return asyncio.run(_fetch_all(
+        hatena_urls,
+        hn_urls,
+        hatena_api,
+        hn_api,
+        batch_size,
+        rate_limits,
+        deadline if deadline is not None else DEFAULT_DEADLINE_SECONDS
+    ))
+
+
+# =============================================================================
+# ベンチマーク（ローカルのスタブサーバー）
+# =============================================================================
+
+def start_stub_server(latency: float) -> tuple[ThreadingHTTPServer, str]:
+    """はてブ・HN APIを模したローカルサーバーを起動し (server, base_url) を返す"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # ヘッダーと本文の分割送信で遅延ACK待ちにならないように
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            parsed = urlsplit(self.path)
+            query = parse_qs(parsed.query)
+            if parsed.path.endswith("/count/entries"):
+                body = json.dumps({url: len(url) % 7 for url in query.get("url", [])})
+            elif parsed.path.endswith("/count/entry"):
+                body = str(len(query.get("url", [""])[0]) % 7)
+            else:
+                body = json.dumps({"hits": [{"points": len(query.get("query", [""])[0]), "objectID": "1"}]})
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_benchmark(url_count: int, latency: float, batch_size: int, concurrency: int):
+    """
+    スレッド実装と非同期実装をスタブサーバーに対して計測
+
+    concurrency はスレッド実装のワーカー数、非同期実装ではホストごとの同時接続数。
+    """
+    server, base = start_stub_server(latency)
+    hatena_api = f"{base}/count"
+    hn_api = f"{base}/api/v1/search"
+    feedly_social.HATENA_COUNT_API = hatena_api
+    feedly_social.HN_SEARCH_API = hn_api
+    urls = [f"https://example.com/articles/{i}" for i in range(url_count)]
+    unlimited = {source: {"concurrency": concurrency, "rate_per_second": 0} for source in DEFAULT_RATE_LIMITS}
+
+    results = {}
+    try:
+        if feedly_social.requests:
+            start = time.perf_counter()
+            hatena, hn, _ = feedly_social.fetch_social_metrics_threaded(
+                urls, urls, max_workers=concurrency, batch_size=batch_size
+            )
+            results["thread"] = (time.perf_counter() - start, len(hatena), len(hn))
+        if httpx is not None:
+            start = time.perf_counter()
+            hatena, hn, _ = fetch_social_metrics_async(
+                urls, urls, hatena_api=hatena_api, hn_api=hn_api,
+                batch_size=batch_size, rate_limits=unlimited
+            )
+            results["async"] = (time.perf_counter() - start, len(hatena), len(hn))
+    finally:
+        server.shutdown()
+
+    print(
+        f"URLs: {url_count}, latency: {latency * 1000:.0f}ms, "
+        f"batch size: {batch_size}, concurrency: {concurrency}"
+    )
+    for engine, (elapsed, hatena_count, hn_count) in results.items():
+        print(f"  {engine:6s}: {elapsed:7.2f}s  (はてブ {hatena_count}, HN {hn_count})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async social metrics engine for feedly_score.py")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Benchmark thread and async engines against a local stub server"
+    )
+    parser.add_argument("--urls", type=int, default=500, help="Number of URLs (default: 500)")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Stub server latency per request in seconds (default: 0.05)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Thread workers / async connections per host (default: 10)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=HATENA_BATCH_SIZE,
+        help=f"Hatena batch size (default: {HATENA_BATCH_SIZE})"
+    )
+
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        sys.exit(0)
+
+    run_benchmark(args.urls, args.latency, args.batch_size, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
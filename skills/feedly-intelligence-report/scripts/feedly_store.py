@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+ローカルの記事ストア（SQLite）
+
+feedly_fetch.py が取得した記事をエントリーIDで upsert し、
+feedly_score.py（--from-store）、feedly_bookmark.py（URL → エントリーID）、
+feedly_fetch.py --mark-read が毎回JSONを読み直さずに直接参照する。
+URL・クロール時刻・カテゴリ・ソースストリームにインデックスを張っている。
+
+Usage:
+    import feedly_store
+
+    store = feedly_store.ArticleStore.from_config(config)
+    store.upsert([(category_label, category_slug, article_data), ...])
+    entry_ids = store.entry_ids_for_urls(urls)
+    store.close()
+"""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_ARTICLE_STORE_FILE = "~/.feedly/articles.sqlite"
+# 取得時にこれより古い記事（crawled）を削除する（0/null で無期限）
+DEFAULT_RETENTION_DAYS = 14
+# SQLiteのプレースホルダ数の上限を超えないようにIN句を分割する
+QUERY_CHUNK_SIZE = 500
+
+
+def expand_path(path: str) -> Path:
+    """パスを展開（~ 対応）"""
+    return Path(os.path.expanduser(path))
+
+
+class ArticleStore:
+    """
+    エントリーIDをキーにした記事ストア
+
+    記事データ（extract_article_data の出力）はJSONで保存し、
+    検索に使う列（URL・crawled・カテゴリ・ソースストリーム）だけを別カラムに持つ。
+    """
+
+    def __init__(self, path: str = DEFAULT_ARTICLE_STORE_FILE):
+        self.path = expand_path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " id TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " crawled INTEGER NOT NULL,"
+            " category TEXT NOT NULL,"
+            " category_slug TEXT NOT NULL,"
+            " stream_id TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_crawled ON articles (crawled)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category_slug)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_stream ON articles (stream_id)")
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ArticleStore":
+        """設定の article_store_file からストアを開く"""
+        return cls(config.get("article_store_file", DEFAULT_ARTICLE_STORE_FILE))
+
+    def upsert(self, records) -> int:
+        """
+        記事を追加・更新
+
+        Args:
+            records: (カテゴリ名, カテゴリslug, 記事データ) のイテラブル
+
+        Returns:
+            追加・更新した件数
+        """
+        now = time.time()
+        rows = [
+            (
+                article["id"],
+                article.get("url", ""),
+                article.get("crawled", 0),
+                label,
+                slug,
+                article.get("source", {}).get("stream_id", ""),
+                json.dumps(article, ensure_ascii=False),
+                now,
+            )
+            for label, slug, article in records
+            if article.get("id")
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO articles"
+            " (id, url, crawled, category, category_slug, stream_id, data, stored_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def delete(self, entry_ids: list) -> int:
+        """指定したエントリーIDの記事を削除し、削除件数を返す"""
+        deleted = 0
+        for i in range(0, len(entry_ids), QUERY_CHUNK_SIZE):
+            chunk = entry_ids[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            deleted += self.conn.execute(f"DELETE FROM articles WHERE id IN ({placeholders})", chunk).rowcount
+        self.conn.commit()
+        return deleted
+
+    def prune(self, crawled_before: int) -> int:
+        """crawled（ms）がこれより前の記事を削除し、削除件数を返す"""
+        deleted = self.conn.execute("DELETE FROM articles WHERE crawled < ?", (crawled_before,)).rowcount
+        self.conn.commit()
+        return deleted
+
+    def clear(self):
+        """全記事を削除"""
+        self.conn.execute("DELETE FROM articles")
+        self.conn.commit()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def iter_records(self, crawled_since: int = None, category_slug: str = None):
+        """
+        記事を新しい順に1件ずつ返す
+
+        Args:
+            crawled_since: crawled（ms）がこれ以降の記事のみ
+            category_slug: 指定したカテゴリの記事のみ
+
+        Yields:
+            (カテゴリ名, カテゴリslug, 記事データ)
+        """
+        query = "SELECT category, category_slug, data FROM articles"
+        conditions = []
+        params = []
+        if crawled_since:
+            conditions.append("crawled >= ?")
+            params.append(crawled_since)
+        if category_slug:
+            conditions.append("category_slug = ?")
+            params.append(category_slug)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY crawled DESC"
+        for label, slug, data in self.conn.execute(query, params):
+            yield label, slug, json.loads(data)
+
+    def entry_ids(self) -> list:
+        """全記事のエントリーID（新しい順）"""
+        return [row[0] for row in self.conn.execute("SELECT id FROM articles ORDER BY crawled DESC")]
+
+    def entry_ids_for_urls(self, urls: list) -> dict:
+        """URL → エントリーID（ストアにないURLは含まない）"""
+        found = {}
+        for i in range(0, len(urls), QUERY_CHUNK_SIZE):
+            chunk = urls[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for url, entry_id in self.conn.execute(
+                f"SELECT url, id FROM articles WHERE url IN ({placeholders})", chunk
+            ):
+                found[url] = entry_id
+        return found
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+記事テキストの前処理
+
+feedly_fetch.py は取得時に本文HTMLをテキストに変換し（html_to_text、content_format: "text"）、
+必要なら content_max_chars 文字で打ち切る。
+タイトル・本文を記事ごとに1度だけ正規化（HTML除去・小文字化）し、
+日本語の有無・トークン集合とあわせて PreparedText として記事（_text）に保持する。
+feedly_score.py の関連度計算（calculate_relevance_score / RelevanceMatcher）と
+近似重複判定はこれを使い、キーワードごとに本文を小文字化・走査し直さない。
+
+Usage:
+    import feedly_text
+
+    text = feedly_text.prepare_text(article)
+    text.body, text.body_has_japanese, text.body_tokens
+"""
+
+import html
+import re
+
+# ひらがな・カタカナ・漢字（feedly_score.JAPANESE_TEXT_RE と同じ範囲）
+JAPANESE_TEXT_RE = re.compile(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]')
+WORD_RE = re.compile(r"\w+")
+# 大文字小文字無視でASCII英数字に一致する非ASCII文字（İ ı ſ K）。
+# これを含むテキストではトークン集合による判定が正規表現と一致しない
+CASE_EXOTIC_RE = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# 本文として読まれない要素（中身ごと除去）
+HIDDEN_ELEMENT_RE = re.compile(r"<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+# 段落・改行などのブロック要素は空白に、それ以外（a / b / span 等）のタグは詰める
+BLOCK_TAG_RE = re.compile(
+    r"</?(?:p|div|br|hr|li|ul|ol|dl|dt|dd|h[1-6]|table|tr|td|th|thead|tbody|blockquote|pre|"
+    r"section|article|header|footer|aside|nav|figure|figcaption|img|iframe|video|audio)\b[^>]*>",
+    re.IGNORECASE
+)
+TAG_RE = re.compile(r"<[^>]*>")
+# 途中で切ったHTMLの末尾に残る閉じていない要素・コメント・タグ
+UNCLOSED_TAIL_RE = re.compile(r"<(?:(?:script|style|noscript|template)\b.*|!--.*|[^>]*)\Z", re.IGNORECASE | re.DOTALL)
+PARTIAL_ENTITY_RE = re.compile(r"&#?\w*\Z")
+# 文字数上限があるとき、まず上限のこの倍数までのHTMLだけを変換する
+TRUNCATE_HTML_FACTOR = 4
+
+# 記事の content_format（feedly_fetch.py の出力）
+CONTENT_FORMATS = ("text", "html", "both")
+
+
+def article_body(article: dict) -> str:
+    """記事本文を文字列で取得（contentはdictの場合がある: Feedly API形式）"""
+    content_raw = article.get("content", "")
+    if isinstance(content_raw, dict):
+        return content_raw.get("content", "")
+    return str(content_raw)
+
+
+def article_text(article: dict) -> str:
+    """記事本文のテキスト（取得時に変換済みならそのまま、HTMLなら変換する）"""
+    if article.get("content_format") == "text":
+        return article_body(article)
+    return html_to_text(article_body(article))
+
+
+def _strip_html(content: str, partial: bool = False) -> str:
+    """HTMLを空白を詰める前のテキストに変換（partial: 途中で切ったHTML）"""
+    if "<" in content:
+        content = HIDDEN_ELEMENT_RE.sub(" ", content)
+        content = COMMENT_RE.sub(" ", content)
+        if partial:
+            content = UNCLOSED_TAIL_RE.sub(" ", content)
+        content = BLOCK_TAG_RE.sub(" ", content)
+        content = TAG_RE.sub("", content)
+    if partial:
+        content = PARTIAL_ENTITY_RE.sub("", content)
+    if "&" in content:
+        content = html.unescape(content)
+    return content
+
+
+def html_to_text(content: str, max_chars: int = None) -> str:
+    """
+    HTMLを本文テキストに変換
+
+    script / style 等とコメントは中身ごと除去し、属性値（class・href等）は残さない。
+    ブロック要素の境界は空白、インライン要素のタグは詰めて、実体参照を戻す。
+    max_chars を指定すると先頭 max_chars 文字で打ち切る。長いHTMLは先頭部分だけを
+    変換し、上限に届かなかった場合だけ全体を変換する（閉じていない script・コメント等を
+    含む壊れたHTMLでなければ、結果は全体を変換してから打ち切った場合と同じ）。
+    """
+    if not content:
+        return ""
+    if max_chars and len(content) > max_chars * TRUNCATE_HTML_FACTOR:
+        text = " ".join(_strip_html(content[:max_chars * TRUNCATE_HTML_FACTOR], partial=True).split())
+        if len(text) > max_chars:
+            return text[:max_chars].rstrip()
+    text = " ".join(_strip_html(content).split())
+    if max_chars:
+        return text[:max_chars].rstrip()
+    return text
+
+
+class PreparedText:
+    """
+    照合用に1度だけ正規化した記事テキスト
+
+    Attributes:
+        title / body: 小文字化したタイトル・本文（本文は article_text のテキスト）
+        title_has_japanese / body_has_japanese: 日本語（かな・漢字）を含むか
+        title_tokens / body_tokens: 単語（\\w+）の集合。case_exotic がTrueの場合はNone
+        case_exotic: 大文字小文字無視でASCII英数字に一致する非ASCII文字を含むか
+    """
+
+    __slots__ = (
+        "title", "body", "title_has_japanese", "body_has_japanese",
+        "title_tokens", "body_tokens", "case_exotic",
+    )
+
+    def __init__(self, title: str, body: str):
+        self.title = (title or "").lower()
+        self.body = (body or "").lower()
+        self.title_has_japanese = bool(JAPANESE_TEXT_RE.search(self.title))
+        self.body_has_japanese = bool(JAPANESE_TEXT_RE.search(self.body))
+        self.case_exotic = bool(CASE_EXOTIC_RE.search(self.title) or CASE_EXOTIC_RE.search(self.body))
+        if self.case_exotic:
+            self.title_tokens = None
+            self.body_tokens = None
+        else:
+            self.title_tokens = frozenset(WORD_RE.findall(self.title))
+            self.body_tokens = frozenset(WORD_RE.findall(self.body))
+
+
+def prepare_text(article: dict) -> PreparedText:
+    """記事の PreparedText（未作成なら作成して _text に保持）"""
+    prepared = article.get("_text")
+    if prepared is None:
+        prepared = article["_text"] = PreparedText(article.get("title", ""), article_text(article))
+    return prepared
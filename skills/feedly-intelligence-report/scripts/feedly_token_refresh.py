@@ -39,6 +39,8 @@ try:
 except ImportError:
     requests = None  # --check オプション使用時のみ必要
 
+import feedly_http
+
 DEFAULT_TOKEN_FILE = "~/.feedly/token"
 FEEDLY_URL = "https://feedly.com"
 USER_DATA_DIR = "~/.feedly/browser_data"
@@ -56,7 +58,7 @@ def check_token_validity(token: str) -> dict:
 
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        resp = requests.get(
+        resp = feedly_http.get(
             "https://api.feedly.com/v3/profile",
             headers=headers,
             timeout=10
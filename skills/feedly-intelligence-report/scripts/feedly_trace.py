@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+処理段階ごとの計測（トレース）
+
+feedly_fetch.py / feedly_score.py の各段階（取得・抽出・書き出し、読み込み・スコアリング等）の
+経過時間・CPU時間・最大RSS・HTTPリクエスト数・送受信バイト数・再試行数を記録し、
+--trace で指定したファイルにJSON（段階別の集計 + イベント一覧）または
+Chrome trace event 形式（chrome://tracing・Perfetto で表示）で書き出す。
+HTTPの値は feedly_http.STATS の差分（requests 経由の同期取得と、
+feedly_http.async_request 経由の非同期エンジンの両方を含む）。
+
+Usage:
+    import feedly_trace
+
+    feedly_trace.enable()
+    with feedly_trace.stage("pages"):
+        ...
+    feedly_trace.write("/tmp/fetch_trace.json", fmt="chrome")
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: CPU時間は process_time、最大RSSは記録しない
+
+import feedly_http
+
+TRACE_FORMATS = ("json", "chrome")
+HTTP_FIELDS = ("requests", "retries", "errors", "bytes_sent", "bytes_received")
+# ru_maxrss の単位（Linux は KB、macOS はバイト）
+RSS_DIVISOR = 1024 if sys.platform == "darwin" else 1
+
+
+def sample() -> dict:
+    """現在の経過時間・CPU時間・最大RSS・HTTP統計"""
+    values = {
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+        "child_cpu": 0.0,
+        "max_rss_kb": None,
+    }
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        values["child_cpu"] = children.ru_utime + children.ru_stime
+        values["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // RSS_DIVISOR
+    totals = feedly_http.STATS.totals()
+    values.update((key, totals[key]) for key in HTTP_FIELDS)
+    return values
+
+
+class Tracer:
+    """
+    段階ごとの計測結果を保持する
+
+    stage() を入れ子にしたり同じ名前で繰り返し呼んだりしてよい（ページごとの抽出など）。
+    集計では同名の段階を合算する。無効時の stage() は何もしない。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.events = []
+        self.started_at = None
+        self.origin = None
+
+    def enable(self):
+        self.enabled = True
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.origin = sample()
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """with ブロックの処理を段階 name として記録（args は記録に添える任意の値）"""
+        if not self.enabled:
+            yield
+            return
+        before = sample()
+        try:
+            yield
+        finally:
+            after = sample()
+            event = {
+                "name": name,
+                "start": before["wall"] - self.origin["wall"],
+                "wall_seconds": after["wall"] - before["wall"],
+                "cpu_seconds": after["cpu"] - before["cpu"],
+                "child_cpu_seconds": after["child_cpu"] - before["child_cpu"],
+                "max_rss_kb": after["max_rss_kb"],
+                "thread": threading.get_ident(),
+            }
+            event.update((key, after[key] - before[key]) for key in HTTP_FIELDS)
+            if args:
+                event["args"] = args
+            with self.lock:
+                self.events.append(event)
+
+    def summary(self) -> list:
+        """段階名ごとの合計（最初に現れた順）"""
+        stages = {}
+        for event in self.events:
+            total = stages.setdefault(event["name"], {
+                "name": event["name"],
+                "calls": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "child_cpu_seconds": 0.0,
+                "max_rss_kb": None,
+                **dict.fromkeys(HTTP_FIELDS, 0),
+            })
+            total["calls"] += 1
+            for key in ("wall_seconds", "cpu_seconds", "child_cpu_seconds", *HTTP_FIELDS):
+                total[key] += event[key]
+            if event["max_rss_kb"] is not None:
+                total["max_rss_kb"] = max(total["max_rss_kb"] or 0, event["max_rss_kb"])
+        return list(stages.values())
+
+    def to_json(self) -> dict:
+        """段階別の集計とイベント一覧"""
+        now = sample()
+        return {
+            "metadata": {
+                "script": Path(sys.argv[0]).name,
+                "argv": sys.argv[1:],
+                "started_at": self.started_at,
+                "wall_seconds": now["wall"] - self.origin["wall"],
+                "cpu_seconds": now["cpu"] - self.origin["cpu"],
+                "child_cpu_seconds": now["child_cpu"] - self.origin["child_cpu"],
+                "max_rss_kb": now["max_rss_kb"],
+                **{key: now[key] - self.origin[key] for key in HTTP_FIELDS},
+            },
+            "stages": self.summary(),
+            "events": self.events,
+        }
+
+    def to_chrome(self) -> dict:
+        """Chrome trace event 形式（完了イベント "X"、時刻はマイクロ秒）"""
+        pid = os.getpid()
+        trace_events = []
+        for event in self.events:
+            args = {
+                key: value for key, value in event.items()
+                if key not in ("name", "start", "wall_seconds", "thread", "args")
+            }
+            args.update(event.get("args", {}))
+            trace_events.append({
+                "name": event["name"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": round(event["start"] * 1e6),
+                "dur": round(event["wall_seconds"] * 1e6),
+                "pid": pid,
+                "tid": event["thread"],
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str, fmt: str = "json"):
+        """トレースをファイルに書き出す"""
+        data = self.to_chrome() if fmt == "chrome" else self.to_json()
+        output_path = Path(os.path.expanduser(path))
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2))
+        print(f"Trace written to: {output_path}", file=sys.stderr)
+
+
+TRACER = Tracer()
+
+
+def enable():
+    """計測を開始（--trace 指定時のみ呼ぶ）"""
+    TRACER.enable()
+
+
+def stage(name: str, **args):
+    """プロセス共有のトレーサーで段階を記録"""
+    return TRACER.stage(name, **args)
+
+
+def write(path: str, fmt: str = "json"):
+    """プロセス共有のトレーサーの内容を書き出す"""
+    TRACER.write(path, fmt)
@@ -0,0 +1,6 @@
+"""scripts/ のモジュールをテストから import できるようにする"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
@@ -0,0 +1,66 @@
+"""
+feedly_dedup の近似重複判定のテスト
+
+時間窓で分けたバケット（窓の外の記事は候補にしない・時刻のない記事は常に候補）と、
+上限に達したバケットを参照しない動作を確かめる。
+"""
+
+import feedly_dedup
+
+HOUR_MS = 3600 * 1000
+BODY = "<p>" + "金融庁は本人確認の新しい指針を公表し、事業者に対応を求めた。" * 3 + "</p>"
+
+
+def make_article(i: int, published: int, title: str = "金融庁が本人確認の新指針を公表", score: float = 0) -> dict:
+    return {
+        "id": f"a{i}",
+        "title": title,
+        "content": BODY,
+        "published": published,
+        "_scores": {"total": score},
+    }
+
+
+def test_duplicates_within_window_are_merged():
+    start = 100 * 24 * HOUR_MS
+    articles = [make_article(0, start, score=2), make_article(1, start + 47 * HOUR_MS, score=1)]
+    kept, merged = feedly_dedup.remove_near_duplicates(articles, {"time_window_hours": 48})
+    assert merged == 1
+    assert [a["id"] for a in kept] == ["a0"]
+
+
+def test_duplicates_outside_window_are_kept():
+    start = 100 * 24 * HOUR_MS
+    articles = [make_article(0, start, score=2), make_article(1, start + 49 * HOUR_MS, score=1)]
+    kept, merged = feedly_dedup.remove_near_duplicates(articles, {"time_window_hours": 48})
+    assert merged == 0
+
+
+def test_articles_without_time_match_any_slot():
+    start = 100 * 24 * HOUR_MS
+    articles = [make_article(0, start, score=2), make_article(1, 0, score=1), make_article(2, start * 3, score=0)]
+    kept, merged = feedly_dedup.remove_near_duplicates(articles, {"time_window_hours": 48})
+    # 時刻のない記事は a0 と重複。a2 は a0 から時間窓の外
+    assert [a["id"] for a in kept] == ["a0", "a2"]
+
+
+def test_no_window_matches_across_time():
+    articles = [make_article(0, HOUR_MS, score=2), make_article(1, 1000 * HOUR_MS, score=1)]
+    kept, merged = feedly_dedup.remove_near_duplicates(articles, {"time_window_hours": 0})
+    assert merged == 1
+
+
+def test_full_buckets_are_not_used():
+    index = feedly_dedup.NearDuplicateIndex()
+    fp = index.fingerprint(make_article(0, HOUR_MS))
+    for _ in range(feedly_dedup.MAX_BUCKET_SIZE):
+        index.add(fp)
+    assert index.find(fp) is None
+    # 上限に達したバケットには以後登録しない
+    assert all(
+        len(bucket) == feedly_dedup.MAX_BUCKET_SIZE
+        for by_slot in index.title_buckets.values()
+        for bucket in by_slot.values()
+    )
+    index.add(fp)
+    assert index.find(fp) is None
@@ -0,0 +1,144 @@
+"""
+RelevanceMatcher と基準実装 calculate_relevance_score の一致テスト
+
+表形式のケース（日本語・短い英字・大文字小文字の特殊な折り畳み・複数語・記号入り・類義語）と、
+乱数で生成したキーワード・記事の両方で (スコア, マッチしたキーワード) が一致することを確かめる。
+"""
+
+import copy
+import random
+
+import pytest
+
+import feedly_score
+import feedly_text
+
+SYNONYM_GROUPS = [
+    ["AI", "人工知能", "機械学習", "LLM", "生成AI"],
+    ["eKYC", "本人確認", "KYC", "顔認証"],
+    ["machine learning", "ML"],
+    ["gpt", "gpt-4"],
+]
+
+# (キーワード, 類義語グループ, タイトル, 本文)
+CASES = [
+    # 日本語: 部分一致
+    (["本人確認"], [], "オンライン本人確認の最新動向", ""),
+    (["顔認証"], [], "", "<p>空港で顔認証ゲートを導入</p>"),
+    (["生成AI"], [], "生成ＡＩの活用", "生成AIの活用事例"),
+    # 短い英字: 日本語テキストでは前後が英字でない場合のみ
+    (["AI"], [], "先進的AI利活用", ""),
+    (["ai"], [], "Zaimで家計簿", "Zaimの新機能"),
+    (["ml"], [], "HTMLの書き方", "html と ML の違い"),
+    (["IT"], [], "it is a test", "IT業界のニュース"),
+    (["ai", "ml"], [], "AI/ML roundup", "ai-ml pipelines"),
+    # 大文字小文字の特殊な折り畳み（ſ = s, K = k, İ）
+    (["ſ"], [], "s", "S and ſ"),
+    (["s"], [], "ſ", ""),
+    (["k"], [], "K", "kelvin"),
+    (["K"], [], "K", ""),
+    (["İ"], [], "i̇stanbul", "İstanbul"),
+    (["i"], [], "İ", "ı"),
+    (["straße"], [], "STRASSE", "straße"),
+    # 複数語・記号入り
+    (["machine learning"], [], "Machine Learning at scale", ""),
+    (["machine learning"], [], "machine-learning", "machinelearning"),
+    (["deep learning"], [], "", "Deep  learning"),
+    (["c++"], [], "Modern C++ tips", "c++20"),
+    ([".net"], [], ".NET 9 released", "asp.net core"),
+    (["gpt-4"], [], "GPT-4o", "gpt-4 turbo"),
+    (["x-ray"], [], "X-ray vision", "xray"),
+    # 類義語グループ
+    (["AI"], SYNONYM_GROUPS, "機械学習の基礎", "LLMを使った要約"),
+    (["eKYC"], SYNONYM_GROUPS, "KYC規制", "顔認証と本人確認"),
+    (["ML"], SYNONYM_GROUPS, "machine learning", "ML"),
+    (["gpt"], SYNONYM_GROUPS, "", "gpt-4"),
+    (["AI", "eKYC"], SYNONYM_GROUPS, "無関係な記事", "まったく関係ない"),
+    # キーワードなし（ニュートラル）
+    ([], [], "AI", "AI"),
+]
+
+
+def reference_score(article: dict, keywords: list, synonym_groups: list, trusted_sources: dict = None):
+    return feedly_score.calculate_relevance_score(
+        copy.deepcopy(article),
+        keywords=keywords,
+        synonym_groups=synonym_groups,
+        trusted_sources=trusted_sources
+    )
+
+
+def matcher_score(article: dict, keywords: list, synonym_groups: list, trusted_sources: dict = None):
+    matcher = feedly_score.RelevanceMatcher(
+        keywords=keywords,
+        synonym_groups=synonym_groups,
+        trusted_sources=trusted_sources
+    )
+    return matcher.score(copy.deepcopy(article))
+
+
+@pytest.mark.parametrize("keywords, synonym_groups, title, content", CASES)
+def test_matcher_matches_reference(keywords, synonym_groups, title, content):
+    article = {"title": title, "content": content, "url": "https://example.com/a"}
+    assert matcher_score(article, keywords, synonym_groups) == reference_score(article, keywords, synonym_groups)
+
+
+@pytest.mark.parametrize("keywords, title, expected", [
+    (["AI"], "先進的AI利活用", ["ai"]),
+    (["ai"], "Zaimで家計簿", []),
+    (["ml"], "HTMLの書き方", []),
+    (["本人確認"], "オンライン本人確認", ["本人確認"]),
+    (["machine learning"], "Machine Learning at scale", ["machine learning"]),
+])
+def test_expected_matches(keywords, title, expected):
+    article = {"title": title, "content": ""}
+    _, matched = matcher_score(article, keywords, [])
+    assert matched == expected
+
+
+def test_trusted_source_matches_reference():
+    trusted = {"example.com": 1.0, "Publickey": 0.9}
+    for url, source in [("https://www.example.com/x", ""), ("https://other.jp/", "Publickey"), ("", "")]:
+        article = {"title": "AI news", "content": "", "url": url, "source": {"title": source}}
+        assert matcher_score(article, ["AI"], [], trusted) == reference_score(article, ["AI"], [], trusted)
+
+
+VOCAB = [
+    "AI", "ai", "ml", "ML", "LLM", "html", "Zaim", "aim", "機械学習", "人工知能", "生成AI", "本人確認",
+    "eKYC", "KYC", "顔認証", "c++", ".net", "it", "IT", "machine learning", "machine", "learning",
+    "deep learning", "agent", "ſ", "s", "K", "k", "K", "abc", "ab", "a", "x-ray", "gpt-4", "gpt",
+    "ı", "İ", "µ", "μ", "Σ", "σ", "ς", "straße", "ss",
+]
+FILLER = ["the", "に", "する", "foo", "、", "。", " ", "-", "<p>", "</p>", "\n", "123"]
+
+
+def random_text(rnd: random.Random, words: int) -> str:
+    return "".join(rnd.choice(VOCAB + FILLER * 2) + rnd.choice(["", " "]) for _ in range(words))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_randomized_scores_match_reference(seed):
+    rnd = random.Random(seed)
+    for _ in range(40):
+        keywords = rnd.sample(VOCAB, rnd.randint(1, 8))
+        synonym_groups = rnd.sample(SYNONYM_GROUPS, rnd.randint(0, len(SYNONYM_GROUPS)))
+        matcher = feedly_score.RelevanceMatcher(keywords=keywords, synonym_groups=synonym_groups)
+        for _ in range(10):
+            article = {"title": random_text(rnd, rnd.randint(0, 8)), "content": random_text(rnd, 30)}
+            expected = reference_score(article, keywords, synonym_groups)
+            assert matcher.score(copy.deepcopy(article)) == expected, (keywords, synonym_groups, article)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_randomized_literals_match_is_word_match(seed):
+    """走査（トークン集合なし）とトークン集合の両方の経路が is_word_match と一致する"""
+    rnd = random.Random(seed)
+    for _ in range(40):
+        keywords = rnd.sample(VOCAB, rnd.randint(1, 10))
+        matcher = feedly_score.RelevanceMatcher(keywords=keywords)
+        literals = {kw.lower() for kw in keywords}
+        for _ in range(10):
+            text = feedly_text.prepare_text({"title": "", "content": random_text(rnd, 20)})
+            expected = {kw for kw in literals if feedly_score.is_word_match(kw, text.body)}
+            assert matcher.matched_literals(text.body) == expected, (keywords, text.body)
+            assert matcher.matched_literals(text.body, text.body_has_japanese, text.body_tokens) == expected
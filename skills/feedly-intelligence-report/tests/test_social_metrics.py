@@ -0,0 +1,183 @@
+"""
+はてブ一括取得（count/entries）とURLごとの取得へのフォールバックのテスト
+
+ローカルのスタブサーバーに対して、正常な一括取得・不正な形式の一括レスポンス・
+一部URLの取得失敗と、失敗したURLをキャッシュしないことを確かめる（外部への通信なし）。
+想定外の形式の本文は、スレッド版・非同期版（httpx がある場合）とも取得失敗として扱う。
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("requests")
+
+import feedly_score
+import feedly_social
+
+URLS = [f"https://example.com/articles/{i}" for i in range(7)]
+
+
+class StubState:
+    """スタブサーバーの応答設定とリクエスト記録"""
+
+    def __init__(self):
+        self.counts = {url: i + 1 for i, url in enumerate(URLS)}
+        # "ok" / "malformed"（200だが辞書でない）/ "bad_values"（件数が数値でない）/ "error"（503）
+        self.batch_mode = "ok"
+        # "ok" / "malformed"（hits の要素が辞書でない）
+        self.hn_mode = "ok"
+        # URLごとの取得で404を返すURL
+        self.failing = set()
+        self.requests = []
+
+    def paths(self, suffix: str) -> list:
+        return [query for path, query in self.requests if path.endswith(suffix)]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    state = StubState()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            parsed = urlsplit(self.path)
+            query = parse_qs(parsed.query)
+            state.requests.append((parsed.path, query))
+            if parsed.path.endswith("/count/entries"):
+                if state.batch_mode == "error":
+                    return self.reply(503, b"", {"Retry-After": "0"})
+                if state.batch_mode == "malformed":
+                    return self.reply(200, json.dumps([1, 2, 3]).encode())
+                if state.batch_mode == "bad_values":
+                    return self.reply(200, json.dumps({url: [1] for url in query.get("url", [])}).encode())
+                # 0件のURLはレスポンスに含まれない（APIと同じ）
+                body = {url: state.counts[url] for url in query.get("url", []) if state.counts.get(url)}
+                return self.reply(200, json.dumps(body).encode())
+            if parsed.path.endswith("/count/entry"):
+                url = query["url"][0]
+                if url in state.failing:
+                    return self.reply(404, b"")
+                return self.reply(200, str(state.counts.get(url, 0)).encode())
+            hits = [{"points": 10, "objectID": "42"}] if state.hn_mode == "ok" else ["42"]
+            return self.reply(200, json.dumps({"hits": hits}).encode())
+
+        def reply(self, status: int, body: bytes, headers: dict = None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(feedly_social, "HATENA_COUNT_API", f"{base}/count")
+    monkeypatch.setattr(feedly_social, "HN_SEARCH_API", f"{base}/api/v1/search")
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_returns_all_urls(stub):
+    stub.counts[URLS[0]] = 0
+    counts = feedly_social.fetch_hatena_bookmark_counts(URLS)
+    assert counts == {url: stub.counts[url] for url in URLS}
+    assert counts[URLS[0]] == 0
+    assert len(stub.paths("/count/entries")) == 1
+    assert stub.paths("/count/entries")[0]["url"] == URLS
+
+
+def fetch_metrics(engine: str, hatena_urls: list, hn_urls: list, batch_size: int) -> tuple:
+    """スレッド版・非同期版のどちらかで取得（APIのURLはスタブサーバーに差し替えたもの）"""
+    if engine == "thread":
+        return feedly_social.fetch_social_metrics_threaded(hatena_urls, hn_urls, max_workers=4, batch_size=batch_size)
+    pytest.importorskip("httpx")
+    import feedly_social_async
+    return feedly_social_async.fetch_social_metrics_async(
+        hatena_urls,
+        hn_urls,
+        hatena_api=feedly_social.HATENA_COUNT_API,
+        hn_api=feedly_social.HN_SEARCH_API,
+        batch_size=batch_size
+    )
+
+
+@pytest.mark.parametrize("mode", ["malformed", "bad_values", "error"])
+def test_failed_batch_returns_none(stub, mode):
+    stub.batch_mode = mode
+    assert feedly_social.fetch_hatena_bookmark_counts(URLS) is None
+
+
+def test_empty_batch_makes_no_request(stub):
+    assert feedly_social.fetch_hatena_bookmark_counts([]) is None
+    assert stub.requests == []
+
+
+def test_threaded_batches(stub):
+    hatena, hn, stats = feedly_social.fetch_social_metrics_threaded(URLS, URLS[:2], max_workers=4, batch_size=3)
+    assert hatena == stub.counts
+    assert hn == {url: [10, "42"] for url in URLS[:2]}
+    assert stats == {"hatena_batches": 3, "batch_fallbacks": 0, "unfinished": 0}
+    assert stub.paths("/count/entry") == []
+
+
+def test_malformed_batch_falls_back_per_url(stub):
+    stub.batch_mode = "malformed"
+    hatena, _, stats = feedly_social.fetch_social_metrics_threaded(URLS, [], max_workers=4, batch_size=3)
+    assert hatena == stub.counts
+    assert stats["batch_fallbacks"] == 3
+    assert sorted(q["url"][0] for q in stub.paths("/count/entry")) == sorted(URLS)
+
+
+@pytest.mark.parametrize("engine", ["thread", "async"])
+def test_malformed_bodies_are_failures(stub, engine):
+    stub.batch_mode = "bad_values"
+    stub.hn_mode = "malformed"
+    hatena, hn, stats = fetch_metrics(engine, URLS, URLS[:2], batch_size=4)
+    # 一括取得は失敗扱いでURLごとに取り直し、HNは取得失敗として結果に含めない
+    assert hatena == stub.counts
+    assert hn == {}
+    assert stats["batch_fallbacks"] == 2
+
+
+def test_partial_failure_omits_failed_urls(stub):
+    stub.batch_mode = "error"
+    stub.failing = {URLS[1], URLS[4]}
+    hatena, _, stats = feedly_social.fetch_social_metrics_threaded(URLS, [], max_workers=4, batch_size=4)
+    assert hatena == {url: count for url, count in stub.counts.items() if url not in stub.failing}
+    assert stats["batch_fallbacks"] == 2
+
+
+def test_failures_are_not_cached(stub, tmp_path):
+    stub.batch_mode = "error"
+    stub.failing = {URLS[2]}
+    cache = feedly_score.SocialMetricsCache(str(tmp_path / "social.sqlite"))
+    articles = [{"url": url, "title": url} for url in URLS]
+
+    metrics = feedly_score.fetch_social_metrics_for_articles(articles, cache=cache, engine="thread", batch_size=50)
+    assert metrics[URLS[2]]["hatena"] == 0
+    assert metrics[URLS[3]]["hatena"] == stub.counts[URLS[3]]
+    url_ages = {url: 0.0 for url in URLS}
+    cached = cache.lookup("hatena", url_ages)
+    assert URLS[2] not in cached
+    assert cached == {url: count for url, count in stub.counts.items() if url != URLS[2]}
+
+    # 2回目はキャッシュにないURL（失敗したURL）だけを取得し直す
+    stub.requests.clear()
+    stub.batch_mode = "ok"
+    stub.failing = set()
+    metrics = feedly_score.fetch_social_metrics_for_articles(articles, cache=cache, engine="thread", batch_size=50)
+    assert metrics[URLS[2]]["hatena"] == stub.counts[URLS[2]]
+    assert [q["url"] for q in stub.paths("/count/entries")] == [[URLS[2]]]
+    cache.close()